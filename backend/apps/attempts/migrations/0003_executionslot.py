@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0002_attemptevent_attemptgateresult_attempt_diff_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionSlot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("pool", models.CharField(max_length=100)),
+                ("index", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "attempt",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="execution_slots",
+                        to="attempts.attempt",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "execution_slots",
+                "ordering": ["pool", "index"],
+                "indexes": [
+                    models.Index(
+                        fields=["pool", "expires_at"],
+                        name="execution_s_pool_a23d56_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="executionslot",
+            constraint=models.UniqueConstraint(
+                fields=("pool", "index"), name="unique_slot_per_pool"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0003_executionslot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attempt",
+            name="lda_job_id",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("local_access", "0002_ldanode_repoplacement"),
+        ("attempts", "0004_attempt_lda_job_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attempt",
+            name="lda_node",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="attempts",
+                to="local_access.ldanode",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0005_attempt_lda_node"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="attemptevent",
+            options={"ordering": ["seq", "timestamp"]},
+        ),
+        migrations.AddField(
+            model_name="attemptevent",
+            name="seq",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="attemptevent",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="attemptevent",
+            index=models.Index(
+                fields=["attempt", "seq"], name="attempt_eve_attempt_fe8837_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0006_attemptevent_seq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Blob",
+            fields=[
+                (
+                    "sha256",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                (
+                    "size",
+                    models.BigIntegerField(help_text="Uncompressed size in bytes"),
+                ),
+                ("compressed_size", models.BigIntegerField()),
+                ("codec", models.CharField(default="zstd", max_length=16)),
+                (
+                    "backend",
+                    models.CharField(
+                        choices=[
+                            ("filesystem", "Filesystem"),
+                            ("database", "Database"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("data", models.BinaryField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "blobs",
+            },
+        ),
+        migrations.CreateModel(
+            name="AttemptDiffFile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                ("path", models.CharField(max_length=1024)),
+                ("old_path", models.CharField(blank=True, max_length=1024)),
+                ("additions", models.PositiveIntegerField(default=0)),
+                ("deletions", models.PositiveIntegerField(default=0)),
+                (
+                    "attempt",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="diff_files",
+                        to="attempts.attempt",
+                    ),
+                ),
+                (
+                    "blob",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="attempts.blob",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "attempt_diff_files",
+                "ordering": ["position"],
+            },
+        ),
+        migrations.AddField(
+            model_name="attempt",
+            name="result_blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="attempts.blob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="attemptgateresult",
+            name="output_blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="attempts.blob",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="attemptdifffile",
+            constraint=models.UniqueConstraint(
+                fields=("attempt", "position"), name="unique_attempt_diff_position"
+            ),
+        ),
+    ]
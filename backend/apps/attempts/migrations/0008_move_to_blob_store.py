@@ -0,0 +1,140 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:08
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copies of the blob store and diff parser as of this migration;
+# later changes to the app code must not change what it does
+
+FILE_HEADER = re.compile(r"^diff --git a/(?P<old>.+?) b/(?P<new>.+)$")
+
+
+def split_diff_files(diff):
+    """Split a unified diff into one entry per file (see services.diff_parser)."""
+    files = []
+    current = None
+    for line in (diff or "").splitlines(keepends=True):
+        header = FILE_HEADER.match(line.rstrip("\n"))
+        if header:
+            current = {
+                "path": header.group("new"),
+                "old_path": header.group("old"),
+                "additions": 0,
+                "deletions": 0,
+                "lines": [line],
+            }
+            files.append(current)
+            continue
+        if current is None:
+            continue
+        current["lines"].append(line)
+        if line.startswith("+") and not line.startswith("+++"):
+            current["additions"] += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            current["deletions"] += 1
+    for entry in files:
+        entry["diff"] = "".join(entry.pop("lines"))
+    return files
+
+
+class FrozenBlobStore:
+    """put_text() of services.blob_store.BlobStore, against the historical Blob model."""
+
+    def __init__(self, blob_model):
+        import zstandard
+
+        self.model = blob_model
+        self.backend = getattr(settings, "BLOB_STORE_BACKEND", "filesystem")
+        self.root = Path(getattr(settings, "BLOB_STORE_ROOT", str(Path(settings.BASE_DIR) / "blobs")))
+        self.compressor = zstandard.ZstdCompressor(level=getattr(settings, "BLOB_ZSTD_LEVEL", 9))
+
+    def _write_file(self, sha256, data):
+        path = self.root / sha256[:2] / sha256[2:4] / f"{sha256}.zst"
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def put_text(self, text):
+        if text is None:
+            return None
+        content = text.encode("utf-8")
+        sha256 = hashlib.sha256(content).hexdigest()
+        if self.model.objects.filter(sha256=sha256).exists():
+            return sha256
+        compressed = self.compressor.compress(content)
+        blob = self.model(
+            sha256=sha256,
+            size=len(content),
+            compressed_size=len(compressed),
+            codec="zstd",
+            backend=self.backend,
+        )
+        if self.backend == "filesystem":
+            self._write_file(sha256, compressed)
+        else:
+            blob.data = compressed
+        blob.save(force_insert=True)
+        return sha256
+
+
+def move_to_blob_store(apps, schema_editor):
+    """Move inline diffs, results and gate outputs into the blob store."""
+    Attempt = apps.get_model("attempts", "Attempt")
+    AttemptDiffFile = apps.get_model("attempts", "AttemptDiffFile")
+    AttemptGateResult = apps.get_model("attempts", "AttemptGateResult")
+    store = FrozenBlobStore(apps.get_model("attempts", "Blob"))
+
+    attempts = Attempt.objects.exclude(diff="", result__isnull=True).only("id", "diff", "result")
+    for attempt in attempts.iterator(chunk_size=100):
+        if attempt.diff:
+            files = split_diff_files(attempt.diff)
+            if not files and attempt.diff.strip():
+                # Not a git diff; keep it whole rather than lose it
+                files = [{"path": "", "old_path": "", "additions": 0, "deletions": 0, "diff": attempt.diff}]
+            AttemptDiffFile.objects.filter(attempt_id=attempt.id).delete()
+            AttemptDiffFile.objects.bulk_create([
+                AttemptDiffFile(
+                    attempt_id=attempt.id,
+                    position=position,
+                    path=file["path"][:1024],
+                    old_path=file["old_path"][:1024],
+                    additions=file["additions"],
+                    deletions=file["deletions"],
+                    blob_id=store.put_text(file["diff"]),
+                )
+                for position, file in enumerate(files)
+            ])
+        if attempt.result:
+            Attempt.objects.filter(id=attempt.id).update(result_blob_id=store.put_text(attempt.result))
+
+    gate_results = AttemptGateResult.objects.exclude(output="").only("id", "output")
+    for gate_result in gate_results.iterator(chunk_size=100):
+        AttemptGateResult.objects.filter(id=gate_result.id).update(
+            output_blob_id=store.put_text(gate_result.output)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0007_blob_store"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_to_blob_store, migrations.RunPython.noop),
+    ]
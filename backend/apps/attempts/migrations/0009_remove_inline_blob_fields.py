@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:08
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Separate from the copy in 0008: its FK updates leave deferred trigger
+    # events that would make these ALTER TABLEs fail in the same transaction
+
+    dependencies = [
+        ("attempts", "0008_move_to_blob_store"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="attempt",
+            name="diff",
+        ),
+        migrations.RemoveField(
+            model_name="attempt",
+            name="result",
+        ),
+        migrations.RemoveField(
+            model_name="attemptgateresult",
+            name="output",
+        ),
+    ]
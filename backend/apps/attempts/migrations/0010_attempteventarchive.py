@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attempts", "0009_remove_inline_blob_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttemptEventArchive",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(help_text="First day of the archived month"),
+                ),
+                ("first_seq", models.PositiveIntegerField()),
+                ("last_seq", models.PositiveIntegerField()),
+                ("event_count", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "attempt",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_archives",
+                        to="attempts.attempt",
+                    ),
+                ),
+                (
+                    "blob",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="attempts.blob",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "attempt_event_archives",
+                "ordering": ["month", "first_seq"],
+                "indexes": [
+                    models.Index(
+                        fields=["attempt", "month"],
+                        name="attempt_eve_attempt_5e49b7_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="attempt_eve_created_0dbc6b_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:36
+
+from pathlib import Path
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+# Frozen copies of the search document and blob reads as of this
+# migration; later changes to the app code must not change what it does
+
+SEARCH_CONFIG = "english"
+SEARCH_TEXT_LIMIT = 100_000
+
+
+def path_search_terms(paths):
+    """Changed file paths as search text (see models.path_search_terms)."""
+    terms = []
+    for path in paths or []:
+        segments = [segment for segment in str(path).split("/") if segment]
+        terms.extend("/".join(segments[index:]) for index in range(len(segments)))
+        terms.extend(segments[:-1])
+        if segments and "." in segments[-1]:
+            terms.append(segments[-1].rsplit(".", 1)[0])
+    return " ".join(terms)
+
+
+def attempt_search_vector(result, error_message, files_changed):
+    """Search document of an attempt (see models.attempt_search_vector)."""
+    return (
+        SearchVector(models.Value(path_search_terms(files_changed)), weight="A", config=SEARCH_CONFIG)
+        + SearchVector(models.Value((error_message or "")[:SEARCH_TEXT_LIMIT]), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(models.Value((result or "")[:SEARCH_TEXT_LIMIT]), weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def read_blob_text(Blob, sha256):
+    """get_text() of services.blob_store.BlobStore; None if the blob is gone."""
+    import zstandard
+
+    blob = Blob.objects.filter(sha256=sha256).first()
+    if blob is None:
+        return None
+    if blob.backend == "filesystem":
+        root = Path(getattr(settings, "BLOB_STORE_ROOT", str(Path(settings.BASE_DIR) / "blobs")))
+        try:
+            compressed = (root / sha256[:2] / sha256[2:4] / f"{sha256}.zst").read_bytes()
+        except FileNotFoundError:
+            return None
+    elif blob.data is not None:
+        compressed = bytes(blob.data)
+    else:
+        return None
+    content = zstandard.ZstdDecompressor().decompress(compressed, max_output_size=blob.size)
+    return content.decode("utf-8", errors="replace")
+
+
+def index_attempts(apps, schema_editor):
+    """Build the search documents of existing attempts."""
+    Attempt = apps.get_model("attempts", "Attempt")
+    Blob = apps.get_model("attempts", "Blob")
+
+    attempts = Attempt.objects.only("id", "result_blob_id", "error_message", "files_changed")
+    for attempt in attempts.iterator(chunk_size=100):
+        result = read_blob_text(Blob, attempt.result_blob_id) if attempt.result_blob_id else None
+        Attempt.objects.filter(id=attempt.id).update(
+            search_vector=attempt_search_vector(result, attempt.error_message, attempt.files_changed)
+        )
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("attempts", "0010_attempteventarchive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attempt",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        # Fill the column before indexing it
+        migrations.RunPython(index_attempts, migrations.RunPython.noop),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="attempt",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="attempts_search_idx"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="attemptevent",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "message", config="english"
+                ),
+                name="attempt_events_search_idx",
+            ),
+        ),
+    ]
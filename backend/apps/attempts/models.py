@@ -1,6 +1,45 @@
+import copy
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils import timezone
+from apps.tasks.models import SEARCH_CONFIG
+
+# Characters of each text that are indexed for search (a tsvector is capped at 1MB)
+SEARCH_TEXT_LIMIT = 100_000
+
+
+def path_search_terms(paths) -> str:
+    """
+    Changed file paths as search text.
+
+    The parser keeps 'apps/auth.py' as one token, so every path suffix is
+    listed along with the directory names and the file's stem: a search
+    for 'auth.py', 'apps/auth.py' or 'auth' finds 'backend/apps/auth.py'.
+    """
+    terms = []
+    for path in paths or []:
+        segments = [segment for segment in str(path).split('/') if segment]
+        terms.extend('/'.join(segments[index:]) for index in range(len(segments)))
+        terms.extend(segments[:-1])
+        if segments and '.' in segments[-1]:
+            terms.append(segments[-1].rsplit('.', 1)[0])
+    return ' '.join(terms)
+
+
+def attempt_search_vector(result, error_message, files_changed):
+    """Search document of an attempt: changed paths (A), error (B), agent output (C)."""
+    return (
+        SearchVector(models.Value(path_search_terms(files_changed)), weight='A', config=SEARCH_CONFIG)
+        + SearchVector(models.Value((error_message or '')[:SEARCH_TEXT_LIMIT]), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(models.Value((result or '')[:SEARCH_TEXT_LIMIT]), weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def event_search_vector():
+    """Search document of an attempt event; queries must use this exact expression to hit its index."""
+    return SearchVector('message', config=SEARCH_CONFIG)
 
 
 class Attempt(models.Model):
@@ -37,13 +76,32 @@ class Attempt(models.Model):
     git_branch = models.CharField(max_length=255, blank=True)
     worktree_path = models.CharField(max_length=1024, blank=True)
 
-    # Result data
-    result = models.TextField(blank=True, null=True)
-    diff = models.TextField(blank=True, help_text="Git diff output")
+    # LDA background job running this attempt
+    lda_job_id = models.CharField(max_length=64, blank=True, db_index=True)
+    lda_node = models.ForeignKey(
+        'local_access.LDANode',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attempts'
+    )
+
+    # Result data (agent output and diff are kept in the blob store)
+    result_blob = models.ForeignKey(
+        'Blob',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
     error_message = models.TextField(blank=True, null=True)
     files_changed = models.JSONField(default=list, blank=True)
     logs = models.JSONField(default=list, blank=True)
 
+    # Full-text document of the fields above, kept up to date by save();
+    # the output lives in the blob store, so it can't be an index expression
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # Timing
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -58,11 +116,74 @@ class Attempt(models.Model):
         indexes = [
             models.Index(fields=['task', '-created_at']),
             models.Index(fields=['status', '-created_at']),
+            GinIndex(fields=['search_vector'], name='attempts_search_idx'),
         ]
 
+    # Fields the search document is built from
+    SEARCH_SOURCE_FIELDS = {'result_blob', 'result_blob_id', 'error_message', 'files_changed'}
+    SEARCH_SOURCE_ATTRS = ('result_blob_id', 'error_message', 'files_changed')
+
     def __str__(self):
         return f"Attempt {self.id} for {self.task.title} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._search_sources = instance._loaded_search_sources()
+        return instance
+
+    def _loaded_search_sources(self):
+        """Current values of the search source fields that aren't deferred."""
+        deferred = self.get_deferred_fields()
+        return {
+            attr: copy.deepcopy(self.__dict__[attr])
+            for attr in self.SEARCH_SOURCE_ATTRS if attr not in deferred
+        }
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            sources = self._loaded_search_sources()
+            saved = getattr(self, '_search_sources', None)
+            # Status updates and the like don't rebuild the document (or read the result blob)
+            if saved is None or any(attr not in saved or saved[attr] != value for attr, value in sources.items()):
+                self.search_vector = attempt_search_vector(self.result, self.error_message, self.files_changed)
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'search_vector'}
+            super().save(*args, **kwargs)
+            self._search_sources = sources
+        else:
+            super().save(*args, **kwargs)
+
+    @property
+    def result(self):
+        """Agent output, read from the blob store."""
+        from apps.attempts.services import blob_store
+
+        if not self.result_blob_id:
+            return None
+        # Remembered per blob, so saves don't read it again
+        cached = getattr(self, '_result_text', None)
+        if cached is None or cached[0] != self.result_blob_id:
+            cached = self._result_text = (self.result_blob_id, blob_store.get_text(self.result_blob_id))
+        return cached[1]
+
+    @result.setter
+    def result(self, value):
+        from apps.attempts.services import blob_store
+
+        self.result_blob_id = blob_store.put_text(value) if value else None
+        self._result_text = (self.result_blob_id, value) if value else None
+
+    @property
+    def diff(self):
+        """Full git diff, reassembled from the per-file blobs."""
+        from apps.attempts.services import blob_store
+
+        files = list(self.diff_files.all())
+        texts = blob_store.get_many_text([f.blob_id for f in files])
+        return ''.join(texts[f.blob_id] for f in files)
+
     @property
     def duration(self):
         """Calculate execution duration in seconds."""
@@ -91,22 +212,65 @@ class AttemptEvent(models.Model):
         related_name='events'
     )
 
+    # Per-attempt sequence number; gives events an exact order even when
+    # many share a timestamp. Events from before sequencing have seq 0.
+    seq = models.PositiveIntegerField(default=0)
     event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
     message = models.TextField()
     metadata = models.JSONField(default=dict, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event is emitted, not when its batch is written
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'attempt_events'
-        ordering = ['timestamp']
+        ordering = ['seq', 'timestamp']
         indexes = [
             models.Index(fields=['attempt', 'timestamp']),
+            models.Index(fields=['attempt', 'seq']),
+            GinIndex(event_search_vector(), name='attempt_events_search_idx'),
         ]
 
     def __str__(self):
         return f"[{self.event_type}] {self.message[:50]}"
 
 
+class AttemptEventArchive(models.Model):
+    """
+    One month of an attempt's events, archived to the blob store.
+
+    The archival job moves events older than the retention period out of
+    attempt_events into zstd-compressed NDJSON blobs (one per attempt and
+    month); readers merge archives and live rows back into one log.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    attempt = models.ForeignKey(
+        Attempt,
+        on_delete=models.CASCADE,
+        related_name='event_archives'
+    )
+    month = models.DateField(help_text="First day of the archived month")
+    first_seq = models.PositiveIntegerField()
+    last_seq = models.PositiveIntegerField()
+    event_count = models.PositiveIntegerField()
+    blob = models.ForeignKey(
+        'Blob',
+        on_delete=models.PROTECT,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'attempt_event_archives'
+        ordering = ['month', 'first_seq']
+        indexes = [
+            models.Index(fields=['attempt', 'month']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"Events {self.first_seq}-{self.last_seq} of attempt {self.attempt_id} ({self.month:%Y-%m})"
+
+
 class AttemptGateResult(models.Model):
     """
     Results from quality gates (tests, linting).
@@ -132,7 +296,13 @@ class AttemptGateResult(models.Model):
 
     gate_type = models.CharField(max_length=50, choices=GATE_TYPES)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES)
-    output = models.TextField(blank=True)
+    output_blob = models.ForeignKey(
+        'Blob',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
     duration_seconds = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -145,3 +315,116 @@ class AttemptGateResult(models.Model):
 
     def __str__(self):
         return f"{self.gate_type} - {self.status}"
+
+    @property
+    def output(self):
+        """Gate output, read from the blob store."""
+        from apps.attempts.services import blob_store
+
+        return blob_store.get_text(self.output_blob_id) if self.output_blob_id else ''
+
+    @output.setter
+    def output(self, value):
+        from apps.attempts.services import blob_store
+
+        self.output_blob_id = blob_store.put_text(value) if value else None
+
+
+class ExecutionSlot(models.Model):
+    """
+    A leasable slot in an execution concurrency pool.
+
+    Pools are 'global', 'project:<id>' and 'role:<agent_role>'. A running
+    attempt holds one slot in every pool that applies to it. Slots whose
+    lease has expired (no heartbeat) are free to be taken again.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pool = models.CharField(max_length=100)
+    index = models.PositiveIntegerField()
+
+    # Current lease holder
+    attempt = models.ForeignKey(
+        Attempt,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='execution_slots'
+    )
+    expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'execution_slots'
+        ordering = ['pool', 'index']
+        constraints = [
+            models.UniqueConstraint(fields=['pool', 'index'], name='unique_slot_per_pool'),
+        ]
+        indexes = [
+            models.Index(fields=['pool', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.pool}#{self.index} -> {self.attempt_id or 'free'}"
+
+
+class AttemptDiffFile(models.Model):
+    """
+    One file's section of an attempt's diff.
+
+    Each section is its own blob, so retries that touch the same files the
+    same way share storage, and one file can be read without the rest.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    attempt = models.ForeignKey(
+        Attempt,
+        on_delete=models.CASCADE,
+        related_name='diff_files'
+    )
+    position = models.PositiveIntegerField()
+    path = models.CharField(max_length=1024)
+    old_path = models.CharField(max_length=1024, blank=True)
+    additions = models.PositiveIntegerField(default=0)
+    deletions = models.PositiveIntegerField(default=0)
+    blob = models.ForeignKey(
+        'Blob',
+        on_delete=models.PROTECT,
+        related_name='+'
+    )
+
+    class Meta:
+        db_table = 'attempt_diff_files'
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'position'], name='unique_attempt_diff_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.path} (+{self.additions} -{self.deletions})"
+
+
+class Blob(models.Model):
+    """
+    Compressed, content-addressed blob for large text (diffs, outputs).
+
+    Keyed by the SHA-256 of the uncompressed content, so identical content
+    is stored once. The compressed bytes live in `data` (database backend)
+    or in a file named after the hash (filesystem backend).
+    """
+    BACKENDS = [
+        ('filesystem', 'Filesystem'),
+        ('database', 'Database'),
+    ]
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField(help_text="Uncompressed size in bytes")
+    compressed_size = models.BigIntegerField()
+    codec = models.CharField(max_length=16, default='zstd')
+    backend = models.CharField(max_length=20, choices=BACKENDS)
+    data = models.BinaryField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'blobs'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
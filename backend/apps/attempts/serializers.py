@@ -5,21 +5,63 @@ from .models import Attempt, AttemptEvent, AttemptGateResult
 class AttemptEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = AttemptEvent
-        fields = ['id', 'event_type', 'message', 'metadata', 'timestamp']
+        fields = ['id', 'seq', 'event_type', 'message', 'metadata', 'timestamp']
 
 
 class AttemptGateResultSerializer(serializers.ModelSerializer):
+    output = serializers.CharField(read_only=True)
+
     class Meta:
         model = AttemptGateResult
         fields = ['id', 'gate_type', 'status', 'output', 'duration_seconds', 'created_at']
 
 
-class AttemptSerializer(serializers.ModelSerializer):
+def requested_fields(request, param: str) -> set:
+    """Parse a comma-separated field list (e.g. ?fields=, ?expand=) from a request."""
+    if request is None:
+        return set()
+    value = request.query_params.get(param, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets for read serializers.
+
+    ?fields=a,b limits the output to those fields. Fields listed in
+    Meta.expandable_fields are left out unless named in ?expand=x,y.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        only = requested_fields(request, 'fields')
+        expand = requested_fields(request, 'expand')
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+
+        for name in list(self.fields):
+            if name in expandable:
+                keep = name in expand
+            else:
+                keep = not only or name in only
+            if not keep:
+                self.fields.pop(name)
+
+
+class AttemptSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Attempt without its heavy fields, for list views.
+
+    diff, result, events and gate_results are only included when asked
+    for with ?expand=; prefer the events/diff endpoints, which paginate.
+    """
     task_title = serializers.CharField(source='task.title', read_only=True)
     project_id = serializers.UUIDField(source='task.project_id', read_only=True)
     project_name = serializers.CharField(source='task.project.name', read_only=True)
     duration = serializers.FloatField(read_only=True)
-    events = AttemptEventSerializer(many=True, read_only=True)
+    result = serializers.CharField(read_only=True, allow_null=True)
+    diff = serializers.CharField(read_only=True)
+    events = serializers.SerializerMethodField()
     gate_results = AttemptGateResultSerializer(many=True, read_only=True)
 
     class Meta:
@@ -47,6 +89,25 @@ class AttemptSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = ['result', 'diff', 'events', 'gate_results']
+
+    def get_events(self, attempt):
+        """Archived and live events in seq order, as served by the events endpoint."""
+        from .services.event_archive import read_archive
+        from .services.event_sink import serialize_event
+
+        archived = [event for archive in attempt.event_archives.all() for event in read_archive(archive)]
+        return archived + [serialize_event(event) for event in attempt.events.all()]
+
+
+class AttemptSerializer(AttemptSummarySerializer):
+    """
+    Attempt for detail views. Events and the diff are paged from their own
+    endpoints (or included with ?expand=events,diff).
+    """
+
+    class Meta(AttemptSummarySerializer.Meta):
+        expandable_fields = ['diff', 'events']
 
 
 class AttemptCreateSerializer(serializers.Serializer):
@@ -1,3 +1,13 @@
+from .blob_store import BlobNotFound, BlobStore, blob_store, save_attempt_diff
+from .diff_parser import split_diff_files, split_hunks
+from .duration_estimator import DurationEstimator
+from .event_archive import AttemptEventArchiver, AttemptEventLog
+from .event_sink import AttemptEventSink, event_sink, serialize_event
 from .execution_coordinator import ExecutionCoordinator
+from .slot_leasing import SlotLeaseManager, SlotUnavailable
 
-__all__ = ['ExecutionCoordinator']
+__all__ = [
+    'AttemptEventArchiver', 'AttemptEventLog', 'AttemptEventSink', 'BlobNotFound', 'BlobStore', 'DurationEstimator', 'ExecutionCoordinator',
+    'SlotLeaseManager', 'SlotUnavailable', 'blob_store', 'event_sink', 'save_attempt_diff',
+    'serialize_event', 'split_diff_files', 'split_hunks'
+]
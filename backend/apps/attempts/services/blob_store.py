@@ -0,0 +1,396 @@
+"""
+Blob Store - Compressed, content-addressed storage for large text.
+
+Diffs, agent output and gate logs can be megabytes each and retries tend
+to produce the same content again. Blobs are zstd-compressed and keyed by
+the SHA-256 of their uncompressed bytes, so writing content that already
+exists is a no-op. Blob rows always live in the database; the compressed
+bytes go to the backend configured with BLOB_STORE_BACKEND:
+
+- 'filesystem': one file per blob under BLOB_STORE_ROOT
+- 'database': the blob row's own bytea column
+
+Each blob records its backend, so changing the setting only affects new
+blobs. Unreferenced blobs, and files left behind by rolled back
+writes, are removed by collect_garbage().
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CODEC = 'zstd'
+
+
+class BlobNotFound(Exception):
+    """Raised when a blob's row or bytes are missing."""
+
+    def __init__(self, sha256: str):
+        self.sha256 = sha256
+        super().__init__(f"Blob {sha256} not found")
+
+
+class FileSystemBlobBackend:
+    """Stores compressed blobs as files, fanned out by hash prefix."""
+
+    name = 'filesystem'
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / f'{sha256}.zst'
+
+    def write(self, blob, data: bytes) -> None:
+        path = self.path(blob.sha256)
+        if path.exists():
+            try:
+                # Left by a rolled back write: keep the orphan sweep off it
+                os.utime(path)
+                return
+            except FileNotFoundError:
+                pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def read(self, blob) -> bytes:
+        try:
+            return self.path(blob.sha256).read_bytes()
+        except FileNotFoundError:
+            raise BlobNotFound(blob.sha256)
+
+    def open(self, blob) -> BinaryIO:
+        try:
+            return open(self.path(blob.sha256), 'rb')
+        except FileNotFoundError:
+            raise BlobNotFound(blob.sha256)
+
+    def delete(self, blob) -> None:
+        try:
+            self.path(blob.sha256).unlink()
+        except FileNotFoundError:
+            pass
+
+    def iter_files(self) -> Iterable[Tuple[Optional[str], Path]]:
+        """Yield (sha256, path) of every stored file; sha256 is None for leftover temp files."""
+        if not self.root.is_dir():
+            return
+        for path in self.root.glob('*/*/*'):
+            if path.name.startswith('.tmp-'):
+                yield None, path
+            elif path.suffix == '.zst':
+                yield path.stem, path
+
+
+class DatabaseBlobBackend:
+    """Stores compressed blobs in the blob row itself."""
+
+    name = 'database'
+
+    def write(self, blob, data: bytes) -> None:
+        blob.data = data
+
+    def read(self, blob) -> bytes:
+        if blob.data is None:
+            raise BlobNotFound(blob.sha256)
+        return bytes(blob.data)
+
+    def open(self, blob) -> BinaryIO:
+        return io.BytesIO(self.read(blob))
+
+    def delete(self, blob) -> None:
+        pass
+
+
+class BlobStore:
+    """
+    Content-addressed blob storage.
+
+    Configured via settings:
+    - BLOB_STORE_BACKEND: 'filesystem' or 'database' for new blobs
+    - BLOB_STORE_ROOT: directory of the filesystem backend
+    - BLOB_ZSTD_LEVEL: zstd compression level
+    - BLOB_GC_MIN_AGE: seconds an unreferenced blob is kept (it may be
+      about to be referenced by a transaction in flight)
+    """
+
+    def __init__(self, backend: Optional[str] = None, blob_model=None):
+        """
+        Args:
+            backend: Backend for new blobs (default: BLOB_STORE_BACKEND)
+            blob_model: Blob model class; migrations pass their historical model
+        """
+        self.backend_name = backend or getattr(settings, 'BLOB_STORE_BACKEND', 'filesystem')
+        self.level = getattr(settings, 'BLOB_ZSTD_LEVEL', 9)
+        self._blob_model = blob_model
+        self._backends = {
+            'filesystem': FileSystemBlobBackend(
+                getattr(settings, 'BLOB_STORE_ROOT', str(Path(settings.BASE_DIR) / 'blobs'))
+            ),
+            'database': DatabaseBlobBackend(),
+        }
+        if self.backend_name not in self._backends:
+            raise ValueError(f"Unknown blob store backend '{self.backend_name}'")
+
+    @property
+    def model(self):
+        if self._blob_model is None:
+            from apps.attempts.models import Blob
+            self._blob_model = Blob
+        return self._blob_model
+
+    def put(self, content: bytes) -> str:
+        """
+        Store content and get its hash.
+
+        Args:
+            content: Uncompressed bytes
+
+        Returns:
+            SHA-256 hex digest identifying the blob
+        """
+        import zstandard
+
+        sha256 = hashlib.sha256(content).hexdigest()
+        # Existing content: refresh its age so garbage collection leaves it
+        # alone until the caller's reference has committed. The row lock
+        # this takes also makes a collection already deleting it wait or
+        # finish first (then the blob is stored again below).
+        if self.model.objects.filter(sha256=sha256).update(created_at=timezone.now()):
+            return sha256
+
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(content)
+        backend = self._backends[self.backend_name]
+        blob = self.model(
+            sha256=sha256,
+            size=len(content),
+            compressed_size=len(compressed),
+            codec=CODEC,
+            backend=backend.name
+        )
+        backend.write(blob, compressed)
+        try:
+            with transaction.atomic():
+                blob.save(force_insert=True)
+        except IntegrityError:
+            # Stored concurrently by someone else; same content, same hash
+            pass
+        return sha256
+
+    def put_text(self, text: Optional[str]) -> Optional[str]:
+        """Store text as UTF-8; returns None for None."""
+        if text is None:
+            return None
+        return self.put(text.encode('utf-8'))
+
+    def get(self, sha256: str) -> bytes:
+        """
+        Get a blob's uncompressed content.
+
+        Raises:
+            BlobNotFound: If the blob doesn't exist
+        """
+        return self.get_many([sha256])[sha256]
+
+    def get_text(self, sha256: str) -> str:
+        return self.get(sha256).decode('utf-8', errors='replace')
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, bytes]:
+        """Get several blobs with one query; returns {sha256: content}."""
+        import zstandard
+
+        wanted = set(hashes)
+        if not wanted:
+            return {}
+        blobs = {blob.sha256: blob for blob in self.model.objects.filter(sha256__in=wanted)}
+        missing = wanted - set(blobs)
+        if missing:
+            raise BlobNotFound(next(iter(missing)))
+
+        decompressor = zstandard.ZstdDecompressor()
+        result = {}
+        for sha256, blob in blobs.items():
+            compressed = self._backends[blob.backend].read(blob)
+            result[sha256] = decompressor.decompress(compressed, max_output_size=blob.size)
+        return result
+
+    def open(self, sha256: str) -> BinaryIO:
+        """
+        Open a blob for streaming reads of its uncompressed content.
+
+        Raises:
+            BlobNotFound: If the blob doesn't exist
+        """
+        import zstandard
+
+        blob = self.model.objects.filter(sha256=sha256).first()
+        if blob is None:
+            raise BlobNotFound(sha256)
+        raw = self._backends[blob.backend].open(blob)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+
+    def get_many_text(self, hashes: Iterable[str]) -> Dict[str, str]:
+        return {
+            sha256: content.decode('utf-8', errors='replace')
+            for sha256, content in self.get_many(hashes).items()
+        }
+
+    def collect_garbage(self, min_age: Optional[int] = None) -> int:
+        """
+        Delete blobs no attempt, diff file, gate result or event archive
+        refers to.
+
+        Args:
+            min_age: Only delete blobs older than this many seconds
+                (default: BLOB_GC_MIN_AGE)
+
+        Returns:
+            Number of blobs deleted
+        """
+        from apps.attempts.models import (
+            Attempt, AttemptDiffFile, AttemptEventArchive, AttemptGateResult
+        )
+
+        if min_age is None:
+            min_age = getattr(settings, 'BLOB_GC_MIN_AGE', 3600)
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+
+        unreferenced = self.model.objects.filter(created_at__lt=cutoff).exclude(
+            Exists(Attempt.objects.filter(result_blob=OuterRef('pk')))
+        ).exclude(
+            Exists(AttemptDiffFile.objects.filter(blob=OuterRef('pk')))
+        ).exclude(
+            Exists(AttemptGateResult.objects.filter(output_blob=OuterRef('pk')))
+        ).exclude(
+            Exists(AttemptEventArchive.objects.filter(blob=OuterRef('pk')))
+        )
+
+        deleted = 0
+        candidates = list(unreferenced.values_list('sha256', flat=True))
+        for sha256 in candidates:
+            try:
+                with transaction.atomic():
+                    # Checked again under the row lock: since the candidate
+                    # list was built, put() may have reused it
+                    blob = unreferenced.select_for_update().filter(sha256=sha256).defer('data').first()
+                    if blob is None:
+                        continue
+                    self.model.objects.filter(sha256=sha256).delete()
+                    # Bytes go before the commit; put() waiting on the lock
+                    # then finds no row and stores the content anew
+                    self._backends[blob.backend].delete(blob)
+            except ProtectedError:
+                # Referenced since the check above
+                continue
+            deleted += 1
+        if deleted:
+            logger.info(f"Deleted {deleted} unreferenced blobs")
+
+        swept = self._sweep_orphan_files(cutoff)
+        if swept:
+            logger.info(f"Deleted {swept} blob files without a row")
+        return deleted
+
+    def _sweep_orphan_files(self, cutoff) -> int:
+        """
+        Delete filesystem blobs whose row was never committed.
+
+        put() writes the file before inserting the row inside the
+        caller's transaction, so a rollback leaves the file behind. Files
+        younger than the cutoff may belong to a transaction in flight.
+        """
+        backend = self._backends['filesystem']
+        cutoff_ts = cutoff.timestamp()
+        swept = 0
+        batch: Dict[str, Path] = {}
+
+        def is_old(path: Path) -> bool:
+            try:
+                return path.stat().st_mtime < cutoff_ts
+            except FileNotFoundError:
+                return False
+
+        def sweep(batch: Dict[str, Path]) -> int:
+            known = set(self.model.objects.filter(sha256__in=list(batch)).values_list('sha256', flat=True))
+            count = 0
+            for sha256, path in batch.items():
+                # Checked again: put() touches a file it is about to reuse
+                if sha256 not in known and is_old(path):
+                    path.unlink(missing_ok=True)
+                    count += 1
+            return count
+
+        for sha256, path in backend.iter_files():
+            if not is_old(path):
+                continue
+            if sha256 is None:
+                path.unlink(missing_ok=True)
+                swept += 1
+                continue
+            batch[sha256] = path
+            if len(batch) >= 500:
+                swept += sweep(batch)
+                batch = {}
+        if batch:
+            swept += sweep(batch)
+        return swept
+
+
+def save_attempt_diff(attempt, diff: str, store: Optional[BlobStore] = None, diff_file_model=None) -> None:
+    """
+    Replace an attempt's diff with `diff`, stored as one blob per file.
+
+    Args:
+        attempt: Saved Attempt
+        diff: Unified diff text
+        store: Blob store to use (default: the module's blob_store)
+        diff_file_model: AttemptDiffFile class; migrations pass their historical model
+    """
+    from .diff_parser import split_diff_files
+
+    store = store or blob_store
+    if diff_file_model is None:
+        from apps.attempts.models import AttemptDiffFile
+        diff_file_model = AttemptDiffFile
+
+    files = split_diff_files(diff)
+    if not files and diff and diff.strip():
+        # Not a git diff; keep it whole rather than lose it
+        files = [{'path': '', 'old_path': '', 'additions': 0, 'deletions': 0, 'diff': diff}]
+
+    diff_file_model.objects.filter(attempt_id=attempt.pk).delete()
+    diff_file_model.objects.bulk_create([
+        diff_file_model(
+            attempt_id=attempt.pk,
+            position=position,
+            path=file['path'][:1024],
+            old_path=file['old_path'][:1024],
+            additions=file['additions'],
+            deletions=file['deletions'],
+            blob_id=store.put_text(file['diff'])
+        )
+        for position, file in enumerate(files)
+    ])
+
+
+blob_store = BlobStore()
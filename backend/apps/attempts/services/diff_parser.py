@@ -0,0 +1,86 @@
+"""
+Diff Parser - Split unified git diffs into per-file sections.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+FILE_HEADER = re.compile(r'^diff --git a/(?P<old>.+?) b/(?P<new>.+)$')
+HUNK_HEADER = re.compile(r'^@@ -(?P<old_start>\d+)(?:,(?P<old_lines>\d+))? \+(?P<new_start>\d+)(?:,(?P<new_lines>\d+))? @@')
+
+
+def split_diff_files(diff: str) -> List[Dict[str, Any]]:
+    """
+    Split a unified diff (as produced by `git diff`) into one entry per file.
+
+    Args:
+        diff: Full diff text
+
+    Returns:
+        List of dicts with 'path', 'old_path', 'additions', 'deletions' and
+        'diff' (the file's section, header included), in diff order
+    """
+    files: List[Dict[str, Any]] = []
+    current = None
+
+    for line in (diff or '').splitlines(keepends=True):
+        header = FILE_HEADER.match(line.rstrip('\n'))
+        if header:
+            current = {
+                'path': header.group('new'),
+                'old_path': header.group('old'),
+                'additions': 0,
+                'deletions': 0,
+                'lines': [line],
+            }
+            files.append(current)
+            continue
+        if current is None:
+            # Text before the first file header (e.g. a commit message)
+            continue
+        current['lines'].append(line)
+        if line.startswith('+') and not line.startswith('+++'):
+            current['additions'] += 1
+        elif line.startswith('-') and not line.startswith('---'):
+            current['deletions'] += 1
+
+    for entry in files:
+        entry['diff'] = ''.join(entry.pop('lines'))
+    return files
+
+
+def split_hunks(file_diff: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Split one file's diff section into its header and hunks.
+
+    Args:
+        file_diff: A single file's diff (as returned by split_diff_files)
+
+    Returns:
+        Tuple of (header text before the first hunk, list of hunks). Each
+        hunk has 'header', 'old_start', 'old_lines', 'new_start',
+        'new_lines' and 'diff' (the hunk text, header line included)
+    """
+    header_lines: List[str] = []
+    hunks: List[Dict[str, Any]] = []
+    current = None
+
+    for line in (file_diff or '').splitlines(keepends=True):
+        match = HUNK_HEADER.match(line)
+        if match:
+            current = {
+                'header': line.rstrip('\n'),
+                'old_start': int(match.group('old_start')),
+                'old_lines': int(match.group('old_lines') or 1),
+                'new_start': int(match.group('new_start')),
+                'new_lines': int(match.group('new_lines') or 1),
+                'lines': [line],
+            }
+            hunks.append(current)
+        elif current is None:
+            header_lines.append(line)
+        else:
+            current['lines'].append(line)
+
+    for hunk in hunks:
+        hunk['diff'] = ''.join(hunk.pop('lines'))
+    return ''.join(header_lines), hunks
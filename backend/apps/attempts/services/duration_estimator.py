@@ -0,0 +1,250 @@
+"""
+Duration Estimator - Predicts task durations from attempt history.
+
+Learns robust duration percentiles (p50/p90) from completed attempts,
+bucketed by project, agent role and task size, and combines them with the
+dependency graph to estimate when a project will finish.
+
+Fitting reads up to DURATION_SAMPLE_SIZE attempts, so the fitted
+percentiles are shared through the read cache for DURATION_MODEL_TTL
+seconds; estimators used by polled endpoints only evaluate them.
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db.models.functions import Length
+from django.utils import timezone
+from apps.tasks.utils import DependencyGraph
+
+# Task size buckets by description + acceptance criteria length (characters)
+SIZE_BUCKETS = [
+    (500, 'S'),
+    (2000, 'M'),
+]
+LARGE_BUCKET = 'L'
+
+# Minimum samples before a bucket is trusted over its coarser fallback
+MIN_SAMPLES = 3
+
+# Attempt statuses that ran to completion (failed runs are usually cut short)
+COMPLETED_STATUSES = ['SUCCESS', 'APPROVED', 'REJECTED']
+
+# Task statuses whose agent work is already finished
+WORK_DONE_STATUSES = {'DONE', 'IN_REVIEW'}
+
+
+def task_size(description_length: int, acceptance_criteria) -> int:
+    """Get a task's size in characters of description and acceptance criteria."""
+    criteria = acceptance_criteria if isinstance(acceptance_criteria, list) else []
+    return (description_length or 0) + sum(len(str(c)) for c in criteria)
+
+
+def size_bucket(size: int) -> str:
+    """Map a task size to its bucket label."""
+    for limit, label in SIZE_BUCKETS:
+        if size < limit:
+            return label
+    return LARGE_BUCKET
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Linear-interpolated percentile of a list of values.
+
+    Args:
+        values: Non-empty list of samples
+        q: Quantile between 0 and 1
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class DurationEstimator:
+    """
+    Estimates task durations from completed attempts.
+
+    Predictions fall back from the most specific bucket with enough samples
+    to the least specific one:
+    project+role+size -> project+role -> role+size -> role -> global -> default
+    """
+
+    def __init__(self, sample_size: Optional[int] = None):
+        """
+        Args:
+            sample_size: Number of most recent completed attempts to learn from
+        """
+        self.sample_size = sample_size or getattr(settings, 'DURATION_SAMPLE_SIZE', 2000)
+        self.default_duration = float(getattr(settings, 'DEFAULT_TASK_DURATION_SECONDS', 600))
+        self.model_ttl = getattr(settings, 'DURATION_MODEL_TTL', 600)
+        self._stats: Optional[Dict[Tuple, Dict[str, float]]] = None
+
+    def load(self) -> 'DurationEstimator':
+        """Use the shared fitted model, fitting it if it has expired."""
+        from apps.projects.read_cache import read_cache
+
+        self._stats = read_cache.get_or_build(
+            'duration_model', (self.sample_size,),
+            lambda: self.fit()._stats,
+            timeout=self.model_ttl
+        )
+        return self
+
+    def fit(self) -> 'DurationEstimator':
+        """Learn duration percentiles from recent completed attempts."""
+        from apps.attempts.models import Attempt
+
+        rows = Attempt.objects.filter(
+            status__in=COMPLETED_STATUSES,
+            started_at__isnull=False,
+            completed_at__isnull=False
+        ).annotate(
+            description_length=Length('task__description')
+        ).order_by('-completed_at').values_list(
+            'agent_role', 'task__project_id', 'task__acceptance_criteria',
+            'started_at', 'completed_at', 'description_length'
+        )[:self.sample_size]
+
+        samples: Dict[Tuple, List[float]] = {}
+        for role, project_id, criteria, started_at, completed_at, description_length in rows:
+            duration = (completed_at - started_at).total_seconds()
+            if duration < 0:
+                continue
+            bucket = size_bucket(task_size(description_length, criteria))
+            project_id = str(project_id)
+            for key in (
+                ('project', project_id, role, bucket),
+                ('project', project_id, role),
+                ('role', role, bucket),
+                ('role', role),
+                ('global',),
+            ):
+                samples.setdefault(key, []).append(duration)
+
+        self._stats = {
+            key: {
+                'p50': percentile(values, 0.5),
+                'p90': percentile(values, 0.9),
+                'samples': len(values),
+            }
+            for key, values in samples.items()
+        }
+        return self
+
+    @property
+    def stats(self) -> Dict[Tuple, Dict[str, float]]:
+        if self._stats is None:
+            self.load()
+        return self._stats
+
+    def predict(self, project_id: str, agent_role: str, size: int) -> Dict[str, Any]:
+        """
+        Predict the duration of a task.
+
+        Returns:
+            Dict with p50 and p90 seconds, sample count and the bucket used
+        """
+        bucket = size_bucket(size)
+        project_id = str(project_id)
+        candidates = [
+            ('project_role_size', ('project', project_id, agent_role, bucket)),
+            ('project_role', ('project', project_id, agent_role)),
+            ('role_size', ('role', agent_role, bucket)),
+            ('role', ('role', agent_role)),
+            ('global', ('global',)),
+        ]
+        for basis, key in candidates:
+            stat = self.stats.get(key)
+            if stat and stat['samples'] >= MIN_SAMPLES:
+                return {
+                    'p50': round(stat['p50'], 1),
+                    'p90': round(stat['p90'], 1),
+                    'samples': stat['samples'],
+                    'basis': basis,
+                }
+
+        return {
+            'p50': self.default_duration,
+            'p90': self.default_duration,
+            'samples': 0,
+            'basis': 'default',
+        }
+
+    def estimate_tasks(self, project_id: str, tasks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Predict durations for a list of task dicts.
+
+        Each task needs 'id', 'agent_role' and 'size'.
+
+        Returns:
+            Dict mapping task ID to prediction
+        """
+        return {
+            task['id']: self.predict(project_id, task['agent_role'], task.get('size', 0))
+            for task in tasks
+        }
+
+    def remaining_work(
+        self,
+        tasks: List[Dict[str, Any]],
+        estimates: Dict[str, Dict[str, Any]],
+        elapsed: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """
+        Get the expected remaining seconds of agent work per task.
+
+        Finished work counts as 0 and running tasks are credited with the
+        time they have already spent.
+
+        Args:
+            tasks: Task dicts with 'id' and 'status'
+            estimates: Predictions from estimate_tasks
+            elapsed: Seconds already spent on running tasks, by task ID
+        """
+        elapsed = elapsed or {}
+        remaining = {}
+        for task in tasks:
+            task_id = task['id']
+            if task.get('status') in WORK_DONE_STATUSES:
+                remaining[task_id] = 0.0
+                continue
+            expected = estimates[task_id]['p50']
+            if task.get('status') == 'IN_PROGRESS':
+                expected = max(expected - elapsed.get(task_id, 0.0), 0.0)
+            remaining[task_id] = expected
+        return remaining
+
+    def project_eta(
+        self,
+        graph: DependencyGraph,
+        remaining: Dict[str, float],
+        slots: int
+    ) -> Dict[str, Any]:
+        """
+        Estimate time to finish all remaining agent work.
+
+        The estimate is the larger of the critical path and the total
+        remaining work spread over the available slots, the standard lower
+        bound for list scheduling.
+
+        Args:
+            graph: Project dependency graph
+            remaining: Remaining seconds per task (from remaining_work)
+            slots: Number of tasks that can run concurrently
+        """
+        slots = max(slots, 1)
+        ranks = graph.get_upward_ranks(remaining)
+        critical_path = max(ranks.values(), default=0.0)
+        total_work = sum(remaining.values())
+        eta_seconds = max(critical_path, total_work / slots)
+
+        return {
+            'remaining_seconds': round(eta_seconds),
+            'critical_path_seconds': round(critical_path),
+            'total_work_seconds': round(total_work),
+            'slots': slots,
+            'estimated_completion': (timezone.now() + timedelta(seconds=eta_seconds)).isoformat(),
+            'reliable': not graph.has_cycles(),
+        }
@@ -0,0 +1,255 @@
+"""
+Event Archive - Monthly rollover of attempt events to compressed NDJSON.
+
+attempt_events only keeps recent events. Once a calendar month is older
+than ATTEMPT_EVENT_RETENTION_DAYS, the archiver exports each finished
+attempt's events of that month as one NDJSON blob (zstd, via the blob
+store), records an AttemptEventArchive row and deletes the rows, all in
+one transaction. Archives older than ATTEMPT_EVENT_ARCHIVE_RETENTION_DAYS
+are dropped for good (0 keeps them forever).
+
+AttemptEventLog reads an attempt's events back as one sequence: archived
+months first, streamed from their blobs, then live rows. Callers don't
+need to know which events were archived.
+"""
+import io
+import json
+import logging
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from apps.attempts.models import Attempt, AttemptEvent, AttemptEventArchive
+from .blob_store import blob_store
+from .event_sink import serialize_event
+
+logger = logging.getLogger(__name__)
+
+# Attempts that may still emit events are never archived
+ACTIVE_STATUSES = ['PENDING', 'QUEUED', 'RUNNING']
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+class AttemptEventArchiver:
+    """
+    Archives old attempt events and enforces archive retention.
+
+    Configured via settings:
+    - ATTEMPT_EVENT_RETENTION_DAYS: days events stay in attempt_events
+    - ATTEMPT_EVENT_ARCHIVE_RETENTION_DAYS: days archives are kept (0 = forever)
+    """
+
+    def __init__(self, retention_days: Optional[int] = None, archive_retention_days: Optional[int] = None):
+        self.retention_days = (
+            retention_days if retention_days is not None
+            else getattr(settings, 'ATTEMPT_EVENT_RETENTION_DAYS', 30)
+        )
+        self.archive_retention_days = (
+            archive_retention_days if archive_retention_days is not None
+            else getattr(settings, 'ATTEMPT_EVENT_ARCHIVE_RETENTION_DAYS', 0)
+        )
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the oldest month that stays live; everything before it is archived."""
+        now = now or timezone.now()
+        first_kept = month_start((now - timedelta(days=self.retention_days)).date())
+        return datetime.combine(first_kept, dt_time.min, tzinfo=dt_timezone.utc)
+
+    def archive(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Archive all whole months older than the retention period.
+
+        Returns:
+            dict with the number of archives written and events moved
+        """
+        cutoff = self.cutoff(now)
+        chunks = AttemptEvent.objects.filter(
+            timestamp__lt=cutoff
+        ).exclude(
+            attempt__status__in=ACTIVE_STATUSES
+        ).annotate(
+            month=TruncMonth('timestamp')
+        ).values_list('attempt_id', 'month').distinct().order_by('month')
+
+        archives = events = 0
+        for attempt_id, month in chunks:
+            try:
+                archived = self.archive_month(attempt_id, month.date() if isinstance(month, datetime) else month)
+            except Exception as e:
+                logger.exception(f"Could not archive events of attempt {attempt_id} for {month}: {e}")
+                continue
+            if archived:
+                archives += 1
+                events += archived
+        return {'archives': archives, 'events': events}
+
+    def archive_month(self, attempt_id, month: date) -> int:
+        """
+        Move one attempt's events of one month into an archive.
+
+        Returns:
+            Number of events archived
+        """
+        start = datetime.combine(month, dt_time.min, tzinfo=dt_timezone.utc)
+        end = datetime.combine(next_month(month), dt_time.min, tzinfo=dt_timezone.utc)
+
+        with transaction.atomic():
+            # Same lock the event sink takes, so no batch is written meanwhile
+            if not Attempt.objects.select_for_update().filter(id=attempt_id).exists():
+                return 0
+            rows = AttemptEvent.objects.filter(
+                attempt_id=attempt_id,
+                timestamp__gte=start,
+                timestamp__lt=end
+            ).order_by('seq', 'timestamp')
+            events = [serialize_event(event) for event in rows]
+            if not events:
+                return 0
+
+            ndjson = ''.join(json.dumps(event, default=str) + '\n' for event in events)
+            AttemptEventArchive.objects.create(
+                attempt_id=attempt_id,
+                month=month,
+                first_seq=min(event['seq'] for event in events),
+                last_seq=max(event['seq'] for event in events),
+                event_count=len(events),
+                blob_id=blob_store.put_text(ndjson)
+            )
+            AttemptEvent.objects.filter(id__in=[event['id'] for event in events]).delete()
+        return len(events)
+
+    def purge(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete archives past the archive retention period.
+        Their blobs are removed by the blob garbage collector.
+
+        Returns:
+            Number of archives deleted
+        """
+        if not self.archive_retention_days:
+            return 0
+        now = now or timezone.now()
+        cutoff = month_start((now - timedelta(days=self.archive_retention_days)).date())
+        deleted, _ = AttemptEventArchive.objects.filter(month__lt=cutoff).delete()
+        return deleted
+
+
+def read_archive(archive: AttemptEventArchive) -> Iterator[Dict[str, Any]]:
+    """Stream an archive's events, decompressing as it goes."""
+    with blob_store.open(archive.blob_id) as stream:
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+
+class _Segment:
+    """A run of the log: one archive, or the live rows."""
+
+    def __init__(self, count: Callable[[], int], read: Callable[[int, Optional[int]], List[Dict[str, Any]]],
+                 iterate: Callable[[], Iterator[Dict[str, Any]]]):
+        self._count = count
+        self._size: Optional[int] = None
+        self.read = read
+        self.iterate = iterate
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._size = self._count()
+        return self._size
+
+
+class AttemptEventLog:
+    """
+    An attempt's events in order, across archives and attempt_events.
+
+    Supports len(), slicing and iteration, so it can be handed to a
+    paginator. Only the archives a slice touches are decompressed.
+    """
+
+    def __init__(self, attempt_id, after_seq: Optional[int] = None):
+        self.attempt_id = attempt_id
+        self.after_seq = after_seq
+        self._segments = self._build_segments()
+
+    def _build_segments(self) -> List[_Segment]:
+        segments = []
+        archives = AttemptEventArchive.objects.filter(attempt_id=self.attempt_id)
+        if self.after_seq is not None:
+            archives = archives.filter(last_seq__gt=self.after_seq)
+        for archive in archives.order_by('month', 'first_seq'):
+            segments.append(self._archive_segment(archive))
+
+        live = AttemptEvent.objects.filter(attempt_id=self.attempt_id).order_by('seq', 'timestamp')
+        if self.after_seq is not None:
+            live = live.filter(seq__gt=self.after_seq)
+        segments.append(_Segment(
+            count=live.count,
+            read=lambda start, stop: [serialize_event(e) for e in live[start:stop]],
+            iterate=lambda: (serialize_event(e) for e in live.iterator(chunk_size=500))
+        ))
+        return segments
+
+    def _archive_segment(self, archive: AttemptEventArchive) -> _Segment:
+        after_seq = self.after_seq
+
+        def iterate():
+            for event in read_archive(archive):
+                if after_seq is None or event['seq'] > after_seq:
+                    yield event
+
+        def count():
+            if after_seq is None or archive.first_seq > after_seq:
+                return archive.event_count
+            # Only partly after after_seq; count by reading it
+            return sum(1 for _ in iterate())
+
+        return _Segment(
+            count=count,
+            read=lambda start, stop: list(islice(iterate(), start, stop)),
+            iterate=iterate
+        )
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    def count(self) -> int:
+        return len(self)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for segment in self._segments:
+            yield from segment.iterate()
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            if index < 0:
+                index += len(self)
+            items = self[index:index + 1] if index >= 0 else []
+            if not items:
+                raise IndexError(index)
+            return items[0]
+
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            raise ValueError('AttemptEventLog does not support slice steps')
+
+        result: List[Dict[str, Any]] = []
+        offset = 0
+        for segment in self._segments:
+            if start >= stop:
+                break
+            size = len(segment)
+            if start < offset + size:
+                result.extend(segment.read(start - offset, min(stop, offset + size) - offset))
+                start = offset + size
+            offset += size
+        return result
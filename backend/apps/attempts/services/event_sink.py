@@ -0,0 +1,260 @@
+"""
+Event Sink - Batched persistence and fan-out of attempt events.
+
+Emitting an event only appends it to an in-process buffer for its
+attempt. A buffer is flushed when it reaches ATTEMPT_EVENT_BATCH_SIZE
+events, when its oldest event is ATTEMPT_EVENT_FLUSH_INTERVAL seconds old
+(checked on emit and by a background flusher thread), or when a non-LOG
+event is emitted. A flush writes the whole batch with one bulk_create and
+publishes it to the attempt's channel group as one 'attempt_events'
+message, instead of one INSERT and one group_send per event.
+
+Sequence numbers are assigned at flush time under a row lock on the
+attempt, continuing from the highest stored seq, so events keep an exact
+per-attempt order even when several processes emit for the same attempt.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from apps.attempts.models import Attempt, AttemptEvent
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_event(event: AttemptEvent) -> Dict[str, Any]:
+    """JSON-ready form of an event, as sent over WebSockets."""
+    return {
+        'id': str(event.id),
+        'seq': event.seq,
+        'event_type': event.event_type,
+        'message': event.message,
+        'metadata': event.metadata,
+        'timestamp': event.timestamp.isoformat(),
+    }
+
+
+class _Buffer:
+    """Pending events of one attempt."""
+
+    __slots__ = ('events', 'first_at')
+
+    def __init__(self):
+        self.events: List[AttemptEvent] = []
+        self.first_at = time.monotonic()
+
+
+class AttemptEventSink:
+    """
+    Buffers attempt events and flushes them in batches.
+
+    Configured via settings:
+    - ATTEMPT_EVENT_BATCH_SIZE: events per attempt that trigger a flush
+    - ATTEMPT_EVENT_FLUSH_INTERVAL: max seconds an event waits in the buffer
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.batch_size = batch_size or getattr(settings, 'ATTEMPT_EVENT_BATCH_SIZE', 100)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(settings, 'ATTEMPT_EVENT_FLUSH_INTERVAL', 0.25)
+        )
+        self._buffers: Dict[str, _Buffer] = {}
+        self._lock = threading.Lock()
+        # Held while batches are written, so batches of one attempt from
+        # this process are stored (and published) in emit order
+        self._flush_lock = threading.RLock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+
+    def emit(
+        self,
+        attempt,
+        event_type: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        flush: Optional[bool] = None
+    ) -> None:
+        """
+        Queue an event for an attempt.
+
+        Args:
+            attempt: Attempt instance or id
+            event_type: One of AttemptEvent.EVENT_TYPES
+            message: Event text
+            metadata: Extra structured data
+            flush: Flush right away; defaults to True for everything but LOG
+                events, so status changes and errors are never delayed
+        """
+        attempt_id = str(getattr(attempt, 'id', attempt))
+        event = AttemptEvent(
+            attempt_id=attempt_id,
+            event_type=event_type,
+            message=message,
+            metadata=metadata or {},
+            timestamp=timezone.now()
+        )
+        if flush is None:
+            flush = event_type != 'LOG'
+
+        with self._lock:
+            buffer = self._buffers.get(attempt_id)
+            if buffer is None:
+                buffer = self._buffers[attempt_id] = _Buffer()
+            buffer.events.append(event)
+            due = (
+                flush
+                or len(buffer.events) >= self.batch_size
+                or time.monotonic() - buffer.first_at >= self.flush_interval
+            )
+
+        if due:
+            self.flush(attempt_id)
+        else:
+            self._ensure_flusher()
+
+    def flush(self, attempt_id: Optional[str] = None, wait: bool = True) -> int:
+        """
+        Write and publish buffered events.
+
+        Args:
+            attempt_id: Only flush this attempt's buffer (default: all)
+            wait: Wait for an attempt row that another transaction has
+                locked; otherwise its events stay buffered for a later flush
+
+        Returns:
+            Number of events flushed
+        """
+        with self._flush_lock:
+            with self._lock:
+                if attempt_id is None:
+                    batches = self._buffers
+                    self._buffers = {}
+                else:
+                    buffer = self._buffers.pop(str(attempt_id), None)
+                    batches = {str(attempt_id): buffer} if buffer else {}
+
+            flushed = 0
+            for batch_attempt_id, buffer in batches.items():
+                try:
+                    if self._write(batch_attempt_id, buffer.events, wait):
+                        flushed += len(buffer.events)
+                    else:
+                        self._requeue(batch_attempt_id, buffer)
+                except (OperationalError, InterfaceError) as e:
+                    # The database is unreachable or the connection broke;
+                    # keep the events for the next flush on a new connection
+                    logger.warning(
+                        f"Could not write {len(buffer.events)} events for attempt {batch_attempt_id}, "
+                        f"will retry: {e}"
+                    )
+                    if not connection.in_atomic_block:
+                        connection.close_if_unusable_or_obsolete()
+                    self._requeue(batch_attempt_id, buffer)
+                except Exception as e:
+                    logger.exception(
+                        f"Dropped {len(buffer.events)} events for attempt {batch_attempt_id}: {e}"
+                    )
+            return flushed
+
+    def pending(self) -> int:
+        """Number of events waiting to be flushed."""
+        with self._lock:
+            return sum(len(buffer.events) for buffer in self._buffers.values())
+
+    def _requeue(self, attempt_id: str, buffer: _Buffer) -> None:
+        """Put unwritten events back in front of anything emitted since."""
+        with self._lock:
+            newer = self._buffers.get(attempt_id)
+            if newer is not None:
+                buffer.events.extend(newer.events)
+            self._buffers[attempt_id] = buffer
+
+    def _write(self, attempt_id: str, events: List[AttemptEvent], wait: bool = True) -> bool:
+        """Store and publish one attempt's batch; False if its row is busy."""
+        with transaction.atomic():
+            # Lock the attempt so concurrent writers take seq ranges in turn
+            locked = Attempt.objects.select_for_update(
+                skip_locked=not wait
+            ).filter(id=attempt_id).exists()
+            if not locked:
+                if wait or not Attempt.objects.filter(id=attempt_id).exists():
+                    logger.warning(f"Dropped {len(events)} events for missing attempt {attempt_id}")
+                    return True
+                return False
+            last_seq = AttemptEvent.objects.filter(
+                attempt_id=attempt_id
+            ).aggregate(last=Max('seq'))['last'] or 0
+            for offset, event in enumerate(events, start=1):
+                event.seq = last_seq + offset
+            AttemptEvent.objects.bulk_create(events)
+
+            # Publish only what was committed
+            payload = [serialize_event(event) for event in events]
+            transaction.on_commit(lambda: self._publish(attempt_id, payload))
+        return True
+
+    @staticmethod
+    def _publish(attempt_id: str, events: List[Dict[str, Any]]) -> None:
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f'attempt_{attempt_id}',
+                {
+                    'type': 'attempt_events',
+                    'attempt_id': attempt_id,
+                    'events': events,
+                }
+            )
+        except Exception as e:
+            # Events are stored; clients catch up from the events endpoint
+            logger.warning(f"Could not publish events for attempt {attempt_id}: {e}")
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flusher (again, after a fork) if needed."""
+        pid = os.getpid()
+        if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._flusher_pid = pid
+            self._flusher = threading.Thread(
+                target=self._run_flusher,
+                name='attempt-event-flusher',
+                daemon=True
+            )
+            self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            now = time.monotonic()
+            with self._lock:
+                stale = [
+                    attempt_id for attempt_id, buffer in self._buffers.items()
+                    if now - buffer.first_at >= self.flush_interval
+                ]
+            if not stale:
+                continue
+            try:
+                for attempt_id in stale:
+                    # Never block on a row the emitting thread has locked:
+                    # it may be waiting on this thread's flush lock
+                    self.flush(attempt_id, wait=False)
+            finally:
+                # This thread's DB connection is not managed by a request cycle
+                connections.close_all()
+
+
+event_sink = AttemptEventSink()
@@ -6,17 +6,21 @@ concurrency limits, and automatic triggering of dependent tasks.
 """
 import logging
 from typing import List, Dict, Any, Optional, Set
-from django.db import transaction
 from django.conf import settings
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+from apps.projects.versioning import bump_project_versions
+from apps.tasks.board_sync import board_publisher
 from apps.tasks.models import Task
 from apps.tasks.utils import DependencyGraph
+from .duration_estimator import DurationEstimator, task_size
+from .slot_leasing import SlotLeaseManager, SlotUnavailable
 
 logger = logging.getLogger(__name__)
 
-# Maximum concurrent agent executions
-MAX_CONCURRENT = getattr(settings, 'MAX_CONCURRENT_AGENTS', 4)
+# Ready-task ordering policies, selectable per project via config['scheduling_policy']
+SCHEDULING_POLICIES = ('priority', 'critical_path')
 
 
 class ExecutionCoordinator:
@@ -25,45 +29,53 @@ class ExecutionCoordinator:
     
     Features:
     - Respects task dependencies (waits for prerequisites)
-    - Limits concurrent executions (default: 4)
+    - Orders ready tasks by priority or by remaining critical path
+    - Limits concurrent executions via leased slots (global, per project, per role)
     - Automatically triggers ready tasks after completion
     - Provides execution status and metrics
     """
     
-    def __init__(self, project_id: str, user):
+    def __init__(self, project_id: str, user, project=None):
         """
         Initialize coordinator for a project.
         
         Args:
             project_id: UUID of the project
             user: User requesting execution
+            project: The project instance, if already loaded
         """
         self.project_id = project_id
         self.user = user
+        self.slots = SlotLeaseManager()
+        self.estimator = DurationEstimator()
         self._graph: Optional[DependencyGraph] = None
+        self._tasks: List[Dict[str, Any]] = []
+        self._project = project
     
-    def _broadcast_task_update(self, task):
-        """Broadcast task status change to project WebSocket group."""
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            from apps.tasks.serializers import TaskSerializer
-            import json
-            # Serialize to JSON and back to ensure all UUIDs become strings
-            task_data = json.loads(json.dumps(TaskSerializer(task).data, default=str))
-            async_to_sync(channel_layer.group_send)(
-                f'project_{self.project_id}',
-                {
-                    'type': 'task_update',
-                    'task': task_data,
-                    'action': 'status_changed'
-                }
-            )
+    @property
+    def project(self):
+        """Lazily loaded project instance."""
+        if self._project is None:
+            from apps.projects.models import Project
+            self._project = Project.objects.get(id=self.project_id)
+        return self._project
     
-    def _build_graph(self) -> DependencyGraph:
-        """Build/refresh the dependency graph for project tasks."""
-        tasks = Task.objects.filter(
-            project_id=self.project_id
-        ).values('id', 'title', 'status', 'agent_role', 'priority', 'dependencies')
+    @property
+    def scheduling_policy(self) -> str:
+        """Ready-task ordering policy for this project."""
+        default = getattr(settings, 'DEFAULT_SCHEDULING_POLICY', 'priority')
+        policy = (self.project.config or {}).get('scheduling_policy', default)
+        return policy if policy in SCHEDULING_POLICIES else 'priority'
+    
+    def _build_graph(self, tasks=None) -> DependencyGraph:
+        """
+        Build/refresh the dependency graph for project tasks.
+
+        Args:
+            tasks: Task values as from graph_values() (queried if not given)
+        """
+        if tasks is None:
+            tasks = self.graph_values()
         
         tasks_list = [
             {
@@ -72,7 +84,8 @@ class ExecutionCoordinator:
                 'status': t['status'],
                 'agent_role': t['agent_role'],
                 'priority': t['priority'],
-                'dependencies': [str(d) for d in (t['dependencies'] or [])]
+                'dependencies': [str(d) for d in (t['dependencies'] or [])],
+                'size': task_size(t['description_length'], t['acceptance_criteria'])
             }
             for t in tasks
         ]
@@ -80,8 +93,18 @@ class ExecutionCoordinator:
         graph = DependencyGraph()
         graph.build_graph(tasks_list)
         self._graph = graph
+        self._tasks = tasks_list
         return graph
     
+    def graph_values(self, *extra_fields):
+        """Task values the dependency graph is built from (plus extra_fields)."""
+        return Task.objects.filter(
+            project_id=self.project_id
+        ).values(
+            'id', 'title', 'status', 'agent_role', 'priority', 'dependencies',
+            'acceptance_criteria', *extra_fields, description_length=Length('description')
+        )
+
     def get_current_executing_count(self) -> int:
         """Get number of currently executing tasks in project."""
         return Task.objects.filter(
@@ -90,20 +113,125 @@ class ExecutionCoordinator:
         ).count()
     
     def get_available_slots(self) -> int:
-        """Get number of available execution slots."""
-        current = self.get_current_executing_count()
-        return max(0, MAX_CONCURRENT - current)
+        """
+        Get number of execution slots currently free for this project.
+        
+        Bounded by both the global and the project pool. This is a snapshot;
+        scheduling itself relies on SlotLeaseManager.acquire to stay race-free.
+        """
+        return self.slots.usage(self.project)['available']
+    
+    def get_task_estimates(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get predicted durations for the tasks of the last built graph.
+        
+        Returns:
+            Dict mapping task ID to DurationEstimator prediction
+        """
+        return self.estimator.estimate_tasks(self.project_id, self._tasks)
+    
+    def get_task_ranks(self, graph: DependencyGraph) -> Dict[str, float]:
+        """
+        Get the upward rank (remaining critical-path length) of every task.
+        
+        Tasks are weighted by their predicted median duration.
+        """
+        estimates = self.get_task_estimates()
+        weights = {task_id: estimate['p50'] for task_id, estimate in estimates.items()}
+        return graph.get_upward_ranks(weights)
+    
+    def _running_elapsed(self) -> Dict[str, float]:
+        """Get seconds already spent by each running task's current attempt."""
+        from apps.attempts.models import Attempt
+        
+        now = timezone.now()
+        running = Attempt.objects.filter(
+            task__project_id=self.project_id,
+            status='RUNNING',
+            started_at__isnull=False
+        ).values_list('task_id', 'started_at')
+        return {str(task_id): (now - started_at).total_seconds() for task_id, started_at in running}
+    
+    def get_eta(self, graph: DependencyGraph) -> Dict[str, Any]:
+        """
+        Estimate remaining project time from predicted durations.
+        
+        Accounts for the critical path and for contention on the
+        project's execution slots.
+        """
+        estimates = self.get_task_estimates()
+        remaining = self.estimator.remaining_work(self._tasks, estimates, self._running_elapsed())
+        return self.estimator.project_eta(graph, remaining, self.slots.project_cap(self.project))
+    
+    def get_estimates(self) -> Dict[str, Any]:
+        """
+        Get per-task duration predictions and the project ETA.
+        
+        Returns:
+            Dict with:
+            - tasks: Prediction per task (p50/p90 seconds, basis, upward rank)
+            - eta: Project completion estimate
+        """
+        graph = self._build_graph()
+        estimates = self.get_task_estimates()
+        ranks = graph.get_upward_ranks({tid: e['p50'] for tid, e in estimates.items()})
+        
+        return {
+            'project_id': str(self.project_id),
+            'tasks': [
+                {
+                    'id': task['id'],
+                    'title': task['title'],
+                    'status': task['status'],
+                    'agent_role': task['agent_role'],
+                    'size': task['size'],
+                    **estimates[task['id']],
+                    'upward_rank': round(ranks.get(task['id'], 0.0), 1),
+                }
+                for task in self._tasks
+            ],
+            'eta': self.get_eta(graph),
+        }
     
-    def get_ready_tasks(self) -> List[Task]:
+    def _order_ready(self, items: List[Any], graph: DependencyGraph, key) -> List[Any]:
+        """
+        Order ready items according to the project's scheduling policy.
+        
+        Args:
+            items: Ready tasks (Task objects or dicts)
+            graph: Graph the items belong to
+            key: Callable returning (task_id, priority) for an item
+        """
+        if self.scheduling_policy == 'critical_path':
+            ranks = self.get_task_ranks(graph)
+            return sorted(
+                items,
+                key=lambda item: (-ranks.get(key(item)[0], 0.0), key(item)[1])
+            )
+        return sorted(items, key=lambda item: key(item)[1])
+    
+    def get_ready_order(self, graph: DependencyGraph) -> List[Dict[str, Any]]:
+        """Ready task info from a graph, in the order they would be scheduled."""
+        return self._order_ready(
+            graph.get_ready_tasks(), graph, key=lambda t: (t['id'], t['priority'])
+        )
+
+    def get_ready_tasks(self, graph: Optional[DependencyGraph] = None) -> List[Task]:
         """
         Get tasks ready for execution.
         
+        Args:
+            graph: Freshly built graph to reuse (built if not given)
+        
         Returns tasks that:
         - Are in TODO status
         - Have all dependencies completed (DONE)
-        - Are sorted by priority (lower number = higher priority)
+        - Are sorted by the project's scheduling policy:
+          'priority' (lower number = higher priority) or 'critical_path'
+          (longest remaining dependency chain first, priority as tiebreak)
         """
-        graph = self._build_graph()
+        if graph is None:
+            graph = self._build_graph()
         ready_info = graph.get_ready_tasks()
         
         if not ready_info:
@@ -111,9 +239,9 @@ class ExecutionCoordinator:
         
         # Get actual Task objects
         ready_ids = [r['id'] for r in ready_info]
-        tasks = Task.objects.filter(id__in=ready_ids).order_by('priority')
+        tasks = list(Task.objects.filter(id__in=ready_ids))
         
-        return list(tasks)
+        return self._order_ready(tasks, graph, key=lambda t: (str(t.id), t.priority))
     
     def schedule_project_tasks(self) -> Dict[str, Any]:
         """
@@ -138,57 +266,69 @@ class ExecutionCoordinator:
             'errors': []
         }
         
-        # Get current state
-        all_tasks = Task.objects.filter(project_id=self.project_id)
-        result['completed'] = all_tasks.filter(status='DONE').count()
-        result['already_running'] = all_tasks.filter(status='IN_PROGRESS').count()
+        # Get current state (counts come from the graph's single task query)
+        graph = self._build_graph()
+        status_counts = graph.get_status_counts()
+        result['completed'] = status_counts.get('DONE', 0)
+        result['already_running'] = status_counts.get('IN_PROGRESS', 0)
         
-        # Calculate available slots
+        # Quick exit when every slot is taken
         available_slots = self.get_available_slots()
         
         if available_slots <= 0:
-            logger.info(f"No available slots. Max concurrent: {MAX_CONCURRENT}")
+            logger.info(f"No available slots for project {self.project_id}")
             return result
         
         # Get ready tasks
-        ready_tasks = self.get_ready_tasks()
-        result['waiting'] = all_tasks.filter(status='TODO').count() - len(ready_tasks)
+        ready_tasks = self.get_ready_tasks(graph=graph)
+        result['waiting'] = status_counts.get('TODO', 0) - len(ready_tasks)
         
         if not ready_tasks:
             logger.info("No tasks ready for execution")
             return result
         
-        # Schedule up to available slots
-        tasks_to_schedule = ready_tasks[:available_slots]
-        
-        for task in tasks_to_schedule:
+        # Walk ready tasks in order, leasing a slot for each until the global
+        # or project pool runs out. A full role pool only skips that task.
+        for task in ready_tasks:
             try:
-                # Create attempt and trigger execution
                 with transaction.atomic():
+                    # Skip tasks another scheduler is starting right now
+                    locked = Task.objects.select_for_update(skip_locked=True).filter(
+                        id=task.id, status='TODO'
+                    ).first()
+                    if locked is None:
+                        continue
+                    task = locked
+                    
                     attempt = Attempt.objects.create(
                         task=task,
+                        agent_role=task.agent_role,
                         status='QUEUED'
                     )
+                    self.slots.acquire(attempt, self.project, task.agent_role)
                     
                     # Update task status
                     task.status = 'IN_PROGRESS'
                     task.save()
                     
-                    # Broadcast task update via WebSocket
-                    self._broadcast_task_update(task)
-                    
-                    # Trigger Celery task
-                    start_attempt_task.delay(str(attempt.id))
-                    
-                    result['scheduled'].append({
-                        'task_id': str(task.id),
-                        'task_title': task.title,
-                        'attempt_id': str(attempt.id),
-                        'agent_role': task.agent_role
-                    })
-                    
-                    logger.info(f"Scheduled task {task.id} ({task.title})")
-                    
+                    # Publish and trigger execution only once committed
+                    board_publisher.task_changed(task, ['status', 'attempt_count', 'updated_at'])
+                    transaction.on_commit(lambda a=attempt: start_attempt_task.delay(str(a.id)))
+                
+                result['scheduled'].append({
+                    'task_id': str(task.id),
+                    'task_title': task.title,
+                    'attempt_id': str(attempt.id),
+                    'agent_role': task.agent_role
+                })
+                
+                logger.info(f"Scheduled task {task.id} ({task.title})")
+            
+            except SlotUnavailable as e:
+                if e.is_role_pool:
+                    continue
+                logger.info(f"Stopped scheduling: {e}")
+                break
             except Exception as e:
                 error_msg = f"Failed to schedule task {task.id}: {str(e)}"
                 logger.error(error_msg)
@@ -227,6 +367,7 @@ class ExecutionCoordinator:
             else:
                 task.status = 'FAILED'
             task.save()
+            board_publisher.task_changed(task, ['status', 'updated_at'])
             
             # If successful, check for and schedule dependent tasks
             if success:
@@ -250,33 +391,31 @@ class ExecutionCoordinator:
         """
         graph = self._build_graph()
         
-        all_tasks = Task.objects.filter(project_id=self.project_id)
-        
-        # Get counts by status
+        # Get counts by status from the graph's task data (no extra queries)
+        counts = graph.get_status_counts()
         status_counts = {
-            'todo': all_tasks.filter(status='TODO').count(),
-            'in_progress': all_tasks.filter(status='IN_PROGRESS').count(),
-            'done': all_tasks.filter(status='DONE').count(),
-            'failed': all_tasks.filter(status='FAILED').count(),
+            'todo': counts.get('TODO', 0),
+            'in_progress': counts.get('IN_PROGRESS', 0),
+            'done': counts.get('DONE', 0),
+            'failed': counts.get('FAILED', 0),
         }
         
         total = sum(status_counts.values())
         progress = (status_counts['done'] / total * 100) if total > 0 else 0
         
         # Get running tasks details
-        running_tasks = all_tasks.filter(status='IN_PROGRESS').values(
-            'id', 'title', 'agent_role'
-        )
+        running_tasks = graph.get_tasks_by_status('IN_PROGRESS')
         
         # Get blocked tasks
         blocked = graph.get_blocked_tasks()
         
-        # Get ready tasks
-        ready = graph.get_ready_tasks()
+        # Get ready tasks, in the order they would be scheduled
+        ready = self.get_ready_order(graph)
         
         # Get execution levels for estimated completion
+        has_cycles = graph.has_cycles()
         execution_levels = []
-        if not graph.has_cycles():
+        if not has_cycles:
             try:
                 execution_levels = graph.get_execution_levels()
             except ValueError:
@@ -287,12 +426,15 @@ class ExecutionCoordinator:
             'status_counts': status_counts,
             'total_tasks': total,
             'progress_percent': round(progress, 1),
-            'max_concurrent': MAX_CONCURRENT,
-            'currently_running': list(running_tasks),
+            'max_concurrent': self.slots.project_cap(self.project),
+            'available_slots': self.get_available_slots(),
+            'scheduling_policy': self.scheduling_policy,
+            'eta': self.get_eta(graph),
+            'currently_running': running_tasks,
             'ready_tasks': ready,
             'blocked_tasks': blocked[:10],  # Limit to 10
             'execution_levels': len(execution_levels),
-            'has_cycles': graph.has_cycles(),
+            'has_cycles': has_cycles,
             'is_complete': status_counts['todo'] == 0 and status_counts['in_progress'] == 0
         }
     
@@ -310,21 +452,26 @@ class ExecutionCoordinator:
             'cancelled_attempts': []
         }
         
-        # Get running attempts
-        running_attempts = Attempt.objects.filter(
-            task__project_id=self.project_id,
-            status='RUNNING'
-        ).select_related('task')
+        with transaction.atomic():
+            running = list(Attempt.objects.select_for_update().filter(
+                task__project_id=self.project_id,
+                status='RUNNING'
+            ).values_list('id', 'task_id'))
+            attempt_ids = [attempt_id for attempt_id, _ in running]
+            task_ids = list({task_id for _, task_id in running})
+
+            # One UPDATE per table instead of two saves per attempt
+            now = timezone.now()
+            Attempt.objects.filter(id__in=attempt_ids).update(status='CANCELLED', updated_at=now)
+            Task.objects.filter(id__in=task_ids).update(status='TODO', updated_at=now)
+            bump_project_versions([self.project_id])
+
+            result['cancelled_attempts'] = [str(attempt_id) for attempt_id in attempt_ids]
+            result['cancelled_tasks'] = [str(task_id) for _, task_id in running]
+            board_publisher.tasks_changed(self.project_id, task_ids, ['status', 'updated_at'])
         
-        for attempt in running_attempts:
-            attempt.status = 'CANCELLED'
-            attempt.save()
-            
-            attempt.task.status = 'TODO'
-            attempt.task.save()
-            
-            result['cancelled_attempts'].append(str(attempt.id))
-            result['cancelled_tasks'].append(str(attempt.task.id))
+        # Free their execution slots
+        self.slots.release_many(result['cancelled_attempts'])
         
         return result
     
@@ -340,18 +487,20 @@ class ExecutionCoordinator:
             'scheduled': []
         }
         
-        failed_tasks = Task.objects.filter(
-            project_id=self.project_id,
-            status='FAILED'
-        )
-        
-        for task in failed_tasks:
-            task.status = 'TODO'
-            task.save()
-            result['reset_tasks'].append({
-                'id': str(task.id),
-                'title': task.title
-            })
+        with transaction.atomic():
+            failed_tasks = list(Task.objects.select_for_update().filter(
+                project_id=self.project_id,
+                status='FAILED'
+            ).values_list('id', 'title'))
+            task_ids = [task_id for task_id, _ in failed_tasks]
+            Task.objects.filter(id__in=task_ids).update(status='TODO', updated_at=timezone.now())
+            bump_project_versions([self.project_id])
+
+            result['reset_tasks'] = [
+                {'id': str(task_id), 'title': title}
+                for task_id, title in failed_tasks
+            ]
+            board_publisher.tasks_changed(self.project_id, task_ids, ['status', 'updated_at'])
         
         # Schedule any that are now ready
         if result['reset_tasks']:
@@ -0,0 +1,294 @@
+"""
+Scheduling Simulator - Offline discrete-event replay of task execution.
+
+Replays a project's task DAG (or a synthetic one) in virtual time under
+the same rules as ExecutionCoordinator: a task starts when all its
+dependencies are DONE and a slot is free, an agent run either fails (task
+goes back to TODO) or succeeds (task waits for review, then becomes DONE
+and unblocks its dependents). Durations, failure rates and review delays
+are drawn from historical Attempt data.
+"""
+import heapq
+import random
+import statistics
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from apps.tasks.utils import DependencyGraph
+from .duration_estimator import percentile
+
+ROLES = ['BACKEND', 'FRONTEND', 'QA', 'DEVOPS']
+
+# A task is force-completed after this many failed attempts so runs terminate
+MAX_ATTEMPTS_PER_TASK = 10
+
+
+class SimulationDistributions:
+    """
+    Empirical distributions used to drive a simulation.
+
+    Durations are resampled (bootstrap) from observed attempt durations
+    per role; failure rates are per-role ratios of failed attempts; review
+    delay is the time between an attempt finishing and being approved.
+    """
+
+    def __init__(
+        self,
+        durations: Dict[str, List[float]],
+        failure_rates: Dict[str, float],
+        review_delays: List[float],
+        default_duration: Optional[float] = None
+    ):
+        self.durations = durations
+        self.failure_rates = failure_rates
+        self.review_delays = review_delays
+        self.default_duration = default_duration or float(
+            getattr(settings, 'DEFAULT_TASK_DURATION_SECONDS', 600)
+        )
+
+    @classmethod
+    def from_history(cls, sample_size: int = 2000) -> 'SimulationDistributions':
+        """Build distributions from the most recent finished attempts."""
+        from apps.attempts.models import Attempt
+
+        rows = Attempt.objects.filter(
+            status__in=['SUCCESS', 'APPROVED', 'REJECTED', 'FAILED'],
+            started_at__isnull=False,
+            completed_at__isnull=False
+        ).order_by('-completed_at').values_list(
+            'agent_role', 'status', 'started_at', 'completed_at', 'updated_at'
+        )[:sample_size]
+
+        durations: Dict[str, List[float]] = {}
+        outcomes: Dict[str, List[bool]] = {}
+        review_delays: List[float] = []
+
+        for role, attempt_status, started_at, completed_at, updated_at in rows:
+            failed = attempt_status == 'FAILED'
+            outcomes.setdefault(role, []).append(failed)
+            if not failed:
+                durations.setdefault(role, []).append(
+                    max((completed_at - started_at).total_seconds(), 0.0)
+                )
+            if attempt_status == 'APPROVED':
+                # Approval is the last write to an approved attempt
+                review_delays.append(max((updated_at - completed_at).total_seconds(), 0.0))
+
+        failure_rates = {
+            role: sum(results) / len(results)
+            for role, results in outcomes.items()
+        }
+        return cls(durations, failure_rates, review_delays)
+
+    def mean_duration(self, role: str) -> float:
+        samples = self.durations.get(role)
+        return statistics.mean(samples) if samples else self.default_duration
+
+    def sample_duration(self, rng: random.Random, role: str) -> float:
+        samples = self.durations.get(role)
+        return rng.choice(samples) if samples else self.default_duration
+
+    def sample_failure(self, rng: random.Random, role: str) -> bool:
+        return rng.random() < min(self.failure_rates.get(role, 0.0), 0.95)
+
+    def sample_review_delay(self, rng: random.Random) -> float:
+        return rng.choice(self.review_delays) if self.review_delays else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Describe the distributions for reports."""
+        return {
+            'durations': {
+                role: {
+                    'samples': len(values),
+                    'p50': round(percentile(values, 0.5), 1),
+                    'p90': round(percentile(values, 0.9), 1),
+                }
+                for role, values in self.durations.items() if values
+            },
+            'failure_rates': {role: round(rate, 3) for role, rate in self.failure_rates.items()},
+            'review_delay_samples': len(self.review_delays),
+        }
+
+
+def generate_synthetic_dag(
+    n_tasks: int,
+    edge_probability: float = 0.1,
+    window: int = 20,
+    seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Generate a random task DAG.
+
+    Each task may depend on any of the `window` tasks created before it,
+    so the graph is acyclic by construction.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n_tasks):
+        candidates = range(max(0, i - window), i)
+        tasks.append({
+            'id': f'T{i}',
+            'title': f'Synthetic task {i}',
+            'status': 'TODO',
+            'agent_role': rng.choice(ROLES),
+            'priority': rng.randint(1, 5),
+            'size': rng.randint(100, 3000),
+            'dependencies': [f'T{j}' for j in candidates if rng.random() < edge_probability],
+        })
+    return tasks
+
+
+class SchedulingSimulator:
+    """
+    Discrete-event simulator for ready-task scheduling policies.
+
+    Events are (time, sequence, kind, task_id, run_duration) tuples in a heap:
+    'finish' when an agent run ends and 'approve' when review completes.
+    """
+
+    def __init__(
+        self,
+        tasks: List[Dict[str, Any]],
+        distributions: SimulationDistributions,
+        slots: int,
+        policy: str = 'priority',
+        seed: Optional[int] = None
+    ):
+        self.tasks = {str(t['id']): t for t in tasks}
+        self.distributions = distributions
+        self.slots = max(1, slots)
+        self.policy = policy
+        self.rng = random.Random(seed)
+
+        self.graph = DependencyGraph().build_graph(list(self.tasks.values()))
+        if self.graph.has_cycles():
+            raise ValueError("Cannot simulate a task graph with circular dependencies")
+
+        self.ranks = self.graph.get_upward_ranks({
+            task_id: distributions.mean_duration(task.get('agent_role', ''))
+            for task_id, task in self.tasks.items()
+        })
+
+    def _order_key(self, task_id: str):
+        priority = self.tasks[task_id].get('priority', 3)
+        if self.policy == 'critical_path':
+            return (-self.ranks.get(task_id, 0.0), priority, task_id)
+        return (priority, task_id)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Simulate until every task is DONE.
+
+        Returns:
+            Dict with makespan, slot utilization, queue wait statistics
+            and attempt counts (times in seconds)
+        """
+        graph = self.graph.graph
+        waiting_on = {
+            task_id: sum(
+                1 for dep in graph.predecessors(task_id)
+                if self.tasks[dep].get('status') != 'DONE'
+            )
+            for task_id in self.tasks
+        }
+        done = {task_id for task_id, t in self.tasks.items() if t.get('status') == 'DONE'}
+
+        ready_since: Dict[str, float] = {
+            task_id: 0.0 for task_id in self.tasks
+            if task_id not in done and waiting_on[task_id] == 0
+        }
+        attempts: Dict[str, int] = {task_id: 0 for task_id in self.tasks}
+        events: List = []
+        sequence = 0
+        now = 0.0
+        running = 0
+        busy_time = 0.0
+        waits: List[float] = []
+        failures = 0
+
+        def start_ready():
+            nonlocal running, sequence
+            for task_id in sorted(ready_since, key=self._order_key):
+                if running >= self.slots:
+                    break
+                waits.append(now - ready_since.pop(task_id))
+                attempts[task_id] += 1
+                running += 1
+                sequence += 1
+                duration = self.distributions.sample_duration(
+                    self.rng, self.tasks[task_id].get('agent_role', '')
+                )
+                heapq.heappush(events, (now + duration, sequence, 'finish', task_id, duration))
+
+        start_ready()
+        while events:
+            now, _, kind, task_id, duration = heapq.heappop(events)
+
+            if kind == 'finish':
+                running -= 1
+                busy_time += duration
+                role = self.tasks[task_id].get('agent_role', '')
+                if attempts[task_id] < MAX_ATTEMPTS_PER_TASK and self.distributions.sample_failure(self.rng, role):
+                    failures += 1
+                    ready_since[task_id] = now
+                else:
+                    sequence += 1
+                    delay = self.distributions.sample_review_delay(self.rng)
+                    heapq.heappush(events, (now + delay, sequence, 'approve', task_id, 0.0))
+
+            elif kind == 'approve':
+                done.add(task_id)
+                for dependent in graph.successors(task_id):
+                    waiting_on[dependent] -= 1
+                    if waiting_on[dependent] == 0 and dependent not in done:
+                        ready_since[dependent] = now
+
+            start_ready()
+
+        makespan = now
+        return {
+            'makespan': round(makespan, 1),
+            'utilization': round(busy_time / (self.slots * makespan), 3) if makespan else 0.0,
+            'mean_queue_wait': round(statistics.mean(waits), 1) if waits else 0.0,
+            'p90_queue_wait': round(percentile(waits, 0.9), 1) if waits else 0.0,
+            'attempts': sum(attempts.values()),
+            'failures': failures,
+        }
+
+
+def compare_policies(
+    tasks: List[Dict[str, Any]],
+    distributions: SimulationDistributions,
+    slot_options: List[int],
+    policies: List[str],
+    runs: int = 20,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Simulate every (policy, slots) combination over several runs.
+
+    Runs share seeds across combinations so policies are compared on the
+    same sampled durations where possible.
+
+    Returns:
+        One row per combination with metrics averaged over runs
+    """
+    rows = []
+    for slots in slot_options:
+        for policy in policies:
+            results = [
+                SchedulingSimulator(tasks, distributions, slots, policy, seed=seed + run).run()
+                for run in range(runs)
+            ]
+            makespans = [r['makespan'] for r in results]
+            rows.append({
+                'policy': policy,
+                'slots': slots,
+                'runs': runs,
+                'makespan_mean': round(statistics.mean(makespans), 1),
+                'makespan_p90': round(percentile(makespans, 0.9), 1),
+                'utilization': round(statistics.mean(r['utilization'] for r in results), 3),
+                'mean_queue_wait': round(statistics.mean(r['mean_queue_wait'] for r in results), 1),
+                'p90_queue_wait': round(statistics.mean(r['p90_queue_wait'] for r in results), 1),
+                'attempts': round(statistics.mean(r['attempts'] for r in results), 1),
+            })
+    return rows
@@ -0,0 +1,222 @@
+"""
+Slot Leasing - Race-free execution concurrency limits.
+
+Each concurrency cap is a pool of ExecutionSlot rows. Starting an attempt
+leases one free slot from every pool that applies to it (global, project,
+and optionally agent role). Free slots are picked with
+SELECT ... FOR UPDATE SKIP LOCKED, so concurrent schedulers never hand out
+the same slot and never block on each other. Leases expire unless the
+running attempt heartbeats, so crashed workers can't leak capacity.
+"""
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from apps.attempts.models import ExecutionSlot
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_POOL = 'global'
+
+
+class SlotUnavailable(Exception):
+    """Raised when a pool has no free execution slot."""
+
+    def __init__(self, pool: str):
+        self.pool = pool
+        super().__init__(f"No free execution slot in pool '{pool}'")
+
+    @property
+    def is_role_pool(self) -> bool:
+        return self.pool.startswith('role:')
+
+
+class SlotLeaseManager:
+    """
+    Leases execution slots to attempts.
+
+    Caps are configured via settings:
+    - MAX_CONCURRENT_AGENTS_GLOBAL: slots shared by all projects
+    - MAX_CONCURRENT_AGENTS: default per-project cap, overridable with
+      project.config['max_concurrent_agents']
+    - MAX_CONCURRENT_AGENTS_PER_ROLE: optional {agent_role: cap} mapping
+    - EXECUTION_LEASE_TTL: seconds a lease lives without a heartbeat
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'EXECUTION_LEASE_TTL', 900)
+
+    @staticmethod
+    def project_cap(project) -> int:
+        """Get the concurrency cap for a project."""
+        default = getattr(settings, 'MAX_CONCURRENT_AGENTS', 4)
+        config = project.config or {}
+        try:
+            return max(0, int(config.get('max_concurrent_agents', default)))
+        except (TypeError, ValueError):
+            return default
+
+    def pools_for(self, project, agent_role: str) -> List[Tuple[str, int]]:
+        """
+        Get the (pool, size) pairs an attempt must hold a slot in.
+
+        Role pools come last so that a saturated role doesn't hold on to
+        global or project slots any longer than needed.
+        """
+        pools = [
+            (GLOBAL_POOL, getattr(settings, 'MAX_CONCURRENT_AGENTS_GLOBAL', 16)),
+            (f'project:{project.id}', self.project_cap(project)),
+        ]
+        role_caps = getattr(settings, 'MAX_CONCURRENT_AGENTS_PER_ROLE', {}) or {}
+        if agent_role in role_caps:
+            pools.append((f'role:{agent_role}', int(role_caps[agent_role])))
+        return pools
+
+    @staticmethod
+    def _ensure_pool(pool: str, size: int) -> None:
+        """Create any missing slot rows for a pool."""
+        existing = set(
+            ExecutionSlot.objects.filter(pool=pool, index__lt=size).values_list('index', flat=True)
+        )
+        missing = [
+            ExecutionSlot(pool=pool, index=i)
+            for i in range(size) if i not in existing
+        ]
+        if missing:
+            ExecutionSlot.objects.bulk_create(missing, ignore_conflicts=True)
+
+    @staticmethod
+    def _free_slots(pool: str, size: int, now):
+        return ExecutionSlot.objects.filter(
+            pool=pool,
+            index__lt=size
+        ).filter(
+            Q(attempt__isnull=True) | Q(expires_at__lt=now)
+        )
+
+    def _lock_free_slot(self, pool: str, size: int, now) -> Optional[ExecutionSlot]:
+        """Lock one free slot in a pool, skipping slots other schedulers hold."""
+        if size <= 0:
+            return None
+
+        slot = self._free_slots(pool, size, now).select_for_update(
+            skip_locked=True
+        ).order_by('index').first()
+
+        if slot is None and ExecutionSlot.objects.filter(pool=pool, index__lt=size).count() < size:
+            # Pool not fully materialized yet (first use or cap was raised)
+            self._ensure_pool(pool, size)
+            slot = self._free_slots(pool, size, now).select_for_update(
+                skip_locked=True
+            ).order_by('index').first()
+
+        return slot
+
+    def acquire(self, attempt, project, agent_role: str) -> List[str]:
+        """
+        Lease one slot in every applicable pool for an attempt.
+
+        All-or-nothing: if any pool is full, nothing is leased.
+
+        Returns:
+            List of pool names leased
+
+        Raises:
+            SlotUnavailable: If a pool has no free slot
+        """
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=self.ttl)
+
+        with transaction.atomic():
+            slots = []
+            for pool, size in self.pools_for(project, agent_role):
+                slot = self._lock_free_slot(pool, size, now)
+                if slot is None:
+                    raise SlotUnavailable(pool)
+                slots.append(slot)
+
+            ExecutionSlot.objects.filter(id__in=[s.id for s in slots]).update(
+                attempt=attempt,
+                expires_at=expires_at,
+                heartbeat_at=now
+            )
+
+        logger.info(f"Leased slots {[s.pool for s in slots]} to attempt {attempt.id}")
+        return [s.pool for s in slots]
+
+    def heartbeat(self, attempt_id: str) -> int:
+        """
+        Extend the leases held by an attempt.
+
+        Returns:
+            Number of slots renewed (0 means the lease was lost)
+        """
+        now = timezone.now()
+        return ExecutionSlot.objects.filter(attempt_id=attempt_id).update(
+            expires_at=now + timedelta(seconds=self.ttl),
+            heartbeat_at=now
+        )
+
+    def release(self, attempt_id: str) -> int:
+        """
+        Release all slots held by an attempt.
+
+        Returns:
+            Number of slots released
+        """
+        return ExecutionSlot.objects.filter(attempt_id=attempt_id).update(
+            attempt=None,
+            expires_at=None,
+            heartbeat_at=None
+        )
+
+    def release_many(self, attempt_ids: List[str]) -> int:
+        """Release all slots held by any of the given attempts."""
+        return ExecutionSlot.objects.filter(attempt_id__in=attempt_ids).update(
+            attempt=None,
+            expires_at=None,
+            heartbeat_at=None
+        )
+
+    def usage(self, project) -> Dict[str, Any]:
+        """
+        Get active lease counts for the pools a project draws from.
+
+        Returns:
+            Dict with:
+            - pools: Per-pool 'size', 'active' and 'free' counts
+            - available: Slots a new attempt of this project could get
+              (ignoring role caps)
+        """
+        now = timezone.now()
+        pools = dict(self.pools_for(project, agent_role=''))
+        role_caps = getattr(settings, 'MAX_CONCURRENT_AGENTS_PER_ROLE', {}) or {}
+        for role, cap in role_caps.items():
+            pools[f'role:{role}'] = int(cap)
+
+        active = dict(
+            ExecutionSlot.objects.filter(
+                pool__in=list(pools.keys()),
+                attempt__isnull=False,
+                expires_at__gte=now
+            ).order_by().values('pool').annotate(n=Count('id')).values_list('pool', 'n')
+        )
+
+        usage = {
+            pool: {
+                'size': size,
+                'active': active.get(pool, 0),
+                'free': max(0, size - active.get(pool, 0)),
+            }
+            for pool, size in pools.items()
+        }
+        return {
+            'pools': usage,
+            'available': min(
+                usage[GLOBAL_POOL]['free'],
+                usage[f'project:{project.id}']['free']
+            ),
+        }
@@ -1,26 +1,86 @@
 from celery import shared_task
+from celery.signals import task_postrun
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 import httpx
 import hashlib
 import time
 
 
+def send_attempt_event(attempt, event_type: str, message: str, metadata: dict = None):
+    """
+    Queue an attempt event for the database and WebSocket.
+
+    Events are batched by the event sink; LOG events may be delayed by up
+    to ATTEMPT_EVENT_FLUSH_INTERVAL, all other types are flushed at once.
+    """
+    from apps.attempts.services import event_sink
+
+    event_sink.emit(attempt, event_type, message, metadata)
+
+
+@task_postrun.connect
+def flush_attempt_events(**kwargs):
+    """Don't leave a task's buffered events waiting for the next one."""
+    from apps.attempts.services import event_sink
+
+    event_sink.flush()
+
+
+@task_postrun.connect
+def flush_board_patches(**kwargs):
+    """Publish a task's board changes before the worker goes idle."""
+    from apps.tasks.board_sync import board_publisher
+
+    board_publisher.flush()
+
+
+def broadcast_task_update(task):
+    """Report a task's status change to its project's board clients."""
+    from apps.tasks.board_sync import board_publisher
+
+    board_publisher.task_changed(task, ['status', 'attempt_count', 'updated_at'])
+
+
+def _fail_attempt(attempt, error_msg: str, release_slot: bool = True):
+    """Mark an attempt failed, return its task to TODO and notify clients."""
+    from apps.attempts.services import SlotLeaseManager
+
+    attempt.status = 'FAILED'
+    attempt.error_message = error_msg
+    attempt.completed_at = timezone.now()
+    attempt.save()
+    if release_slot:
+        SlotLeaseManager().release(str(attempt.id))
+    else:
+        # Keep the slot for a retry; the lease TTL reclaims it if retries run out
+        SlotLeaseManager().heartbeat(str(attempt.id))
+
+    attempt.task.status = 'TODO'
+    attempt.task.save()
+    broadcast_task_update(attempt.task)
+
+    send_attempt_event(attempt, 'ERROR', error_msg)
+
+
 @shared_task(bind=True, max_retries=3)
 def start_attempt_task(self, attempt_id: str):
     """
-    Execute an attempt by calling LDA agent/run endpoint.
-    Streams events via WebSocket to connected clients.
+    Start an attempt by submitting an agent job to the LDA.
+
+    Returns as soon as the LDA accepts the job. The outcome arrives later
+    through the signed LDA callback (or poll_lda_jobs as a fallback) and
+    is applied by complete_attempt_from_job.
 
     Args:
         attempt_id: UUID of the attempt to execute
 
     Returns:
-        dict: Execution result with status and details
+        dict: Submission result with the LDA job id
     """
-    from apps.attempts.models import Attempt, AttemptEvent, AttemptGateResult
+    from apps.attempts.models import Attempt
+    from apps.attempts.services import SlotLeaseManager
     from apps.local_access.models import WritableRoot
 
     try:
@@ -30,55 +90,16 @@ def start_attempt_task(self, attempt_id: str):
     except Attempt.DoesNotExist:
         return {'error': 'Attempt not found', 'attempt_id': attempt_id}
 
-    channel_layer = get_channel_layer()
-    group_name = f'attempt_{attempt_id}'
-    project_group_name = f'project_{attempt.task.project_id}'
-
-    def send_event(event_type: str, message: str, metadata: dict = None):
-        """Send event to WebSocket and save to database."""
-        # Save to database
-        AttemptEvent.objects.create(
-            attempt=attempt,
-            event_type=event_type,
-            message=message,
-            metadata=metadata or {}
-        )
-        # Send via WebSocket
-        if channel_layer:
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'attempt_event',
-                    'event_type': event_type,
-                    'message': message,
-                    'metadata': metadata or {},
-                    'timestamp': timezone.now().isoformat()
-                }
-            )
-
-    def broadcast_task_update(task):
-        """Broadcast task status change to project group for real-time UI updates."""
-        if channel_layer:
-            from apps.tasks.serializers import TaskSerializer
-            import json
-            # Serialize to JSON and back to ensure all UUIDs become strings
-            task_data = json.loads(json.dumps(TaskSerializer(task).data, default=str))
-            async_to_sync(channel_layer.group_send)(
-                project_group_name,
-                {
-                    'type': 'task_update',
-                    'task': task_data,
-                    'action': 'status_changed'
-                }
-            )
+    slots = SlotLeaseManager()
 
     try:
         # Update status to RUNNING
         attempt.status = 'RUNNING'
         attempt.started_at = timezone.now()
         attempt.save()
+        slots.heartbeat(attempt_id)
 
-        send_event('STATUS', f'Starting {attempt.agent_role} agent execution')
+        send_attempt_event(attempt, 'STATUS', f'Starting {attempt.agent_role} agent execution')
 
         # Get task and project data
         task = attempt.task
@@ -93,7 +114,7 @@ def start_attempt_task(self, attempt_id: str):
         )
 
         # Build LDA request
-        from apps.local_access.lda_client import call_lda
+        from apps.local_access.node_pool import LDANodePool
         
         # Ensure acceptance_criteria is a proper list (not the list callable)
         acceptance_criteria = task.acceptance_criteria
@@ -116,30 +137,103 @@ def start_attempt_task(self, attempt_id: str):
                 'config': project.config or {},
             },
             'writable_roots': writable_roots,
-            'model': 'gemini-2.5-flash'  # Default model
+            'model': 'gemini-2.5-flash',  # Default model
+            'callback_url': f"{settings.BACKEND_URL}/api/attempts/{attempt.id}/lda-callback/",
         }
 
-        send_event('LOG', f'Calling LDA with task: {task.title}')
+        send_attempt_event(attempt, 'LOG', f'Calling LDA with task: {task.title}')
 
-        # Call LDA agent/run endpoint with proper authentication
-        response = call_lda(
-            endpoint="/api/v1/agent/run",
+        # Submit the agent job to the repo's LDA node; it calls back when it finishes
+        response, node = LDANodePool().call(
+            endpoint="/api/v1/agent/jobs",
             data=request_data,
-            timeout=600.0  # 10 minute timeout for agent execution
+            repo_path=project.repo_path,
+            timeout=30.0
         )
         response.raise_for_status()
-        result = response.json()
+        job = response.json()
+
+        attempt.lda_job_id = job['job_id']
+        attempt.lda_node = node
+        attempt.save(update_fields=['lda_job_id', 'lda_node', 'updated_at'])
+        slots.heartbeat(attempt_id)
+
+        send_attempt_event(attempt, 'LOG', f'LDA job {job["job_id"]} submitted to node {node.name}')
+
+        return {
+            'attempt_id': str(attempt.id),
+            'job_id': job['job_id'],
+            'status': 'submitted'
+        }
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 429 and self.request.retries < self.max_retries:
+            # LDA is shedding load: keep the slot and resubmit when it says to
+            slots.heartbeat(attempt_id)
+            send_attempt_event(attempt, 'LOG', 'LDA is busy, retrying submission')
+            retry_after = int(e.response.headers.get('Retry-After', 30))
+            raise self.retry(exc=e, countdown=retry_after)
+
+        error_msg = f'LDA HTTP error: {e.response.status_code} - {e.response.text}'
+        _fail_attempt(attempt, error_msg)
+        return {'attempt_id': str(attempt.id), 'error': error_msg}
+
+    except httpx.RequestError as e:
+        error_msg = f'Cannot connect to LDA: {str(e)}'
+        _fail_attempt(attempt, error_msg, release_slot=False)
+        raise self.retry(exc=e, countdown=30)
+
+    except Exception as e:
+        error_msg = f'Unexpected error: {str(e)}'
+        _fail_attempt(attempt, error_msg)
+        return {'attempt_id': str(attempt.id), 'error': error_msg}
+
+
+def complete_attempt_from_job(attempt_id: str, job: dict):
+    """
+    Apply a finished LDA agent job to its attempt.
+
+    Idempotent: the callback and the poller may both deliver the same
+    job, and only the first one to see the attempt RUNNING applies it.
+
+    Args:
+        attempt_id: UUID of the attempt
+        job: Finished job with 'status', 'result' and 'error'
+
+    Returns:
+        dict with the final attempt status, or None if nothing was applied
+    """
+    from apps.attempts.models import Attempt, AttemptGateResult
+    from apps.attempts.services import SlotLeaseManager, save_attempt_diff
+
+    with transaction.atomic():
+        try:
+            attempt = Attempt.objects.select_for_update().select_related(
+                'task', 'task__project'
+            ).get(id=attempt_id)
+        except Attempt.DoesNotExist:
+            return None
+
+        if attempt.status != 'RUNNING' or attempt.lda_job_id != job.get('job_id'):
+            return None
+
+        result = job.get('result') or {}
+
+        if job.get('status') == 'FAILED':
+            error_msg = f"LDA job failed: {job.get('error') or 'Unknown error'}"
+            _fail_attempt(attempt, error_msg)
+            return {'attempt_id': str(attempt.id), 'status': attempt.status}
 
         # Process result
         if result.get('success'):
             attempt.status = 'SUCCESS'
             attempt.git_branch = result.get('git_branch', '')
             attempt.worktree_path = result.get('worktree_path', '')
-            attempt.diff = result.get('diff', '')
+            save_attempt_diff(attempt, result.get('diff', ''))
             attempt.files_changed = result.get('files_changed', [])
             attempt.result = result.get('output', '')
 
-            send_event('STATUS', 'Agent execution completed successfully')
+            send_attempt_event(attempt, 'STATUS', 'Agent execution completed successfully')
 
             # Save quality gate results
             gate_results = result.get('gate_results', {})
@@ -153,7 +247,8 @@ def start_attempt_task(self, attempt_id: str):
                             output=gate_data.get('output', ''),
                             duration_seconds=gate_data.get('duration')
                         )
-                        send_event(
+                        send_attempt_event(
+                            attempt,
                             'PROGRESS',
                             f'{gate_type} gate: {"PASSED" if gate_data.get("passed") else "FAILED"}',
                             {'gate_type': gate_type, 'passed': gate_data.get('passed')}
@@ -161,12 +256,14 @@ def start_attempt_task(self, attempt_id: str):
         else:
             attempt.status = 'FAILED'
             attempt.error_message = result.get('error', 'Unknown error')
-            send_event('ERROR', f'Agent execution failed: {attempt.error_message}')
+            send_attempt_event(attempt, 'ERROR', f'Agent execution failed: {attempt.error_message}')
 
         attempt.completed_at = timezone.now()
         attempt.save()
+        SlotLeaseManager().release(str(attempt.id))
 
         # Update task status
+        task = attempt.task
         if attempt.status == 'SUCCESS':
             task.status = 'IN_REVIEW'
         else:
@@ -185,47 +282,207 @@ def start_attempt_task(self, attempt_id: str):
             'files_changed': attempt.files_changed
         }
 
-    except httpx.HTTPStatusError as e:
-        error_msg = f'LDA HTTP error: {e.response.status_code} - {e.response.text}'
-        attempt.status = 'FAILED'
-        attempt.error_message = error_msg
-        attempt.completed_at = timezone.now()
-        attempt.save()
 
-        attempt.task.status = 'TODO'
-        attempt.task.save()
-        broadcast_task_update(attempt.task)
+def cleanup_attempt_branch(attempt):
+    """Delete an attempt's branch on the LDA after approval/rejection."""
+    from apps.local_access.node_pool import LDANodePool
 
-        send_event('ERROR', error_msg)
-        return {'attempt_id': str(attempt.id), 'error': error_msg}
+    if not attempt.git_branch:
+        return
 
-    except httpx.RequestError as e:
-        error_msg = f'Cannot connect to LDA: {str(e)}'
-        attempt.status = 'FAILED'
-        attempt.error_message = error_msg
-        attempt.completed_at = timezone.now()
-        attempt.save()
+    try:
+        LDANodePool().call(
+            "/api/v1/git/cleanup",
+            {
+                "repo_path": attempt.task.project.repo_path,
+                "worktree_path": attempt.git_branch  # Pass branch name for cleanup
+            },
+            repo_path=attempt.task.project.repo_path,
+            timeout=30.0
+        )
+    except Exception:
+        # Cleanup failure is not critical
+        pass
 
-        attempt.task.status = 'TODO'
-        attempt.task.save()
-        broadcast_task_update(attempt.task)
 
-        send_event('ERROR', error_msg)
-        raise self.retry(exc=e, countdown=30)
+@shared_task
+def run_attempt_approval(operation_id: str):
+    """
+    Merge an approved attempt's branch into main.
+
+    Background half of AttemptViewSet.approve. A merge conflict finishes
+    the operation with result status 'conflict' (HTTP 409 equivalent).
+
+    Args:
+        operation_id: UUID of the APPROVE_ATTEMPT operation
+    """
+    from apps.attempts.models import Attempt
+    from apps.local_access.node_pool import LDANodePool
+    from apps.projects.models import Operation
+    from apps.projects.operations import update_operation, serialize_operation
+
+    operation = Operation.objects.get(id=operation_id)
+    if operation.is_finished:
+        return serialize_operation(operation)
+
+    attempt = Attempt.objects.select_related('task', 'task__project').get(
+        id=operation.params['attempt_id']
+    )
+    if attempt.status != 'SUCCESS':
+        update_operation(
+            operation, 'FAILED',
+            error=f'Can only approve successful attempts (current: {attempt.status})',
+            http_status=400
+        )
+        return serialize_operation(operation)
 
+    update_operation(operation, 'RUNNING')
+
+    # Call the repo's LDA node to merge
+    try:
+        response, _ = LDANodePool().call(
+            "/api/v1/git/merge",
+            {
+                "repo_path": attempt.task.project.repo_path,
+                "branch_name": attempt.git_branch,
+                "target_branch": "main",
+                "task_id": str(attempt.task_id)
+            },
+            repo_path=attempt.task.project.repo_path,
+            timeout=60.0
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        if result.get('success'):
+            # Update attempt status
+            attempt.status = 'APPROVED'
+            attempt.save()
+
+            # Update task status
+            attempt.task.status = 'DONE'
+            attempt.task.save()
+            broadcast_task_update(attempt.task)
+
+            # Cleanup worktree
+            cleanup_attempt_branch(attempt)
+
+            update_operation(operation, 'SUCCEEDED', result={
+                'status': 'approved',
+                'message': result.get('message', 'Changes merged successfully')
+            }, http_status=200)
+        else:
+            update_operation(operation, 'SUCCEEDED', result={
+                'status': 'conflict',
+                'error': result.get('error', 'Merge failed')
+            }, http_status=409)
+
+    except httpx.HTTPStatusError as e:
+        update_operation(operation, 'FAILED', error=f'LDA error: {e.response.text}', http_status=502)
+    except httpx.RequestError as e:
+        update_operation(operation, 'FAILED', error=f'Cannot connect to LDA: {str(e)}', http_status=503)
     except Exception as e:
-        error_msg = f'Unexpected error: {str(e)}'
-        attempt.status = 'FAILED'
-        attempt.error_message = error_msg
-        attempt.completed_at = timezone.now()
-        attempt.save()
+        update_operation(operation, 'FAILED', error=f'Unexpected error: {str(e)}', http_status=500)
 
-        attempt.task.status = 'TODO'
-        attempt.task.save()
-        broadcast_task_update(attempt.task)
+    return serialize_operation(operation)
 
-        send_event('ERROR', error_msg)
-        return {'attempt_id': str(attempt.id), 'error': error_msg}
+
+@shared_task
+def poll_lda_jobs():
+    """
+    Reconcile running attempts with their LDA jobs.
+
+    Fallback for lost callbacks: applies finished jobs, fails attempts
+    whose job the LDA no longer knows, and renews slot leases of jobs
+    that are still running. Runs periodically via Celery Beat.
+    """
+    from apps.attempts.models import Attempt
+    from apps.attempts.services import SlotLeaseManager
+    from apps.local_access.node_pool import LDANodePool
+
+    running = list(
+        Attempt.objects.filter(status='RUNNING').exclude(lda_job_id='').select_related(
+            'lda_node', 'task__project'
+        )
+    )
+    if not running:
+        return {'checked': 0}
+
+    # Jobs live on the node that accepted them
+    pool = LDANodePool()
+    by_node = {}
+    for attempt in running:
+        node = attempt.lda_node
+        if node is None:
+            try:
+                node = pool.route(attempt.task.project.repo_path)
+            except httpx.RequestError:
+                continue
+        by_node.setdefault(node.id, (node, {}))[1][attempt.lda_job_id] = attempt.id
+
+    slots = SlotLeaseManager()
+    completed = lost = renewed = 0
+    unreachable = []
+
+    for node, node_jobs in by_node.values():
+        try:
+            response, _ = pool.call(
+                endpoint="/api/v1/agent/jobs/status",
+                data={'job_ids': list(node_jobs.keys())},
+                node=node,
+                timeout=30.0
+            )
+            response.raise_for_status()
+        except (httpx.RequestError, httpx.HTTPStatusError):
+            # Node unreachable: keep leases alive until it comes back or they expire
+            unreachable.append(node.name)
+            continue
+
+        jobs = {job['job_id']: job for job in response.json().get('jobs', [])}
+
+        for job_id, attempt_id in node_jobs.items():
+            job = jobs.get(job_id)
+            if job is None:
+                if complete_attempt_from_job(str(attempt_id), {
+                    'job_id': job_id, 'status': 'FAILED', 'error': 'Job not found on LDA'
+                }):
+                    lost += 1
+            elif job['status'] in ('SUCCEEDED', 'FAILED'):
+                try:
+                    result_response, _ = pool.call(
+                        endpoint=f"/api/v1/agent/jobs/{job_id}/result",
+                        data={},
+                        node=node,
+                        method="GET",
+                        timeout=30.0
+                    )
+                    result_response.raise_for_status()
+                except (httpx.RequestError, httpx.HTTPStatusError):
+                    continue
+                if complete_attempt_from_job(str(attempt_id), result_response.json()):
+                    completed += 1
+            else:
+                slots.heartbeat(str(attempt_id))
+                renewed += 1
+
+    return {
+        'checked': len(running),
+        'completed': completed,
+        'lost': lost,
+        'renewed': renewed,
+        'unreachable_nodes': unreachable,
+    }
+
+
+@shared_task
+def refresh_lda_nodes():
+    """
+    Refresh health, capacity and load of all LDA nodes.
+    Runs periodically via Celery Beat.
+    """
+    from apps.local_access.node_pool import LDANodePool
+
+    return LDANodePool().refresh()
 
 
 @shared_task
@@ -245,20 +502,23 @@ def cleanup_old_worktrees():
         status__in=['APPROVED', 'REJECTED', 'CANCELLED', 'FAILED']
     ).exclude(worktree_path='')
 
-    from apps.local_access.lda_client import call_lda_safe
-    
+    from apps.local_access.node_pool import LDANodePool
+
+    pool = LDANodePool()
     cleaned = 0
-    for attempt in old_attempts:
+    for attempt in old_attempts.select_related('task__project'):
         try:
-            result = call_lda_safe(
+            response, _ = pool.call(
                 endpoint="/api/v1/git/cleanup",
                 data={
                     'repo_path': attempt.task.project.repo_path,
                     'worktree_path': attempt.worktree_path
                 },
+                repo_path=attempt.task.project.repo_path,
                 timeout=30.0
             )
-            if result:
+            response.raise_for_status()
+            if response.json():
                 attempt.worktree_path = ''
                 attempt.save()
                 cleaned += 1
@@ -266,3 +526,29 @@ def cleanup_old_worktrees():
             pass
 
     return {'cleaned_worktrees': cleaned}
+
+
+@shared_task
+def archive_attempt_events():
+    """
+    Move attempt events past their retention period to compressed archives
+    and drop expired archives.
+    Runs daily via Celery Beat.
+    """
+    from apps.attempts.services import AttemptEventArchiver
+
+    archiver = AttemptEventArchiver()
+    result = archiver.archive()
+    result['purged_archives'] = archiver.purge()
+    return result
+
+
+@shared_task
+def collect_blob_garbage():
+    """
+    Delete blobs (diffs, outputs) that nothing refers to anymore.
+    Runs daily via Celery Beat.
+    """
+    from apps.attempts.services import blob_store
+
+    return {'deleted_blobs': blob_store.collect_garbage()}
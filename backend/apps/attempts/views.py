@@ -1,26 +1,79 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-import httpx
-from apps.local_access.lda_client import call_lda
-from .models import Attempt, AttemptEvent, AttemptGateResult
+from .models import Attempt, AttemptDiffFile, AttemptGateResult
+from .services import AttemptEventLog, SlotLeaseManager, SlotUnavailable, blob_store, split_hunks
 from .serializers import (
-    AttemptSerializer, AttemptCreateSerializer, AttemptRejectSerializer,
-    AttemptEventSerializer, AttemptGateResultSerializer
+    AttemptSerializer, AttemptSummarySerializer, AttemptCreateSerializer,
+    AttemptRejectSerializer, AttemptGateResultSerializer, requested_fields
 )
+from apps.projects.models import Project
+from apps.projects.versioning import ProjectVersionETagMixin
+from apps.tasks.board_sync import board_publisher
 from apps.tasks.models import Task
 from apps.local_access.models import WritableRoot
 
+# Related rows loaded only when the representation includes them
+PREFETCH_FIELDS = {
+    'diff': ('diff_files',),
+    # Archived months are read back from the blob store (see AttemptEventLog)
+    'events': ('event_archives', 'events'),
+    'gate_results': ('gate_results',),
+}
 
-class AttemptViewSet(viewsets.ModelViewSet):
+
+class AttemptEventPagination(PageNumberPagination):
+    page_size = 200
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class AttemptDiffPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class AttemptHunkPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class AttemptViewSet(ProjectVersionETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for attempts with start, approve, and reject actions.
+
+    Lists use a summary representation; both list and detail support
+    ?fields= and ?expand= (see SparseFieldsetMixin).
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AttemptSerializer
 
+    def get_etag_projects(self):
+        if 'events' in requested_fields(self.request, 'expand'):
+            # Events aren't versioned
+            return None
+        projects = Project.objects.filter(owner=self.request.user)
+        if self.action == 'retrieve':
+            return projects.filter(tasks__attempts__id=self.kwargs['pk'])
+        project_id = self.request.query_params.get('project')
+        if project_id:
+            projects = projects.filter(id=project_id)
+        task_id = self.request.query_params.get('task')
+        if task_id:
+            projects = projects.filter(tasks__id=task_id)
+        return projects
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AttemptSummarySerializer
+        return AttemptSerializer
+
     def get_queryset(self):
         queryset = Attempt.objects.filter(task__project__owner=self.request.user)
 
@@ -44,9 +97,18 @@ class AttemptViewSet(viewsets.ModelViewSet):
         if role:
             queryset = queryset.filter(agent_role=role)
 
-        return queryset.select_related(
-            'task', 'task__project'
-        ).prefetch_related('events', 'gate_results').order_by('-created_at')
+        queryset = queryset.select_related('task', 'task__project').order_by('-created_at')
+
+        if self.action in ('list', 'retrieve'):
+            # Only load what the (sparse) representation will output
+            output = set(self.get_serializer().fields)
+            prefetch = [
+                lookup for field, lookups in PREFETCH_FIELDS.items() if field in output for lookup in lookups
+            ]
+            if prefetch:
+                queryset = queryset.prefetch_related(*prefetch)
+
+        return queryset
 
     @action(detail=False, methods=['post'])
     def start(self, request):
@@ -92,12 +154,20 @@ class AttemptViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        # Create attempt
-        attempt = Attempt.objects.create(
-            task=task,
-            agent_role=task.agent_role,
-            status='QUEUED'
-        )
+        # Create attempt and lease an execution slot for it
+        try:
+            with transaction.atomic():
+                attempt = Attempt.objects.create(
+                    task=task,
+                    agent_role=task.agent_role,
+                    status='QUEUED'
+                )
+                SlotLeaseManager().acquire(attempt, task.project, task.agent_role)
+        except SlotUnavailable as e:
+            return Response(
+                {'error': f'No execution slot available: {e}'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
 
         # Trigger Celery task
         try:
@@ -114,6 +184,7 @@ class AttemptViewSet(viewsets.ModelViewSet):
             attempt.status = 'FAILED'
             attempt.error_message = f'Failed to queue task: {str(e)}'
             attempt.save()
+            SlotLeaseManager().release(str(attempt.id))
             return Response(
                 {'error': f'Failed to start attempt: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -123,61 +194,41 @@ class AttemptViewSet(viewsets.ModelViewSet):
     def approve(self, request, pk=None):
         """
         Approve an attempt and merge changes to main branch.
+        Returns 202 with an operation id; the merge runs in the background.
         """
         attempt = self.get_object()
 
-        if attempt.status != 'SUCCESS':
-            return Response(
-                {'error': f'Can only approve successful attempts (current: {attempt.status})'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        from apps.projects.models import Operation
+        from apps.projects.operations import start_operation, accepted_response_data
+        from .tasks import run_attempt_approval
 
-        # Call LDA to merge
-        try:
-            response = call_lda(
-                "/api/v1/git/merge",
-                {
-                    "repo_path": attempt.task.project.repo_path,
-                    "branch_name": attempt.git_branch,
-                    "target_branch": "main"
-                },
-                timeout=60.0
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if result.get('success'):
-                # Update attempt status
-                attempt.status = 'APPROVED'
-                attempt.save()
-
-                # Update task status
-                attempt.task.status = 'DONE'
-                attempt.task.save()
-
-                # Cleanup worktree
-                self._cleanup_worktree(attempt)
-
-                return Response({
-                    'status': 'approved',
-                    'message': result.get('message', 'Changes merged successfully')
-                })
-            else:
-                return Response({
-                    'status': 'conflict',
-                    'error': result.get('error', 'Merge failed')
-                }, status=status.HTTP_409_CONFLICT)
-
-        except httpx.HTTPStatusError as e:
-            return Response(
-                {'error': f'LDA error: {e.response.text}'},
-                status=status.HTTP_502_BAD_GATEWAY
-            )
-        except httpx.RequestError as e:
-            return Response(
-                {'error': f'Cannot connect to LDA: {str(e)}'},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
+        with transaction.atomic():
+            # Concurrent approves queue behind this lock, then find the
+            # first one's operation instead of starting a second merge
+            attempt = Attempt.objects.select_for_update(of=('self',)).select_related('task__project').get(pk=attempt.pk)
+
+            if attempt.status != 'SUCCESS':
+                return Response(
+                    {'error': f'Can only approve successful attempts (current: {attempt.status})'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # A merge already in flight for this attempt is reused, not repeated
+            operation = Operation.objects.filter(
+                kind='APPROVE_ATTEMPT',
+                params__attempt_id=str(attempt.id),
+                status__in=['PENDING', 'RUNNING']
+            ).first()
+            if operation is None:
+                # The merge can take a while on the LDA; run it in the background
+                operation = start_operation(
+                    attempt.task.project,
+                    request.user,
+                    'APPROVE_ATTEMPT',
+                    {'attempt_id': str(attempt.id)},
+                    run_attempt_approval
+                )
+        return Response(accepted_response_data(operation), status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
@@ -204,6 +255,7 @@ class AttemptViewSet(viewsets.ModelViewSet):
         # Update task status back to TODO
         attempt.task.status = 'TODO'
         attempt.task.save()
+        board_publisher.task_changed(attempt.task, ['status', 'updated_at'])
 
         # Cleanup worktree
         self._cleanup_worktree(attempt)
@@ -229,22 +281,138 @@ class AttemptViewSet(viewsets.ModelViewSet):
         attempt.status = 'CANCELLED'
         attempt.completed_at = timezone.now()
         attempt.save()
+        SlotLeaseManager().release(str(attempt.id))
 
         # Update task status back to TODO
         attempt.task.status = 'TODO'
         attempt.task.save()
+        board_publisher.task_changed(attempt.task, ['status', 'updated_at'])
 
         # Cleanup worktree if exists
         self._cleanup_worktree(attempt)
 
         return Response({'status': 'cancelled'})
 
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path='lda-callback',
+        permission_classes=[permissions.AllowAny],
+        authentication_classes=[]
+    )
+    def lda_callback(self, request, pk=None):
+        """
+        Receive the result of a finished LDA agent job.
+
+        Authenticated by the LDA's HMAC signature instead of a user session.
+        """
+        from apps.local_access.lda_client import verify_lda_signature
+        from .tasks import complete_attempt_from_job
+
+        # Signature covers the raw body, so read it before parsing
+        body = request.body
+        if not verify_lda_signature(
+            request.headers.get('X-Timestamp', ''),
+            body,
+            request.headers.get('X-Signature', '')
+        ):
+            return Response({'error': 'Invalid signature'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            attempt = Attempt.objects.get(id=pk)
+        except (Attempt.DoesNotExist, ValueError):
+            return Response({'error': 'Attempt not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        job = request.data
+        if not attempt.lda_job_id or job.get('job_id') != attempt.lda_job_id:
+            # Stale job (e.g. the attempt was restarted); acknowledge so the LDA stops retrying
+            return Response({'status': 'ignored'})
+
+        result = complete_attempt_from_job(str(attempt.id), job)
+        return Response({'status': 'applied' if result else 'ignored'})
+
     @action(detail=True, methods=['get'])
     def events(self, request, pk=None):
-        """Get all events for an attempt."""
+        """
+        Get an attempt's events, paginated in seq order.
+        ?after_seq=N only returns events after N (to resume a log).
+        Archived events are read back from the archive transparently.
+        """
         attempt = self.get_object()
-        events = AttemptEvent.objects.filter(attempt=attempt).order_by('timestamp')
-        return Response(AttemptEventSerializer(events, many=True).data)
+
+        after_seq = request.query_params.get('after_seq') or None
+        if after_seq is not None:
+            try:
+                after_seq = int(after_seq)
+            except ValueError:
+                return Response(
+                    {'error': 'after_seq must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        paginator = AttemptEventPagination()
+        page = paginator.paginate_queryset(
+            AttemptEventLog(attempt.id, after_seq=after_seq), request, view=self
+        )
+        return paginator.get_paginated_response(page)
+
+    @action(detail=True, methods=['get'])
+    def diff(self, request, pk=None):
+        """
+        Get an attempt's diff split per file, paginated.
+        Only the files on the requested page are decompressed;
+        ?content=false lists files without their diff text.
+        """
+        attempt = self.get_object()
+        files = AttemptDiffFile.objects.filter(attempt=attempt).order_by('position')
+
+        paginator = AttemptDiffPagination()
+        page = paginator.paginate_queryset(files, request, view=self)
+
+        include_content = request.query_params.get('content', 'true').lower() != 'false'
+        texts = blob_store.get_many_text([f.blob_id for f in page]) if include_content else {}
+
+        results = []
+        for diff_file in page:
+            entry = {
+                'path': diff_file.path,
+                'old_path': diff_file.old_path,
+                'additions': diff_file.additions,
+                'deletions': diff_file.deletions,
+            }
+            if include_content:
+                entry['diff'] = texts[diff_file.blob_id]
+            results.append(entry)
+        return paginator.get_paginated_response(results)
+
+    @action(detail=True, methods=['get'], url_path='diff/hunks')
+    def diff_hunks(self, request, pk=None):
+        """
+        Get the hunks of one file of an attempt's diff, paginated.
+        Requires ?path=; only that file's blob is decompressed.
+        """
+        attempt = self.get_object()
+        path = request.query_params.get('path')
+        if path is None:
+            return Response(
+                {'error': 'path is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        diff_file = AttemptDiffFile.objects.filter(attempt=attempt, path=path).first()
+        if diff_file is None:
+            return Response(
+                {'error': 'File not in diff'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        header, hunks = split_hunks(blob_store.get_text(diff_file.blob_id))
+        paginator = AttemptHunkPagination()
+        page = paginator.paginate_queryset(hunks, request, view=self)
+        response = paginator.get_paginated_response(page)
+        response.data['path'] = diff_file.path
+        response.data['header'] = header
+        return response
 
     @action(detail=True, methods=['get'], url_path='gate-results')
     def gate_results(self, request, pk=None):
@@ -255,18 +423,6 @@ class AttemptViewSet(viewsets.ModelViewSet):
 
     def _cleanup_worktree(self, attempt):
         """Helper to cleanup branch after approval/rejection."""
-        if not attempt.git_branch:
-            return
+        from .tasks import cleanup_attempt_branch
 
-        try:
-            call_lda(
-                "/api/v1/git/cleanup",
-                {
-                    "repo_path": attempt.task.project.repo_path,
-                    "worktree_path": attempt.git_branch  # Pass branch name for cleanup
-                },
-                timeout=30.0
-            )
-        except Exception:
-            # Cleanup failure is not critical
-            pass
+        cleanup_attempt_branch(attempt)
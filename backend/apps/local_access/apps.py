@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class LocalAccessConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.local_access"
+
+    def ready(self):
+        from .audit_rollups import connect_signals
+
+        connect_signals()
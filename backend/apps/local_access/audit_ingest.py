@@ -0,0 +1,213 @@
+"""
+Audit Ingest - Bulk insert of audit records shipped by LDA nodes.
+
+The LDA buffers its audit records and ships them as NDJSON batches (one
+JSON object per line). A batch is validated line by line and stored with
+multi-row inserts in one transaction. Records carry an id assigned by the
+LDA, so a batch that is re-sent after a lost response is not stored
+(or counted in the hourly rollups) twice. Malformed lines are rejected
+individually; they never fail the rest of the batch, since the LDA would
+otherwise re-send it forever.
+"""
+import json
+import logging
+import uuid
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .audit_rollups import record_audit_rollups
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = {choice for choice, _ in AuditLog.OPERATION_CHOICES}
+RESULTS = {choice for choice, _ in AuditLog.RESULT_CHOICES}
+
+# Rejections echoed back per batch; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+class AuditBatchTooLarge(Exception):
+    """Raised when a batch has more records than AUDIT_INGEST_MAX_RECORDS."""
+
+
+def _parse_record(record: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate one decoded line; returns (fields, None) or (None, error)."""
+    if not isinstance(record, dict):
+        return None, 'Record must be a JSON object'
+
+    action = record.get('action')
+    if action not in ACTIONS:
+        return None, f"Invalid action: {action!r}"
+    result = record.get('result', 'ALLOWED')
+    if result not in RESULTS:
+        return None, f"Invalid result: {result!r}"
+    path = record.get('path')
+    if not isinstance(path, str) or not path:
+        return None, 'Missing path'
+    details = record.get('details') or {}
+    if not isinstance(details, dict):
+        return None, 'details must be an object'
+
+    try:
+        record_id = uuid.UUID(str(record['id'])) if record.get('id') else uuid.uuid4()
+        task_id = uuid.UUID(str(record['task_id'])) if record.get('task_id') else None
+        user_id = uuid.UUID(str(record['user_id'])) if record.get('user_id') else None
+    except ValueError:
+        return None, 'Invalid id, task_id or user_id'
+
+    created_at = None
+    if record.get('created_at'):
+        created_at = parse_datetime(str(record['created_at']))
+        if created_at is None:
+            return None, f"Invalid created_at: {record['created_at']!r}"
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at, dt_timezone.utc)
+
+    return {
+        'id': record_id,
+        'task_id': task_id,
+        'user_id': user_id,
+        'action': action,
+        'path': path[:1024],
+        'result': result,
+        'details': details,
+        'created_at': created_at or timezone.now(),
+    }, None
+
+
+def parse_audit_batch(body: bytes) -> Tuple[List[Dict[str, Any]], int, List[Dict[str, Any]]]:
+    """
+    Parse an NDJSON batch of audit records.
+
+    Args:
+        body: Raw request body, one JSON object per line
+
+    Returns:
+        Tuple of (valid records, number of rejected lines, first errors as
+        {'line': n, 'error': text})
+
+    Raises:
+        AuditBatchTooLarge: If the batch exceeds AUDIT_INGEST_MAX_RECORDS
+    """
+    max_records = getattr(settings, 'AUDIT_INGEST_MAX_RECORDS', 5000)
+    records: List[Dict[str, Any]] = []
+    rejected = 0
+    errors: List[Dict[str, Any]] = []
+
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        if len(records) + rejected >= max_records:
+            raise AuditBatchTooLarge(f"Batch exceeds {max_records} records")
+        try:
+            fields, error = _parse_record(json.loads(line))
+        except (ValueError, UnicodeDecodeError):
+            fields, error = None, 'Invalid JSON'
+        if error:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': number, 'error': error})
+            continue
+        records.append(fields)
+
+    return records, rejected, errors
+
+
+def insert_new_logs(logs: List[AuditLog], batch_size: int = 1000) -> List[AuditLog]:
+    """
+    Insert audit records, skipping ids that are already stored.
+
+    Re-sent batches carry the same ids, possibly while the first copy is
+    still being ingested by another request. The database reports which
+    rows it inserted (INSERT ... ON CONFLICT DO NOTHING RETURNING), so
+    only those are counted in the rollups, whoever wins the race.
+
+    Returns:
+        The records that were inserted
+    """
+    fields = AuditLog._meta.concrete_fields
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    row = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    by_id = {log.id: log for log in logs}
+
+    inserted = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(logs), batch_size):
+            batch = logs[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(field.pre_save(log, True), connection)
+                for log in batch for field in fields
+            ]
+            cursor.execute(
+                f"INSERT INTO {quote(AuditLog._meta.db_table)} ({columns}) "
+                f"VALUES {', '.join([row] * len(batch))} "
+                f"ON CONFLICT ({quote(AuditLog._meta.pk.column)}) DO NOTHING "
+                f"RETURNING {quote(AuditLog._meta.pk.column)}",
+                params
+            )
+            inserted.extend(by_id[AuditLog._meta.pk.to_python(row_id)] for row_id, in cursor.fetchall())
+    return inserted
+
+
+def ingest_audit_batch(body: bytes) -> Dict[str, Any]:
+    """
+    Store an NDJSON batch of audit records.
+
+    Records referring to a task that no longer exists are kept without
+    the task. Records without a user are attributed to the owner of their
+    task's project.
+
+    Returns:
+        dict with 'accepted' and 'rejected' counts and 'errors'
+
+    Raises:
+        AuditBatchTooLarge: If the batch exceeds AUDIT_INGEST_MAX_RECORDS
+    """
+    from django.contrib.auth import get_user_model
+    from apps.tasks.models import Task
+
+    records, rejected, errors = parse_audit_batch(body)
+    if not records:
+        return {'accepted': 0, 'rejected': rejected, 'errors': errors}
+
+    # Resolve all references with two queries instead of one per record
+    task_owners = dict(
+        Task.objects.filter(
+            id__in={r['task_id'] for r in records if r['task_id']}
+        ).values_list('id', 'project__owner_id')
+    )
+    known_users = set(
+        get_user_model().objects.filter(
+            pk__in={r['user_id'] for r in records if r['user_id']}
+        ).values_list('pk', flat=True)
+    )
+
+    logs = []
+    for record in records:
+        task_id = record['task_id'] if record['task_id'] in task_owners else None
+        user_id = record['user_id'] if record['user_id'] in known_users else None
+        if user_id is None and task_id is not None:
+            user_id = task_owners[task_id]
+        logs.append(AuditLog(
+            id=record['id'],
+            task_id=task_id,
+            user_id=user_id,
+            action=record['action'],
+            path=record['path'],
+            result=record['result'],
+            details=record['details'],
+            created_at=record['created_at'],
+        ))
+
+    with transaction.atomic():
+        new_logs = insert_new_logs(logs)
+        record_audit_rollups(new_logs)
+
+    if rejected:
+        logger.warning(f"Rejected {rejected} malformed audit records")
+    return {'accepted': len(logs), 'rejected': rejected, 'errors': errors}
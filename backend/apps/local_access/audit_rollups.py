@@ -0,0 +1,137 @@
+"""
+Audit Rollups - Hourly pre-aggregated audit statistics.
+
+Every stored audit record increments the AuditLogRollup row of its hour,
+user, action and result, in the same transaction as the record. Audit
+statistics then sum a bounded number of rollup rows (hours in range x
+users x actions x results) however large the audit log grows.
+
+Counts of a deleted user move to the rollups without a user, where the
+user's audit records end up too.
+
+Time ranges have hour granularity: a range covers the whole hours its
+bounds fall in.
+"""
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Optional
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import pre_delete
+from .models import AuditLog, AuditLogRollup
+
+
+def hour_start(moment: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour, in UTC."""
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record_audit_rollups(logs: Iterable[AuditLog]) -> None:
+    """
+    Add newly stored audit records to their hourly rollups.
+
+    Call in the transaction that stored the records, so rollups and the
+    audit log can't drift apart.
+    """
+    counts = Counter(
+        (hour_start(log.created_at), log.user_id, log.action, log.result)
+        for log in logs
+    )
+    for (hour, user_id, action, result), count in counts.items():
+        _increment(hour, user_id, action, result, count)
+
+
+def _increment(hour: datetime, user_id, action: str, result: str, count: int) -> None:
+    rollup = AuditLogRollup.objects.filter(hour=hour, user_id=user_id, action=action, result=result)
+    if rollup.update(count=F('count') + count):
+        return
+    try:
+        with transaction.atomic():
+            AuditLogRollup.objects.create(
+                hour=hour, user_id=user_id, action=action, result=result, count=count
+            )
+    except IntegrityError:
+        # Created concurrently by another ingest; its row exists now
+        rollup.update(count=F('count') + count)
+
+
+def merge_user_rollups(user_id) -> None:
+    """
+    Move a user's rollup counts to the rollups without a user.
+
+    A deleted user's audit records are kept without the user (SET_NULL),
+    while their rollup rows cascade; merging the counts first keeps the
+    totals equal to the audit log.
+    """
+    for rollup in AuditLogRollup.objects.filter(user_id=user_id).values('hour', 'action', 'result', 'count'):
+        _increment(rollup['hour'], None, rollup['action'], rollup['result'], rollup['count'])
+
+
+def _user_deleted(sender, instance, **kwargs) -> None:
+    merge_user_rollups(instance.pk)
+
+
+def connect_signals() -> None:
+    """Merge rollups of deleted users; called from LocalAccessConfig.ready()."""
+    pre_delete.connect(_user_deleted, sender=settings.AUTH_USER_MODEL, dispatch_uid='audit_rollups_user_delete')
+
+
+def audit_stats(
+    user=None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    action: Optional[str] = None,
+    result: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Audit statistics from rollups.
+
+    Args:
+        user: Only count this user's records (default: all users)
+        since: Start of the range (its hour is included)
+        until: End of the range (its hour is included)
+        action: Only count this action
+        result: Only count this result
+
+    Returns:
+        dict with 'total', 'allowed', 'denied' and 'by_action' counts
+    """
+    rollups = AuditLogRollup.objects.all()
+    if user is not None:
+        rollups = rollups.filter(user=user)
+    if since is not None:
+        rollups = rollups.filter(hour__gte=hour_start(since))
+    if until is not None:
+        rollups = rollups.filter(hour__lte=hour_start(until))
+    if action:
+        rollups = rollups.filter(action=action)
+    if result:
+        rollups = rollups.filter(result=result)
+
+    return summarize_counts(
+        rollups.order_by().values('action', 'result').annotate(total=Sum('count'))
+    )
+
+
+def summarize_counts(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build audit statistics from per-(action, result) counts.
+
+    Args:
+        rows: dicts with 'action', 'result' and 'total'
+    """
+    stats = {
+        'total': 0,
+        'allowed': 0,
+        'denied': 0,
+        'by_action': {code: 0 for code, _ in AuditLog.OPERATION_CHOICES},
+    }
+    for row in rows:
+        stats['total'] += row['total']
+        if row['result'] == 'ALLOWED':
+            stats['allowed'] += row['total']
+        elif row['result'] == 'DENIED':
+            stats['denied'] += row['total']
+        stats['by_action'][row['action']] = stats['by_action'].get(row['action'], 0) + row['total']
+    return stats
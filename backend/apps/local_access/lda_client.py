@@ -1,13 +1,37 @@
 """
-LDA Client - Helper functions for making authenticated requests to LDA.
+LDA Client - Pooled, authenticated HTTP client for the LDA.
+
+One client per process keeps a keep-alive connection pool per LDA node.
+Idempotent calls are retried with jittered exponential backoff, and a
+per-node circuit breaker fails fast while a node is down. Every call is
+recorded in lda_metrics.
 """
 import hashlib
 import hmac
 import json
+import logging
+import os
+import random
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from django.conf import settings
 import httpx
+from .lda_metrics import lda_metrics
+
+logger = logging.getLogger(__name__)
+
+# POST endpoints that only read state and are safe to retry
+IDEMPOTENT_ENDPOINTS = {
+    '/api/v1/agent/jobs/status',
+    '/api/v1/git/status',
+    '/api/v1/git/diff',
+    '/api/v1/files/read',
+    '/api/v1/files/list',
+}
+
+# Responses worth retrying an idempotent call on
+RETRYABLE_STATUSES = {502, 503, 504}
 
 
 def generate_lda_signature(timestamp: str, body: str, secret_key: str) -> str:
@@ -31,11 +55,293 @@ def generate_lda_signature(timestamp: str, body: str, secret_key: str) -> str:
     return signature
 
 
+def verify_lda_signature(timestamp: str, body: bytes, signature: str, max_age: int = 300) -> bool:
+    """
+    Verify a signed request coming from LDA (e.g. a job callback).
+    
+    Args:
+        timestamp: X-Timestamp header value
+        body: Raw request body
+        signature: X-Signature header value
+        max_age: Maximum accepted age of the timestamp in seconds
+    
+    Returns:
+        True if the signature is valid and fresh
+    """
+    if not timestamp or not signature:
+        return False
+    try:
+        if abs(time.time() - int(timestamp)) > max_age:
+            return False
+    except ValueError:
+        return False
+    
+    lda_secret = getattr(settings, 'LDA_SECRET_KEY', '')
+    expected = hmac.new(
+        lda_secret.encode(),
+        timestamp.encode() + body,
+        hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class CircuitOpenError(httpx.RequestError):
+    """
+    Raised without contacting the LDA while its circuit is open.
+
+    A RequestError, so callers handle it like an unreachable LDA.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one LDA node.
+
+    CLOSED: calls pass. After `threshold` consecutive failures it OPENs and
+    calls fail fast for `reset_timeout` seconds; then one trial call is let
+    through (HALF_OPEN) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'CLOSED'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'HALF_OPEN'
+        return 'OPEN'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'CLOSED':
+                return True
+            if state == 'HALF_OPEN' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                # Open, or re-open after a failed trial
+                self.opened_at = time.monotonic()
+
+
+class LDAHttpClient:
+    """
+    Pooled LDA client with sync and async variants.
+
+    Configured via settings:
+    - LDA_URL / LDA_SECRET_KEY: default node and signing key
+    - LDA_MAX_CONNECTIONS / LDA_MAX_KEEPALIVE: connection pool limits per node
+    - LDA_HTTP2: negotiate HTTP/2 where the node supports it (needs h2)
+    - LDA_RETRIES / LDA_RETRY_BACKOFF: retries of idempotent calls
+    - LDA_BREAKER_THRESHOLD / LDA_BREAKER_RESET: circuit breaker tuning
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    # ----- configuration -----
+
+    @staticmethod
+    def _default_url() -> str:
+        return getattr(settings, 'LDA_URL', 'http://localhost:8001')
+
+    @staticmethod
+    def _client_options() -> Dict[str, Any]:
+        http2 = getattr(settings, 'LDA_HTTP2', True)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        return {
+            'http2': http2,
+            'limits': httpx.Limits(
+                max_connections=getattr(settings, 'LDA_MAX_CONNECTIONS', 20),
+                max_keepalive_connections=getattr(settings, 'LDA_MAX_KEEPALIVE', 10),
+                keepalive_expiry=30.0,
+            ),
+        }
+
+    def _check_fork(self) -> None:
+        # Connection pools must not be shared across forked (e.g. Celery) workers
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._clients = {}
+            self._breakers = {}
+
+    def _client(self, base_url: str) -> httpx.Client:
+        with self._lock:
+            self._check_fork()
+            client = self._clients.get(base_url)
+            if client is None:
+                client = httpx.Client(base_url=base_url, **self._client_options())
+                self._clients[base_url] = client
+            return client
+
+    def breaker(self, base_url: Optional[str] = None) -> CircuitBreaker:
+        base_url = base_url or self._default_url()
+        with self._lock:
+            self._check_fork()
+            breaker = self._breakers.get(base_url)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    threshold=getattr(settings, 'LDA_BREAKER_THRESHOLD', 5),
+                    reset_timeout=getattr(settings, 'LDA_BREAKER_RESET', 30.0),
+                )
+                self._breakers[base_url] = breaker
+            return breaker
+
+    # ----- request building -----
+
+    @staticmethod
+    def _signed(method: str, data: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, str]]:
+        timestamp = str(int(time.time()))
+        # GET requests carry no body, so they are signed over an empty one
+        body = json.dumps(data or {}) if method != "GET" else ""
+        headers = {
+            "Content-Type": "application/json",
+            "X-Timestamp": timestamp,
+            "X-Signature": generate_lda_signature(
+                timestamp, body, getattr(settings, 'LDA_SECRET_KEY', '')
+            ),
+        }
+        return body, headers
+
+    @staticmethod
+    def is_idempotent(method: str, endpoint: str) -> bool:
+        return method == "GET" or endpoint in IDEMPOTENT_ENDPOINTS
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Full jitter: uniform in [0, base * 2^attempt]
+        base = getattr(settings, 'LDA_RETRY_BACKOFF', 0.5)
+        return random.uniform(0, base * (2 ** attempt))
+
+    def _plan(self, method: str, endpoint: str, base_url: Optional[str], retries: Optional[int]):
+        method = method.upper()
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        base_url = base_url or self._default_url()
+        if retries is None:
+            retries = getattr(settings, 'LDA_RETRIES', 2) if self.is_idempotent(method, endpoint) else 0
+        return method, base_url, retries
+
+    def _after(
+        self,
+        breaker: CircuitBreaker,
+        method: str,
+        endpoint: str,
+        started: float,
+        response: Optional[httpx.Response]
+    ) -> None:
+        lda_metrics.record(
+            method, endpoint, response.status_code if response is not None else None,
+            time.monotonic() - started
+        )
+        # Only an unreachable or unavailable node counts against the circuit,
+        # not application errors it reports
+        if response is None or response.status_code in RETRYABLE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    # ----- public API -----
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: float = 30.0,
+        base_url: Optional[str] = None,
+        retries: Optional[int] = None
+    ) -> httpx.Response:
+        """
+        Make an authenticated request to an LDA node.
+
+        Args:
+            method: "GET" or "POST"
+            endpoint: LDA endpoint path (e.g., "/api/v1/pm/decompose")
+            data: Request data dictionary (ignored for GET)
+            timeout: Request timeout in seconds
+            base_url: LDA node URL (default: settings.LDA_URL)
+            retries: Retries on transport errors and 502/503/504
+                (default: LDA_RETRIES for idempotent calls, 0 otherwise)
+
+        Returns:
+            httpx.Response object
+
+        Raises:
+            CircuitOpenError: If the node's circuit is open
+            httpx.RequestError: If the request fails
+        """
+        method, base_url, retries = self._plan(method, endpoint, base_url, retries)
+        breaker = self.breaker(base_url)
+        client = self._client(base_url)
+
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"LDA at {base_url} is unavailable (circuit open)")
+
+            body, headers = self._signed(method, data)
+            started = time.monotonic()
+            try:
+                response = client.request(
+                    method, endpoint, content=body or None, headers=headers, timeout=timeout
+                )
+            except httpx.RequestError:
+                self._after(breaker, method, endpoint, started, None)
+                if attempt == retries:
+                    raise
+            else:
+                self._after(breaker, method, endpoint, started, response)
+                if response.status_code not in RETRYABLE_STATUSES or attempt == retries:
+                    return response
+
+            delay = self._backoff(attempt)
+            logger.info(f"Retrying LDA {method} {endpoint} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Get circuit breaker state per LDA node URL (this process)."""
+        with self._lock:
+            return {
+                url: {'state': breaker.state, 'consecutive_failures': breaker.failures}
+                for url, breaker in self._breakers.items()
+            }
+
+
+lda_http = LDAHttpClient()
+
+
 def call_lda(
     endpoint: str,
     data: Dict[str, Any],
     method: str = "POST",
-    timeout: float = 30.0
+    timeout: float = 30.0,
+    base_url: Optional[str] = None
 ) -> httpx.Response:
     """
     Make an authenticated request to LDA.
@@ -45,6 +351,7 @@ def call_lda(
         data: Request data dictionary
         method: HTTP method (default: POST)
         timeout: Request timeout in seconds
+        base_url: LDA node URL (default: settings.LDA_URL)
     
     Returns:
         httpx.Response object
@@ -53,29 +360,7 @@ def call_lda(
         httpx.RequestError: If request fails
         httpx.HTTPStatusError: If response status is error
     """
-    lda_url = getattr(settings, 'LDA_URL', 'http://localhost:8001')
-    lda_secret = getattr(settings, 'LDA_SECRET_KEY', '')
-    
-    timestamp = str(int(time.time()))
-    request_body = json.dumps(data)
-    signature = generate_lda_signature(timestamp, request_body, lda_secret)
-    
-    headers = {
-        "Content-Type": "application/json",
-        "X-Timestamp": timestamp,
-        "X-Signature": signature
-    }
-    
-    url = f"{lda_url}{endpoint}"
-    
-    if method.upper() == "POST":
-        response = httpx.post(url, content=request_body, headers=headers, timeout=timeout)
-    elif method.upper() == "GET":
-        response = httpx.get(url, headers=headers, timeout=timeout)
-    else:
-        raise ValueError(f"Unsupported HTTP method: {method}")
-    
-    return response
+    return lda_http.request(method, endpoint, data, timeout=timeout, base_url=base_url)
 
 
 def call_lda_safe(
@@ -0,0 +1,161 @@
+"""
+LDA Metrics - Per-endpoint latency and error counters for LDA calls.
+
+Counters are kept in process and flushed in batches to Redis hashes, so
+metrics from web and Celery processes add up to one view. Without Redis
+(or if it is unreachable) each process only reports its own calls.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds (milliseconds)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Path segments that are ids (uuid or hex job id) are collapsed into one series
+ID_SEGMENT = re.compile(r'/(?:[0-9a-fA-F]{32}|[0-9a-fA-F-]{36})(?=/|$)')
+
+REDIS_PREFIX = 'lda:metrics:'
+
+
+def endpoint_label(method: str, endpoint: str) -> str:
+    """Get the metrics series name for a request, e.g. 'GET /api/v1/agent/jobs/{id}'."""
+    return f"{method.upper()} {ID_SEGMENT.sub('/{id}', endpoint)}"
+
+
+class LDAMetrics:
+    """
+    Request count, error count and latency histogram per LDA endpoint.
+
+    Configured via settings:
+    - LDA_METRICS_REDIS_URL: Redis for cross-process aggregation (optional)
+    - LDA_METRICS_FLUSH_INTERVAL: seconds between flushes to Redis
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._local: Dict[str, Dict[str, float]] = {}
+        self._last_flush = time.monotonic()
+        self._redis = None
+        self._redis_url: Optional[str] = getattr(settings, 'LDA_METRICS_REDIS_URL', None)
+        self.flush_interval = getattr(settings, 'LDA_METRICS_FLUSH_INTERVAL', 10)
+
+    def _get_redis(self):
+        if self._redis is None and self._redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=1)
+        return self._redis
+
+    @staticmethod
+    def _bump(store: Dict[str, Dict[str, float]], label: str, fields: Dict[str, float]) -> None:
+        series = store.setdefault(label, {})
+        for field, value in fields.items():
+            series[field] = series.get(field, 0) + value
+
+    def record(self, method: str, endpoint: str, status: Optional[int], duration: float) -> None:
+        """
+        Record one LDA call.
+
+        Args:
+            method: HTTP method
+            endpoint: Request path
+            status: Response status code, or None if no response was received
+            duration: Seconds the call took
+        """
+        latency_ms = duration * 1000
+        fields = {
+            'count': 1,
+            'latency_ms_sum': round(latency_ms, 3),
+            'errors': 1 if status is None or status >= 500 else 0,
+            'transport_errors': 1 if status is None else 0,
+        }
+        for bound in LATENCY_BUCKETS_MS:
+            if latency_ms <= bound:
+                fields[f'le_{bound}'] = 1
+                break
+        else:
+            fields['le_inf'] = 1
+
+        label = endpoint_label(method, endpoint)
+        with self._lock:
+            self._bump(self._local, label, fields)
+            self._bump(self._pending, label, fields)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Push pending counters to Redis."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return
+        try:
+            client = self._get_redis()
+            if client is None:
+                return
+            pipe = client.pipeline(transaction=False)
+            for label, fields in pending.items():
+                for field, value in fields.items():
+                    if field == 'latency_ms_sum':
+                        pipe.hincrbyfloat(REDIS_PREFIX + label, field, value)
+                    elif value:
+                        pipe.hincrby(REDIS_PREFIX + label, field, int(value))
+            pipe.execute()
+        except Exception as e:
+            # Metrics must never break LDA calls; the local view stays accurate
+            logger.debug(f"Could not flush LDA metrics: {e}")
+
+    @staticmethod
+    def _summarize(series: Dict[str, float]) -> Dict[str, Any]:
+        count = int(series.get('count', 0))
+        histogram = {
+            f'le_{bound}': int(series.get(f'le_{bound}', 0)) for bound in LATENCY_BUCKETS_MS
+        }
+        histogram['le_inf'] = int(series.get('le_inf', 0))
+        return {
+            'count': count,
+            'errors': int(series.get('errors', 0)),
+            'transport_errors': int(series.get('transport_errors', 0)),
+            'error_rate': round(series.get('errors', 0) / count, 4) if count else 0.0,
+            'avg_latency_ms': round(series.get('latency_ms_sum', 0) / count, 1) if count else 0.0,
+            'latency_ms_buckets': histogram,
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metrics per endpoint.
+
+        Aggregated across processes when Redis is available, otherwise
+        for this process only.
+        """
+        self.flush()
+        try:
+            client = self._get_redis()
+            if client is not None:
+                result = {}
+                for key in client.scan_iter(match=REDIS_PREFIX + '*'):
+                    key = key.decode() if isinstance(key, bytes) else key
+                    series = {
+                        (k.decode() if isinstance(k, bytes) else k): float(v)
+                        for k, v in client.hgetall(key).items()
+                    }
+                    result[key[len(REDIS_PREFIX):]] = self._summarize(series)
+                return result
+        except Exception as e:
+            logger.debug(f"Could not read LDA metrics from Redis: {e}")
+
+        with self._lock:
+            return {label: self._summarize(series) for label, series in self._local.items()}
+
+
+lda_metrics = LDAMetrics()
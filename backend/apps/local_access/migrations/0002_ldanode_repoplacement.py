@@ -0,0 +1,115 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("local_access", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LDANode",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "url",
+                    models.CharField(
+                        help_text="Base URL, e.g. http://10.0.0.5:8001",
+                        max_length=512,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True, help_text="Inactive nodes receive no new work"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("HEALTHY", "Healthy"),
+                            ("DEGRADED", "Degraded"),
+                            ("DOWN", "Down"),
+                        ],
+                        default="HEALTHY",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "roots",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Paths the node can reach (from /health); repos under them have affinity to it",
+                    ),
+                ),
+                (
+                    "capacity",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Per-resource limits reported by /health",
+                    ),
+                ),
+                (
+                    "load",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Per-resource load reported by /health",
+                    ),
+                ),
+                ("consecutive_failures", models.IntegerField(default=0)),
+                ("last_seen_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lda_nodes",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RepoPlacement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("repo_path", models.CharField(max_length=1024, unique=True)),
+                ("assigned_at", models.DateTimeField(auto_now=True)),
+                (
+                    "node",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="placements",
+                        to="local_access.ldanode",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "lda_repo_placements",
+            },
+        ),
+    ]
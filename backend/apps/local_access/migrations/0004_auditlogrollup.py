@@ -0,0 +1,113 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    """Roll up the existing audit log, one bulk insert per chunk of hours."""
+    from datetime import timezone as dt_timezone
+    from django.db.models import Count
+    from django.db.models.functions import TruncHour
+
+    AuditLog = apps.get_model("local_access", "AuditLog")
+    AuditLogRollup = apps.get_model("local_access", "AuditLogRollup")
+
+    rows = (
+        AuditLog.objects.annotate(hour=TruncHour("created_at", tzinfo=dt_timezone.utc))
+        .values("hour", "user_id", "action", "result")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(AuditLogRollup(**row))
+        if len(batch) >= 2000:
+            AuditLogRollup.objects.bulk_create(batch)
+            batch = []
+    AuditLogRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("local_access", "0003_auditlog_created_at_default"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(help_text="Start of the hour (UTC)")),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("READ", "Read"),
+                            ("WRITE", "Write"),
+                            ("DELETE", "Delete"),
+                            ("EXECUTE", "Execute"),
+                            ("GIT_COMMIT", "Git Commit"),
+                            ("GIT_MERGE", "Git Merge"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "result",
+                    models.CharField(
+                        choices=[("ALLOWED", "Allowed"), ("DENIED", "Denied")],
+                        max_length=50,
+                    ),
+                ),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "audit_log_rollups",
+                "ordering": ["-hour"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "hour"], name="audit_log_r_user_id_335eff_idx"
+                    ),
+                    models.Index(fields=["hour"], name="audit_log_r_hour_f3426d_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="auditlogrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("user__isnull", False)),
+                fields=("hour", "user", "action", "result"),
+                name="audit_rollup_unique_user",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="auditlogrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("user__isnull", True)),
+                fields=("hour", "action", "result"),
+                name="audit_rollup_unique_no_user",
+            ),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 
@@ -60,7 +61,8 @@ class AuditLog(models.Model):
     path = models.CharField(max_length=1024)
     result = models.CharField(max_length=50, choices=RESULT_CHOICES, default='ALLOWED')
     details = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # When the operation happened on the LDA, not when the record arrived
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -74,6 +76,50 @@ class AuditLog(models.Model):
         return f"[{self.result}] {self.action} on {self.path}"
 
 
+class AuditLogRollup(models.Model):
+    """
+    Hourly count of audit records per (user, action, result).
+
+    Maintained as records are ingested, so audit statistics read a few
+    rollup rows instead of counting the audit log.
+    """
+    hour = models.DateTimeField(help_text="Start of the hour (UTC)")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    action = models.CharField(max_length=50, choices=AuditLog.OPERATION_CHOICES)
+    result = models.CharField(max_length=50, choices=AuditLog.RESULT_CHOICES)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-hour']
+        db_table = 'audit_log_rollups'
+        constraints = [
+            # NULLs are distinct in unique constraints, so records without a
+            # user need their own
+            models.UniqueConstraint(
+                fields=['hour', 'user', 'action', 'result'],
+                condition=models.Q(user__isnull=False),
+                name='audit_rollup_unique_user'
+            ),
+            models.UniqueConstraint(
+                fields=['hour', 'action', 'result'],
+                condition=models.Q(user__isnull=True),
+                name='audit_rollup_unique_no_user'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'hour']),
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 {self.action}/{self.result}: {self.count}"
+
+
 class PMDecomposition(models.Model):
     """Record of PM Agent task decomposition."""
     STATUS_CHOICES = [
@@ -122,3 +168,82 @@ class PMDecomposition(models.Model):
     def task_count(self):
         return len(self.generated_tasks)
 
+
+
+class LDANode(models.Model):
+    """
+    A Local Desktop Agent the backend can route work to.
+
+    Capacity and load are refreshed from the node's /health endpoint,
+    reachable roots from its signed /api/v1/node, by the refresh_lda_nodes
+    task.
+    """
+    STATUS_CHOICES = [
+        ('HEALTHY', 'Healthy'),
+        ('DEGRADED', 'Degraded'),
+        ('DOWN', 'Down'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    url = models.CharField(max_length=512, unique=True, help_text="Base URL, e.g. http://10.0.0.5:8001")
+    is_active = models.BooleanField(default=True, help_text="Inactive nodes receive no new work")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='HEALTHY')
+    roots = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Paths the node can reach (from /health); repos under them have affinity to it"
+    )
+    capacity = models.JSONField(default=dict, blank=True, help_text="Per-resource limits reported by /health")
+    load = models.JSONField(default=dict, blank=True, help_text="Per-resource load reported by /health")
+    consecutive_failures = models.IntegerField(default=0)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        db_table = 'lda_nodes'
+
+    def __str__(self):
+        return f"{self.name} ({self.url}) [{self.status}]"
+
+    @property
+    def load_score(self) -> float:
+        """Utilization of the busiest resource class (0 = idle, 1 = at capacity)."""
+        score = 0.0
+        for resource, limits in (self.capacity or {}).items():
+            total = (limits.get('limit') or 0) + (limits.get('queue') or 0)
+            inflight = (self.load or {}).get(resource, {}).get('inflight', 0)
+            if total:
+                score = max(score, inflight / total)
+        return score
+
+    def serves_path(self, path: str) -> bool:
+        """Check whether a path lies under one of the node's roots."""
+        import os
+
+        path = os.path.normpath(path or '')
+        for root in self.roots or []:
+            root = os.path.normpath(root).rstrip('/\\')
+            if path == root or (path.startswith(root) and path[len(root)] in '/\\'):
+                return True
+        return False
+
+
+class RepoPlacement(models.Model):
+    """
+    Sticky assignment of a repository to the LDA node that owns it.
+
+    All git work on a repository goes to its owner so the owner's per-repo
+    lock serializes merges. Reassigned only when the owner is unavailable.
+    """
+    repo_path = models.CharField(max_length=1024, unique=True)
+    node = models.ForeignKey(LDANode, on_delete=models.CASCADE, related_name='placements')
+    assigned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'lda_repo_placements'
+
+    def __str__(self):
+        return f"{self.repo_path} -> {self.node.name}"
@@ -0,0 +1,222 @@
+"""
+LDA Node Pool - Routes LDA work across several Local Desktop Agents.
+
+Each repository is placed on one node (repo affinity: a node whose roots
+contain the repo, least loaded first; a sole usable node takes every
+repo) and stays there while that node is healthy, so its worktrees and
+per-repo git lock live in one place. When the owner goes down, the
+repository fails over to the next eligible node.
+Work tied to a specific node (e.g. polling a job) is pinned to it.
+
+With no nodes registered, settings.LDA_URL is registered as the single
+default node, so single-LDA setups keep working unchanged.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+import httpx
+from .lda_client import call_lda, lda_http
+from .models import LDANode, RepoPlacement
+
+logger = logging.getLogger(__name__)
+
+
+class NoLDANodeAvailable(httpx.RequestError):
+    """
+    Raised when no healthy LDA node can take the work.
+
+    A RequestError, so callers handle it like an unreachable LDA.
+    """
+
+
+class LDANodePool:
+    """
+    Registry and router for LDA nodes.
+
+    Configured via settings:
+    - LDA_URL: default node registered when the pool is empty
+    - LDA_NODE_MAX_FAILURES: consecutive failures before a node is DOWN
+    - LDA_NODE_DEGRADED_LOAD: load score above which a node is DEGRADED
+    """
+
+    def __init__(self):
+        self.max_failures = getattr(settings, 'LDA_NODE_MAX_FAILURES', 3)
+        self.degraded_load = getattr(settings, 'LDA_NODE_DEGRADED_LOAD', 0.9)
+
+    @staticmethod
+    def ensure_default_node() -> None:
+        """Register settings.LDA_URL as a node if none are registered."""
+        if not LDANode.objects.exists():
+            LDANode.objects.get_or_create(
+                url=getattr(settings, 'LDA_URL', 'http://localhost:8001'),
+                defaults={'name': 'default'}
+            )
+
+    def usable_nodes(self, exclude: Iterable = ()) -> List[LDANode]:
+        """Get active, non-DOWN nodes, least loaded first."""
+        self.ensure_default_node()
+        nodes = LDANode.objects.filter(is_active=True).exclude(
+            status='DOWN'
+        ).exclude(
+            id__in=list(exclude)
+        ).annotate(
+            running_attempts=Count('attempts', filter=Q(attempts__status='RUNNING'))
+        )
+        return sorted(nodes, key=lambda n: (n.status != 'HEALTHY', n.load_score, n.running_attempts))
+
+    def route(self, repo_path: str, exclude: Iterable = (), _refreshed: bool = False) -> LDANode:
+        """
+        Get the node that owns a repository, placing it if needed.
+
+        Args:
+            repo_path: Repository path
+            exclude: IDs of nodes to skip (e.g. one that just failed)
+
+        With several usable nodes, only one whose roots contain the
+        repository is chosen. A sole usable node takes every repository.
+
+        Raises:
+            NoLDANodeAvailable: If no node is usable, or several are and
+                none serves the repository
+        """
+        exclude = set(exclude)
+        with transaction.atomic():
+            placement = RepoPlacement.objects.select_for_update().select_related(
+                'node'
+            ).filter(repo_path=repo_path).first()
+
+            if placement:
+                node = placement.node
+                if node.is_active and node.status != 'DOWN' and node.id not in exclude:
+                    return node
+
+            candidates = self.usable_nodes(exclude)
+            if not candidates:
+                raise NoLDANodeAvailable(f"No LDA node available for {repo_path}")
+
+            if len(candidates) == 1:
+                # Nothing to choose from: git and agent calls were never limited
+                # to a node's writable roots (only file writes are)
+                node = candidates[0]
+                if not node.serves_path(repo_path):
+                    logger.warning(f"{repo_path} is outside the roots of {node.name}, the only usable LDA node")
+            else:
+                # Only nodes that can reach the repo; another node's worktrees
+                # and git lock would be for a checkout that isn't there
+                affine = [n for n in candidates if n.serves_path(repo_path)]
+                unseen = [n for n in candidates if n.last_seen_at is None]
+                if not affine and (_refreshed or not unseen):
+                    raise NoLDANodeAvailable(f"No available LDA node serves {repo_path}")
+                node = affine[0] if affine else None
+
+            if node is not None:
+                if placement:
+                    logger.warning(f"Failing over {repo_path} from {placement.node.name} to {node.name}")
+                    placement.node = node
+                    placement.save()
+                else:
+                    RepoPlacement.objects.create(repo_path=repo_path, node=node)
+                return node
+
+        # Nodes not polled yet haven't reported their roots; learn them
+        # outside the placement lock, then retry
+        self.refresh(nodes=unseen)
+        return self.route(repo_path, exclude, _refreshed=True)
+
+    def call(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        repo_path: Optional[str] = None,
+        node: Optional[LDANode] = None,
+        method: str = "POST",
+        timeout: float = 30.0
+    ) -> Tuple[httpx.Response, LDANode]:
+        """
+        Make an authenticated LDA request on the right node.
+
+        With `node`, the request is pinned to that node. Otherwise it goes
+        to the repository's owner and fails over to other nodes when the
+        owner can't be reached.
+
+        Returns:
+            (response, node that served it)
+
+        Raises:
+            NoLDANodeAvailable: If no node could be reached
+            httpx.RequestError: If a pinned node can't be reached
+        """
+        if node is not None:
+            try:
+                response = call_lda(endpoint, data, method, timeout, base_url=node.url)
+            except httpx.RequestError:
+                self.report_failure(node)
+                raise
+            return response, node
+
+        tried = set()
+        while True:
+            target = self.route(repo_path or '', exclude=tried)
+            try:
+                return call_lda(endpoint, data, method, timeout, base_url=target.url), target
+            except httpx.RequestError as e:
+                logger.warning(f"LDA node {target.name} unreachable: {e}")
+                self.report_failure(target)
+                tried.add(target.id)
+
+    def report_failure(self, node: LDANode) -> None:
+        """Record a failed request; mark the node DOWN after too many."""
+        # One UPDATE, so concurrent failures all count; SET sees the old row
+        LDANode.objects.filter(id=node.id).update(
+            consecutive_failures=F('consecutive_failures') + 1,
+            status=Case(
+                When(consecutive_failures__gte=self.max_failures - 1, then=Value('DOWN')),
+                default=F('status'),
+            )
+        )
+        node.refresh_from_db(fields=['consecutive_failures', 'status'])
+
+    def refresh(self, timeout: float = 5.0, nodes: Optional[Iterable[LDANode]] = None) -> Dict[str, str]:
+        """
+        Poll every active node and record capacity and load (/health)
+        and the roots it can reach (signed /api/v1/node).
+
+        Args:
+            timeout: Request timeout per node in seconds
+            nodes: Only poll these nodes (default: all active ones)
+
+        Returns:
+            Dict mapping node name to its new status
+        """
+        self.ensure_default_node()
+        statuses = {}
+        for node in (nodes if nodes is not None else LDANode.objects.filter(is_active=True)):
+            try:
+                response = lda_http.request("GET", "/health", base_url=node.url, timeout=timeout, retries=0)
+                response.raise_for_status()
+                health = response.json()
+                # Roots are only served to signed requests
+                response = lda_http.request("GET", "/api/v1/node", base_url=node.url, timeout=timeout, retries=0)
+                response.raise_for_status()
+                info = response.json()
+            except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
+                self.report_failure(node)
+                statuses[node.name] = node.status
+                continue
+
+            node.roots = info.get('roots', node.roots)
+            node.capacity = health.get('capacity', {})
+            node.load = health.get('load', {})
+            node.consecutive_failures = 0
+            node.last_seen_at = timezone.now()
+            node.status = 'DEGRADED' if node.load_score >= self.degraded_load else 'HEALTHY'
+            node.save(update_fields=[
+                'roots', 'capacity', 'load', 'consecutive_failures',
+                'last_seen_at', 'status', 'updated_at'
+            ])
+            statuses[node.name] = node.status
+
+        return statuses
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import WritableRoot, AuditLog, PMDecomposition
+from .models import WritableRoot, AuditLog, PMDecomposition, LDANode
 import os
 
 
@@ -60,3 +60,19 @@ class PMDecompositionCreateSerializer(serializers.Serializer):
     """Serializer for creating a new PM decomposition."""
     requirements = serializers.CharField(min_length=10)
     model = serializers.CharField(default='gemini-2.5-flash')
+
+
+class LDANodeSerializer(serializers.ModelSerializer):
+    load_score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = LDANode
+        fields = [
+            'id', 'name', 'url', 'is_active', 'status', 'roots',
+            'capacity', 'load', 'load_score', 'consecutive_failures',
+            'last_seen_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'roots', 'capacity', 'load',
+            'consecutive_failures', 'last_seen_at', 'created_at', 'updated_at'
+        ]
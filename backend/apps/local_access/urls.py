@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import WritableRootViewSet, AuditLogViewSet, PMDecompositionViewSet
+from .views import WritableRootViewSet, AuditLogViewSet, PMDecompositionViewSet, LDANodeViewSet
 
 router = DefaultRouter()
 router.register(r'writable-roots', WritableRootViewSet, basename='writable-root')
 router.register(r'audit-logs', AuditLogViewSet, basename='audit-log')
 router.register(r'pm-decompositions', PMDecompositionViewSet, basename='pm-decomposition')
+router.register(r'lda-nodes', LDANodeViewSet, basename='lda-node')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -6,10 +6,10 @@ import httpx
 import hashlib
 import time
 import os
-from .models import WritableRoot, AuditLog, PMDecomposition
+from .models import WritableRoot, AuditLog, PMDecomposition, LDANode
 from .serializers import (
     WritableRootSerializer, AuditLogSerializer,
-    PMDecompositionSerializer
+    PMDecompositionSerializer, LDANodeSerializer
 )
 
 
@@ -184,28 +184,95 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
+        from django.db import transaction
+        from .audit_rollups import record_audit_rollups
+
         serializer = AuditLogSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            log = serializer.save()
+            record_audit_rollups([log])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='ingest-bulk',
+        permission_classes=[permissions.AllowAny],
+        authentication_classes=[]
+    )
+    def ingest_bulk(self, request):
+        """
+        Ingest a batch of audit records from an LDA.
+
+        The body is NDJSON (one AuditLog record per line), signed like job
+        callbacks. Valid records are stored in one transaction; malformed
+        lines are rejected individually and reported back.
+        """
+        from .audit_ingest import AuditBatchTooLarge, ingest_audit_batch
+        from .lda_client import verify_lda_signature
+
+        # Signature covers the raw body, so read it before anything parses it
+        body = request.body
+        if not verify_lda_signature(
+            request.headers.get('X-Timestamp', ''),
+            body,
+            request.headers.get('X-Signature', '')
+        ):
+            return Response({'error': 'Invalid signature'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            result = ingest_audit_batch(body)
+        except AuditBatchTooLarge as e:
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return Response(result, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get audit log statistics."""
-        queryset = self.get_queryset()
+        """
+        Get audit log statistics.
 
-        stats = {
-            'total': queryset.count(),
-            'allowed': queryset.filter(result='ALLOWED').count(),
-            'denied': queryset.filter(result='DENIED').count(),
-            'by_action': {}
-        }
+        Read from hourly rollups. Supports ?since= and ?until= (ISO 8601;
+        whole hours) besides the list filters. Filtering by task isn't
+        covered by the rollups and counts the audit log instead.
+        """
+        from datetime import timedelta
+        from django.db.models import Count
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+        from .audit_rollups import audit_stats, hour_start, summarize_counts
+
+        bounds = {}
+        for param in ('since', 'until'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            bounds[param] = parse_datetime(value)
+            if bounds[param] is None:
+                return Response(
+                    {'error': f'Invalid {param}: expected an ISO 8601 datetime'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(bounds[param]):
+                bounds[param] = timezone.make_aware(bounds[param])
 
-        for action_choice in AuditLog.OPERATION_CHOICES:
-            action_code = action_choice[0]
-            stats['by_action'][action_code] = queryset.filter(action=action_code).count()
+        if not request.query_params.get('task'):
+            return Response(audit_stats(
+                user=None if request.user.is_staff else request.user,
+                action=request.query_params.get('action'),
+                result=request.query_params.get('result'),
+                **bounds
+            ))
 
-        return Response(stats)
+        queryset = self.get_queryset()
+        if 'since' in bounds:
+            queryset = queryset.filter(created_at__gte=hour_start(bounds['since']))
+        if 'until' in bounds:
+            queryset = queryset.filter(created_at__lt=hour_start(bounds['until']) + timedelta(hours=1))
+
+        return Response(summarize_counts(
+            queryset.order_by().values('action', 'result').annotate(total=Count('id'))
+        ))
 
 
 class PMDecompositionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -220,3 +287,36 @@ class PMDecompositionViewSet(viewsets.ReadOnlyModelViewSet):
         return PMDecomposition.objects.filter(
             project__owner=self.request.user
         ).select_related('project')
+
+
+class LDANodeViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for the LDA node pool.
+    Any user can see the nodes; only staff can register or change them.
+    """
+    serializer_class = LDANodeSerializer
+    queryset = LDANode.objects.all()
+
+    def get_permissions(self):
+        if self.action in ['list', 'retrieve']:
+            return [permissions.IsAuthenticated()]
+        return [permissions.IsAdminUser()]
+
+    @action(detail=False, methods=['post'])
+    def refresh(self, request):
+        """Poll every node's /health now instead of waiting for the beat task."""
+        from .node_pool import LDANodePool
+
+        statuses = LDANodePool().refresh()
+        return Response({'nodes': statuses})
+
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        """Get per-endpoint LDA call metrics and circuit breaker states."""
+        from .lda_client import lda_http
+        from .lda_metrics import lda_metrics
+
+        return Response({
+            'endpoints': lda_metrics.snapshot(),
+            'breakers': lda_http.breaker_states(),
+        })
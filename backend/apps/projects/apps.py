@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.projects"
+
+    def ready(self):
+        from .versioning import connect_signals
+
+        connect_signals()
@@ -0,0 +1,104 @@
+"""
+Board - A whole project board in one response.
+
+build_board() returns what the first paint of a board needs: a column
+per status with its task count and first page of tasks, blocked flags,
+the ready set in scheduling order and progress. Columns are ordered like
+/api/tasks/ (role, priority, newest first) with the same page size, so
+a column's later pages are /api/tasks/?project=<id>&status=<status>&page=2
+onwards.
+
+The number of queries doesn't depend on the board's size:
+
+1. status, role, priority and dependencies of every task
+2. full rows of the tasks on the first pages
+3. attempt counts of those tasks
+
+plus the duration estimates when the project schedules by critical path.
+The response carries the project's version and is served with the
+version ETag, so an unchanged board revalidates with one query.
+"""
+from typing import Any, Dict, List
+from apps.tasks.board_sync import (
+    DERIVED_FIELDS, TASK_FIELDS, count_attempts, dependencies_blocked, serialize_board_task
+)
+from apps.tasks.models import Task
+
+# FAILED is set by the execution coordinator but is not a board column
+BOARD_STATUSES = [code for code, _ in Task.STATUS_CHOICES] + ['FAILED']
+
+
+def _list_order(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort task values like TaskViewSet: role, priority, newest first."""
+    role_rank = {role: index for index, role in enumerate(Task.ROLE_ORDER)}
+    rows = sorted(rows, key=lambda row: row['created_at'], reverse=True)
+    # Stable, so created_at stays the last key
+    rows.sort(key=lambda row: (role_rank.get(row['agent_role'], len(role_rank)), row['priority']))
+    return rows
+
+
+def build_board(project, user, page_size: int) -> Dict[str, Any]:
+    """
+    Build the board of a project.
+
+    Args:
+        project: Project instance
+        user: User viewing the board (for the execution coordinator)
+        page_size: Tasks per column
+
+    Returns:
+        dict with 'version', 'revision', 'columns', 'blocked', 'ready'
+        and 'progress'
+    """
+    from apps.attempts.services import ExecutionCoordinator
+
+    coordinator = ExecutionCoordinator(str(project.id), user, project=project)
+    values = list(coordinator.graph_values('created_at'))
+    # Built from the rows in query order, so ready ties break as in execution-status
+    graph = coordinator._build_graph(values)
+    rows = _list_order(values)
+    statuses = {str(row['id']): row['status'] for row in rows}
+
+    columns: Dict[str, List[Dict[str, Any]]] = {status: [] for status in BOARD_STATUSES}
+    for row in rows:
+        columns.setdefault(row['status'], []).append(row)
+
+    page_ids = [row['id'] for column in columns.values() for row in column[:page_size]]
+    stored = [field for field in TASK_FIELDS if field not in DERIVED_FIELDS and field != 'project']
+    page_rows = {
+        row['id']: row
+        for row in Task.objects.filter(id__in=page_ids).values(*stored, 'project_id')
+    } if page_ids else {}
+    attempt_counts = count_attempts(page_ids) if page_ids else {}
+
+    counts = {status: len(column) for status, column in columns.items()}
+    total = len(rows)
+
+    return {
+        'project_id': str(project.id),
+        'version': project.version,
+        'revision': project.revision,
+        'page_size': page_size,
+        'columns': {
+            status: {
+                'count': len(column),
+                'tasks': [
+                    serialize_board_task(page_rows[row['id']], statuses, attempt_counts)
+                    for row in column[:page_size] if row['id'] in page_rows
+                ],
+                'has_more': len(column) > page_size,
+            }
+            for status, column in columns.items()
+        },
+        'blocked': [
+            str(row['id']) for row in rows
+            if row['status'] != 'DONE' and dependencies_blocked(row['dependencies'], statuses)
+        ],
+        'ready': coordinator.get_ready_order(graph),
+        'scheduling_policy': coordinator.scheduling_policy,
+        'progress': {
+            'total': total,
+            'by_status': counts,
+            'percent': int(counts.get('DONE', 0) / total * 100) if total else 0,
+        },
+    }
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_project_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="version",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.db.models import Avg, Count, Q
 from django.conf import settings
 
 class Project(models.Model):
@@ -18,6 +19,11 @@ class Project(models.Model):
     
     # Project configuration
     config = models.JSONField(default=dict, blank=True)  # {install_cmd, test_cmd, lint_cmd, build_cmd}
+
+    # Bumped for every board patch published to clients (see apps.tasks.board_sync)
+    revision = models.BigIntegerField(default=0)
+    # Bumped on every write to the project's data; keys ETags (see apps.projects.versioning)
+    version = models.BigIntegerField(default=0)
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,15 +38,123 @@ class Project(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.owner.username})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Counters only change through F() updates; don't write back stale values
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('revision', 'version')
+            ]
+        super().save(*args, **kwargs)
     
     @property
     def task_count(self):
+        # Use the value annotated by ProjectViewSet when available
+        annotated = getattr(self, 'annotated_task_count', None)
+        if annotated is not None:
+            return annotated
         return self.tasks.count()
     
     @property
     def completion_percentage(self):
-        total = self.tasks.count()
+        total = getattr(self, 'annotated_task_count', None)
+        done = getattr(self, 'annotated_done_count', None)
+        if total is None or done is None:
+            counts = self.tasks.aggregate(
+                total=Count('id'),
+                done=Count('id', filter=Q(status='DONE'))
+            )
+            total, done = counts['total'], counts['done']
         if total == 0:
             return 0
-        done = self.tasks.filter(status='DONE').count()
         return int((done / total) * 100)
+    
+    def get_task_summary(self):
+        """
+        Aggregate task counts by status and role in a single query.
+        
+        Returns:
+            Dict with total, by_status, by_role and avg_priority.
+        """
+        from apps.tasks.models import Task
+        
+        # FAILED is set by the execution coordinator but is not a board column
+        statuses = [code for code, _ in Task.STATUS_CHOICES] + ['FAILED']
+        roles = [code for code, _ in Task.ROLE_CHOICES]
+        
+        aggregates = {
+            'total': Count('id'),
+            'avg_priority': Avg('priority'),
+        }
+        for code in statuses:
+            aggregates[f'status_{code}'] = Count('id', filter=Q(status=code))
+        for code in roles:
+            aggregates[f'role_{code}'] = Count('id', filter=Q(agent_role=code))
+        
+        counts = self.tasks.aggregate(**aggregates)
+        
+        return {
+            'total': counts['total'],
+            'by_status': {code: counts[f'status_{code}'] for code in statuses},
+            'by_role': {code: counts[f'role_{code}'] for code in roles},
+            'avg_priority': counts['avg_priority'],
+        }
+
+
+class Operation(models.Model):
+    """
+    A long-running, LDA-backed action executed in the background.
+
+    Endpoints that would otherwise block a web worker on the LDA create an
+    Operation, return 202 with its id and hand the work to Celery. Progress
+    is pushed to the project WebSocket group and can also be polled.
+    """
+    KIND_CHOICES = [
+        ('PM_DECOMPOSE', 'PM Decomposition'),
+        ('APPROVE_ATTEMPT', 'Approve Attempt'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='operations'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='operations'
+    )
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    params = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # HTTP status the synchronous endpoint would have answered with
+    http_status = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'operations'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} [{self.status}]"
+
+    @property
+    def is_finished(self):
+        return self.status in ('SUCCEEDED', 'FAILED')
@@ -0,0 +1,92 @@
+"""
+Operations - Background execution of long-running, LDA-backed actions.
+
+The view creates an Operation and returns 202 with its id; a Celery task
+runs the work and reports progress through update_operation, which saves
+the operation and pushes it to the project's WebSocket group. Clients
+either listen for 'operation_update' messages or poll /api/operations/<id>/.
+"""
+import json
+from typing import Any, Callable, Dict, Optional
+from django.db import transaction
+from django.utils import timezone
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+from .models import Operation
+
+
+def jsonable(data: Any) -> Any:
+    """Round-trip data through JSON so UUIDs and datetimes become strings."""
+    return json.loads(json.dumps(data, default=str))
+
+
+def serialize_operation(operation: Operation) -> Dict[str, Any]:
+    from .serializers import OperationSerializer
+
+    return jsonable(OperationSerializer(operation).data)
+
+
+def broadcast_operation(operation: Operation) -> None:
+    """Push an operation's current state to its project group."""
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        async_to_sync(channel_layer.group_send)(
+            f'project_{operation.project_id}',
+            {
+                'type': 'operation_update',
+                'project_id': str(operation.project_id),
+                'operation': serialize_operation(operation),
+            }
+        )
+
+
+def start_operation(
+    project,
+    user,
+    kind: str,
+    params: Dict[str, Any],
+    task: Callable
+) -> Operation:
+    """
+    Create an operation and run `task` (a Celery task taking the
+    operation id) once the surrounding transaction commits.
+    """
+    operation = Operation.objects.create(
+        project=project,
+        user=user,
+        kind=kind,
+        params=params
+    )
+    transaction.on_commit(lambda: task.delay(str(operation.id)))
+    return operation
+
+
+def update_operation(
+    operation: Operation,
+    status: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: str = '',
+    http_status: Optional[int] = None
+) -> Operation:
+    """Record an operation's progress or outcome and broadcast it."""
+    operation.status = status
+    if result is not None:
+        operation.result = result
+    operation.error = error
+    if http_status is not None:
+        operation.http_status = http_status
+    if operation.is_finished:
+        operation.completed_at = timezone.now()
+    operation.save()
+    broadcast_operation(operation)
+    return operation
+
+
+def accepted_response_data(operation: Operation) -> Dict[str, Any]:
+    """Body of the 202 response returned when an operation is started."""
+    return {
+        'operation_id': str(operation.id),
+        'kind': operation.kind,
+        'status': operation.status,
+        'status_url': f'/api/operations/{operation.id}/',
+    }
@@ -0,0 +1,215 @@
+"""
+Read Cache - Cached read models of hot project endpoints.
+
+Project stats, the task list, execution status, the dependency graph
+and the board are polled by every open tab and only change when the
+project's data does. Their payloads are kept in Django's cache (Redis,
+locmem when no Redis is configured) under keys that include
+Project.version. The post_save/post_delete receivers in versioning.py
+bump that version for every Task, Attempt and PMDecomposition write, so
+a write makes the old entries unreachable; they expire with their TTL.
+
+Callers read the version before building, so an entry never holds data
+older than its key. When an entry is missing, one caller builds it
+while concurrent callers wait for its result instead of all hitting the
+database at once. The cache is an optimization only: if it is
+unreachable, payloads are built directly.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'read:'
+METRICS_PREFIX = 'read-metrics:'
+# Read models served through the cache, reported even before their first use
+READ_MODELS = (
+    'project_list', 'project', 'project_stats', 'board',
+    'execution_status', 'dependency_graph', 'task_list', 'duration_model',
+)
+COUNTERS = ('hits', 'misses', 'builds', 'waits', 'wait_timeouts', 'errors')
+
+# Seconds between checks while another caller builds an entry
+WAIT_INTERVAL = 0.05
+
+
+class ReadModelCache:
+    """
+    Version-keyed read cache with stampede protection and hit/miss counters.
+
+    Configured via settings:
+    - READ_CACHE_TTL: seconds an entry is kept
+    - READ_CACHE_LOCK_TIMEOUT: seconds a caller waits for another's build
+    - READ_CACHE_METRICS_FLUSH_INTERVAL: seconds between counter flushes
+    """
+
+    def __init__(self):
+        self.ttl = getattr(settings, 'READ_CACHE_TTL', 300)
+        self.lock_timeout = getattr(settings, 'READ_CACHE_LOCK_TIMEOUT', 10)
+        self.flush_interval = getattr(settings, 'READ_CACHE_METRICS_FLUSH_INTERVAL', 10)
+        self._lock = threading.Lock()
+        self._local: Dict[str, Dict[str, int]] = {}
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def make_key(name: str, key_parts: Tuple) -> str:
+        """Cache key of a read, e.g. make_key('project_stats', (project.id, project.version))."""
+        digest = hashlib.sha256(repr(key_parts).encode()).hexdigest()[:32]
+        return f'{KEY_PREFIX}{name}:{digest}'
+
+    def get_or_build(
+        self,
+        name: str,
+        key_parts: Tuple,
+        build: Callable[[], Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Get a read model, building and caching it on a miss.
+
+        Args:
+            name: Read model name (also the metrics series)
+            key_parts: What the payload depends on; must include the
+                project version(s), read before any data build() uses
+            build: Computes the payload; a None result is not cached
+            timeout: Entry TTL in seconds (default READ_CACHE_TTL)
+
+        Returns:
+            The cached or freshly built payload
+        """
+        key = self.make_key(name, key_parts)
+        try:
+            value = cache.get(key)
+        except Exception as e:
+            logger.debug(f"Read cache unavailable, building {name} directly: {e}")
+            self._count(name, 'errors')
+            return build()
+
+        if value is not None:
+            self._count(name, 'hits')
+            return value
+        self._count(name, 'misses')
+
+        token = uuid.uuid4().hex
+        lock_key = key + ':lock'
+        try:
+            locked = cache.add(lock_key, token, timeout=self.lock_timeout)
+        except Exception:
+            locked = True
+
+        if not locked:
+            value = self._wait_for(key)
+            if value is not None:
+                self._count(name, 'waits')
+                return value
+            # The builder died or is slow; don't keep the caller waiting
+            self._count(name, 'wait_timeouts')
+
+        try:
+            value = build()
+            self._count(name, 'builds')
+            if value is not None:
+                try:
+                    cache.set(key, value, timeout=timeout if timeout is not None else self.ttl)
+                except Exception as e:
+                    logger.debug(f"Could not cache {name}: {e}")
+            return value
+        finally:
+            if locked:
+                self._release(lock_key, token)
+
+    def _wait_for(self, key: str) -> Any:
+        """Poll for an entry another caller is building."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            try:
+                value = cache.get(key)
+            except Exception:
+                return None
+            if value is not None:
+                return value
+        return None
+
+    @staticmethod
+    def _release(lock_key: str, token: str) -> None:
+        try:
+            # A lock that timed out may have been taken by someone else since
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception:
+            pass
+
+    # Metrics
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            for store in (self._local, self._pending):
+                series = store.setdefault(name, {})
+                series[counter] = series.get(counter, 0) + 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add pending counters to the shared totals in the cache."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        for name, series in pending.items():
+            for counter, value in series.items():
+                key = f'{METRICS_PREFIX}{name}:{counter}'
+                try:
+                    cache.add(key, 0, timeout=None)
+                    cache.incr(key, value)
+                except Exception as e:
+                    # Metrics must never break reads; the local view stays accurate
+                    logger.debug(f"Could not flush read cache metrics: {e}")
+                    return
+
+    @staticmethod
+    def _summarize(series: Dict[str, int]) -> Dict[str, Any]:
+        summary = {counter: int(series.get(counter, 0)) for counter in COUNTERS}
+        lookups = summary['hits'] + summary['misses']
+        # Waits were served by another caller's build, so they count as hits
+        served = summary['hits'] + summary['waits']
+        summary['hit_rate'] = round(served / lookups, 4) if lookups else 0.0
+        return summary
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get counters per read model.
+
+        Totals across processes when the cache is shared (Redis),
+        otherwise for this process only.
+        """
+        self.flush()
+        with self._lock:
+            local = {name: dict(series) for name, series in self._local.items()}
+
+        names = sorted(set(READ_MODELS) | set(local))
+        try:
+            keys = [f'{METRICS_PREFIX}{name}:{counter}' for name in names for counter in COUNTERS]
+            totals = cache.get_many(keys)
+            if totals:
+                shared = {}
+                for name in names:
+                    shared[name] = {
+                        counter: totals.get(f'{METRICS_PREFIX}{name}:{counter}', 0) for counter in COUNTERS
+                    }
+                return {name: self._summarize(series) for name, series in shared.items()}
+        except Exception as e:
+            logger.debug(f"Could not read read cache metrics: {e}")
+
+        return {name: self._summarize(local.get(name, {})) for name in names}
+
+read_cache = ReadModelCache()
@@ -0,0 +1,187 @@
+"""
+Search - Ranked full-text search over a user's projects.
+
+Finds tasks (title, description), attempts (changed file paths, error
+message, agent output) and attempt events (messages) with Postgres
+full-text search, so "which attempt touched auth.py" or "which run hit
+this traceback" is one indexed query per kind instead of a scan.
+
+Tasks and events are matched through GIN indexes on the same expressions
+as below (task_search_vector(), event_search_vector()); attempts keep a
+stored search_vector because their output lives in the blob store.
+Events already archived to the blob store are not searched.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, Value
+from apps.tasks.models import SEARCH_CONFIG, Task, task_search_vector
+
+SEARCH_TYPES = ('task', 'attempt', 'event')
+
+# ts_rank normalization: divide by 1 + log(document length), so long agent
+# outputs don't outrank a task title that matches as well
+RANK_NORMALIZATION = 1
+
+HEADLINE_OPTIONS = {'max_words': 35, 'min_words': 15, 'max_fragments': 2}
+
+
+def _headline(field: str, query: SearchQuery) -> SearchHeadline:
+    return SearchHeadline(field, query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS)
+
+
+def _rank(document, query: SearchQuery) -> SearchRank:
+    return SearchRank(document, query, normalization=Value(RANK_NORMALIZATION))
+
+
+def _search_tasks(query, tasks, limit: int) -> List[Dict[str, Any]]:
+    rows = tasks.annotate(
+        document=task_search_vector(),
+    ).filter(document=query).annotate(
+        rank=_rank(F('document'), query),
+        headline=_headline('description', query),
+    ).order_by('-rank', '-created_at').values(
+        'id', 'project_id', 'title', 'agent_role', 'status', 'rank', 'headline', 'created_at'
+    )[:limit]
+    return [
+        {
+            'type': 'task',
+            'id': str(row['id']),
+            'project_id': str(row['project_id']),
+            'task_id': str(row['id']),
+            'attempt_id': None,
+            'title': row['title'],
+            'agent_role': row['agent_role'],
+            'status': row['status'],
+            'rank': row['rank'],
+            'headline': row['headline'],
+            'created_at': row['created_at'],
+        }
+        for row in rows
+    ]
+
+
+def _search_attempts(query, attempts, limit: int) -> List[Dict[str, Any]]:
+    rows = attempts.filter(search_vector=query).annotate(
+        rank=_rank(F('search_vector'), query),
+        headline=_headline('error_message', query),
+    ).order_by('-rank', '-created_at').values(
+        'id', 'task_id', 'task__project_id', 'task__title', 'agent_role', 'status',
+        'files_changed', 'rank', 'headline', 'created_at'
+    )[:limit]
+    return [
+        {
+            'type': 'attempt',
+            'id': str(row['id']),
+            'project_id': str(row['task__project_id']),
+            'task_id': str(row['task_id']),
+            'attempt_id': str(row['id']),
+            'title': row['task__title'],
+            'agent_role': row['agent_role'],
+            'status': row['status'],
+            'rank': row['rank'],
+            'headline': row['headline'] or '',
+            'files_changed': (row['files_changed'] or [])[:20],
+            'created_at': row['created_at'],
+        }
+        for row in rows
+    ]
+
+
+def _search_events(query, events, limit: int) -> List[Dict[str, Any]]:
+    from apps.attempts.models import event_search_vector
+
+    rows = events.annotate(
+        document=event_search_vector(),
+    ).filter(document=query).annotate(
+        rank=_rank(F('document'), query),
+        headline=_headline('message', query),
+    ).order_by('-rank', '-timestamp').values(
+        'id', 'seq', 'event_type', 'attempt_id', 'attempt__task_id', 'attempt__task__project_id',
+        'attempt__task__title', 'attempt__agent_role', 'attempt__status',
+        'rank', 'headline', 'timestamp'
+    )[:limit]
+    return [
+        {
+            'type': 'event',
+            'id': str(row['id']),
+            'project_id': str(row['attempt__task__project_id']),
+            'task_id': str(row['attempt__task_id']),
+            'attempt_id': str(row['attempt_id']),
+            'title': row['attempt__task__title'],
+            'agent_role': row['attempt__agent_role'],
+            'status': row['attempt__status'],
+            'rank': row['rank'],
+            'headline': row['headline'],
+            'seq': row['seq'],
+            'event_type': row['event_type'],
+            'created_at': row['timestamp'],
+        }
+        for row in rows
+    ]
+
+
+def search(
+    user,
+    text: str,
+    project_id: Optional[str] = None,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    types: Iterable[str] = SEARCH_TYPES,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Search the user's projects.
+
+    Args:
+        user: Owner of the projects searched
+        text: Web search syntax: words, "quoted phrases", or, -excluded
+        project_id: Only this project
+        role: Only this agent role (the task's or the attempt's)
+        status: Only this status; tasks match on the task's status,
+            attempts and events on the attempt's (e.g. FAILED)
+        types: Kinds of results: 'task', 'attempt', 'event'
+        limit: Maximum number of results
+
+    Returns:
+        Results of all kinds, best match first. Each has 'type', 'id',
+        'project_id', 'task_id', 'attempt_id', 'title', 'agent_role',
+        'status', 'rank', 'headline' and 'created_at'.
+    """
+    from apps.attempts.models import Attempt, AttemptEvent
+
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    types = set(types)
+    results: List[Dict[str, Any]] = []
+
+    if 'task' in types:
+        tasks = Task.objects.filter(project__owner=user)
+        if project_id:
+            tasks = tasks.filter(project_id=project_id)
+        if role:
+            tasks = tasks.filter(agent_role=role)
+        if status:
+            tasks = tasks.filter(status=status)
+        results.extend(_search_tasks(query, tasks, limit))
+
+    if 'attempt' in types:
+        attempts = Attempt.objects.filter(task__project__owner=user)
+        if project_id:
+            attempts = attempts.filter(task__project_id=project_id)
+        if role:
+            attempts = attempts.filter(agent_role=role)
+        if status:
+            attempts = attempts.filter(status=status)
+        results.extend(_search_attempts(query, attempts, limit))
+
+    if 'event' in types:
+        events = AttemptEvent.objects.filter(attempt__task__project__owner=user)
+        if project_id:
+            events = events.filter(attempt__task__project_id=project_id)
+        if role:
+            events = events.filter(attempt__agent_role=role)
+        if status:
+            events = events.filter(attempt__status=status)
+        results.extend(_search_events(query, events, limit))
+
+    results.sort(key=lambda result: result['rank'], reverse=True)
+    return results[:limit]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Project
+from .models import Project, Operation
 
 class ProjectSerializer(serializers.ModelSerializer):
     task_count = serializers.IntegerField(read_only=True)
@@ -27,3 +27,13 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
             # os.path.isabs covers both.
             raise serializers.ValidationError("Repo path must be absolute")
         return value
+
+
+class OperationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Operation
+        fields = [
+            'id', 'project', 'kind', 'status', 'params', 'result',
+            'error', 'http_status', 'created_at', 'updated_at', 'completed_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,66 @@
+from celery import shared_task
+import httpx
+
+
+@shared_task
+def run_pm_decomposition(operation_id: str):
+    """
+    Ask the PM agent to decompose requirements into tasks.
+
+    Background half of ProjectViewSet.initialize_with_pm. On success the
+    operation result is the new PMDecomposition, ready for user review.
+
+    Args:
+        operation_id: UUID of the PM_DECOMPOSE operation
+    """
+    from apps.local_access.models import PMDecomposition
+    from apps.local_access.node_pool import LDANodePool
+    from apps.local_access.serializers import PMDecompositionSerializer
+    from .models import Operation
+    from .operations import update_operation, serialize_operation, jsonable
+
+    operation = Operation.objects.select_related('project').get(id=operation_id)
+    if operation.is_finished:
+        return serialize_operation(operation)
+
+    project = operation.project
+    update_operation(operation, 'RUNNING')
+
+    try:
+        response, _ = LDANodePool().call(
+            endpoint="/api/v1/pm/decompose",
+            data={
+                "project_name": project.name,
+                "project_description": project.description or "",
+                "requirements": operation.params['requirements'],
+                "repo_path": project.repo_path,
+                "model": operation.params['model']
+            },
+            repo_path=project.repo_path,
+            timeout=120.0
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        # Create PMDecomposition record
+        decomposition = PMDecomposition.objects.create(
+            project=project,
+            requirements=operation.params['requirements'],
+            generated_tasks=result.get('tasks', []),
+            model_used=operation.params['model'],
+            status='PENDING'
+        )
+        update_operation(
+            operation, 'SUCCEEDED',
+            result=jsonable(PMDecompositionSerializer(decomposition).data),
+            http_status=201
+        )
+
+    except httpx.HTTPStatusError as e:
+        update_operation(operation, 'FAILED', error=f'LDA error: {e.response.text}', http_status=502)
+    except httpx.RequestError as e:
+        update_operation(operation, 'FAILED', error=f'Cannot connect to LDA: {str(e)}', http_status=503)
+    except Exception as e:
+        update_operation(operation, 'FAILED', error=f'Unexpected error: {str(e)}', http_status=500)
+
+    return serialize_operation(operation)
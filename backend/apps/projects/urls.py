@@ -1,7 +1,9 @@
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet
+from .views import ProjectViewSet, OperationViewSet, SearchViewSet
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet, basename='project')
+router.register(r'operations', OperationViewSet, basename='operation')
+router.register(r'search', SearchViewSet, basename='search')
 
 urlpatterns = router.urls
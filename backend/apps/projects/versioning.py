@@ -0,0 +1,153 @@
+"""
+Project Versions - Per-project data versions for conditional GETs.
+
+Project.version is bumped, in the writer's transaction, whenever the
+project or one of its tasks, attempts or PM decompositions is written.
+Model signals cover save() and delete(); queryset writes (update(),
+bulk_update()) call bump_project_versions() themselves.
+
+ProjectVersionETagMixin derives an ETag for list and detail responses
+from the versions of the projects they can include. A request whose
+If-None-Match still matches gets a 304 after that one small query,
+before the endpoint's main queryset runs or anything is serialized.
+
+Attempt events are not versioned (they are written continuously while
+an attempt runs); responses that embed them are not given an ETag.
+"""
+import hashlib
+from typing import Dict, Iterable, Optional
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def bump_project_versions(project_ids: Iterable) -> None:
+    """Mark the data of these projects as changed."""
+    from .models import Project
+
+    project_ids = {project_id for project_id in project_ids if project_id}
+    if project_ids:
+        Project.objects.filter(id__in=project_ids).update(version=F('version') + 1)
+
+
+def _project_written(sender, instance, created=False, **kwargs):
+    if not created:
+        bump_project_versions([instance.pk])
+
+
+def _task_written(sender, instance, **kwargs):
+    bump_project_versions([instance.project_id])
+
+
+def _attempt_written(sender, instance, **kwargs):
+    from .models import Project
+
+    # One UPDATE through the task, without loading it
+    Project.objects.filter(tasks__id=instance.task_id).update(version=F('version') + 1)
+
+
+def _decomposition_written(sender, instance, **kwargs):
+    bump_project_versions([instance.project_id])
+
+
+def connect_signals() -> None:
+    """Bump project versions on model writes; called from ProjectsConfig.ready()."""
+    receivers = [
+        ('projects.Project', _project_written),
+        ('tasks.Task', _task_written),
+        ('attempts.Attempt', _attempt_written),
+        ('local_access.PMDecomposition', _decomposition_written),
+    ]
+    for model, receiver in receivers:
+        post_save.connect(receiver, sender=model, dispatch_uid=f'project_version_{model}_save')
+        if model != 'projects.Project':
+            # A deleted project's ETags can't match anything anymore
+            post_delete.connect(receiver, sender=model, dispatch_uid=f'project_version_{model}_delete')
+
+
+def _opaque(etag: str) -> str:
+    """An entity tag without its weakness prefix, for weak comparison."""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+class ProjectVersionETagMixin:
+    """
+    Conditional GET for list and retrieve, keyed on project versions.
+
+    Views implement get_etag_projects() returning a queryset of the
+    projects a response depends on, or None to skip ETags for the
+    request. The ETag also covers the user, path and query string, so
+    pages and filters get their own.
+
+    Actions in read_cache_actions (action -> read model name) also keep
+    their 200 payloads in the read cache under the ETag, so a client
+    without a matching ETag (another tab, a fresh page load) is served
+    without running the action either.
+    """
+    etag_actions = ('list', 'retrieve')
+    read_cache_actions: Dict[str, str] = {}
+
+    def get_etag_projects(self):
+        raise NotImplementedError
+
+    def get_etag(self, request) -> Optional[str]:
+        if self.action not in self.etag_actions:
+            return None
+        try:
+            projects = self.get_etag_projects()
+            if projects is None:
+                return None
+            versions = sorted((str(pk), version) for pk, version in projects.values_list('id', 'version'))
+        except (ValueError, ValidationError):
+            # Malformed id in the URL or a filter; the view reports it
+            return None
+        if not versions:
+            return None
+        key = repr((type(self).__name__, str(request.user.pk), request.get_full_path(), versions))
+        return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(',')}:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = self._read(request, etag, handler, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        # Responses differ per user; always revalidate before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def _read(self, request, etag: str, handler, *args, **kwargs):
+        name = self.read_cache_actions.get(self.action)
+        if name is None:
+            return handler(request, *args, **kwargs)
+        from .read_cache import read_cache
+
+        built = []
+
+        def build():
+            response = handler(request, *args, **kwargs)
+            built.append(response)
+            return response.data if response.status_code == status.HTTP_200_OK else None
+
+        # Pagination links are absolute, so the host is part of the key
+        data = read_cache.get_or_build(name, (etag, request.get_host()), build)
+        return built[0] if built else Response(data)
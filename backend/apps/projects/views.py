@@ -1,22 +1,47 @@
+import uuid
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import models
+from django.db import transaction
+from django.db.models import Count, Q
 from django.conf import settings
-import httpx
-from .models import Project
+from .models import Project, Operation
+from apps.tasks.board_sync import board_publisher
 from apps.tasks.models import Task
 from apps.local_access.models import PMDecomposition, WritableRoot
 from apps.local_access.serializers import PMDecompositionSerializer, PMDecompositionCreateSerializer
-from .serializers import ProjectSerializer, ProjectCreateSerializer
+from .serializers import ProjectSerializer, ProjectCreateSerializer, OperationSerializer
+from .versioning import ProjectVersionETagMixin
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ProjectVersionETagMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ProjectSerializer
 
+    etag_actions = ('list', 'retrieve', 'board', 'stats')
+    read_cache_actions = {
+        'list': 'project_list',
+        'retrieve': 'project',
+        'board': 'board',
+        'stats': 'project_stats',
+    }
+
+    def get_etag_projects(self):
+        projects = Project.objects.filter(owner=self.request.user)
+        if self.detail:
+            return projects.filter(id=self.kwargs['pk'])
+        return projects
+
     def get_queryset(self):
-        return Project.objects.filter(owner=self.request.user)
+        queryset = Project.objects.filter(owner=self.request.user)
+        if self.action not in ('list', 'retrieve', 'update', 'partial_update'):
+            # Only ProjectSerializer output needs the counts
+            return queryset
+        # Annotate counts so list serialization doesn't query per project
+        return queryset.annotate(
+            annotated_task_count=Count('tasks'),
+            annotated_done_count=Count('tasks', filter=Q(tasks__status='DONE'))
+        )
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -29,34 +54,53 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
         """Get detailed project statistics."""
+        return self._conditional(request, self._stats)
+
+    def _stats(self, request):
+        from apps.attempts.models import Attempt
+
         project = self.get_object()
-        tasks = Task.objects.filter(project=project)
+        summary = project.get_task_summary()
+        by_status = summary['by_status']
+        total = summary['total']
         
         stats = {
-            'total_tasks': tasks.count(),
-            'todo': tasks.filter(status='TODO').count(),
-            'in_progress': tasks.filter(status='IN_PROGRESS').count(),
-            'in_review': tasks.filter(status='IN_REVIEW').count(),
-            'done': tasks.filter(status='DONE').count(),
-            'by_role': {
-                'PM': tasks.filter(agent_role='PM').count(),
-                'FRONTEND': tasks.filter(agent_role='FRONTEND').count(),
-                'BACKEND': tasks.filter(agent_role='BACKEND').count(),
-                'QA': tasks.filter(agent_role='QA').count(),
-                'DEVOPS': tasks.filter(agent_role='DEVOPS').count(),
-            },
-            'avg_priority': tasks.aggregate(avg=models.Avg('priority'))['avg'] or 0,
-            'total_attempts': sum(task.attempt_count for task in tasks),
-            'completion_percentage': project.completion_percentage,
+            'total_tasks': total,
+            'todo': by_status['TODO'],
+            'in_progress': by_status['IN_PROGRESS'],
+            'in_review': by_status['IN_REVIEW'],
+            'done': by_status['DONE'],
+            'by_role': summary['by_role'],
+            'avg_priority': summary['avg_priority'] or 0,
+            'total_attempts': Attempt.objects.filter(task__project=project).count(),
+            'completion_percentage': int((by_status['DONE'] / total) * 100) if total else 0,
         }
         
         return Response(stats)
 
+    @action(detail=True, methods=['get'])
+    def board(self, request, pk=None):
+        """
+        Get the whole board in one response: per-status columns (first
+        page and count each), blocked tasks, the ready set and progress.
+
+        Served with the project's version ETag, like list and retrieve.
+        """
+        return self._conditional(request, self._board)
+
+    def _board(self, request):
+        from .board import build_board
+
+        project = self.get_object()
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+        return Response(build_board(project, request.user, page_size))
+
     @action(detail=True, methods=['post'], url_path='initialize-with-pm')
     def initialize_with_pm(self, request, pk=None):
         """
         Trigger PM agent to decompose requirements into tasks.
-        Creates a PMDecomposition record for user review.
+        Returns 202 with an operation id; the operation's result is the
+        PMDecomposition record created for user review.
         """
         project = self.get_object()
         serializer = PMDecompositionCreateSerializer(data=request.data)
@@ -65,48 +109,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
         requirements = serializer.validated_data['requirements']
         model = serializer.validated_data.get('model', 'gemini-2.5-flash')
 
-        # Call LDA PM decompose endpoint
-        try:
-            from apps.local_access.lda_client import call_lda
-            
-            response = call_lda(
-                endpoint="/api/v1/pm/decompose",
-                data={
-                    "project_name": project.name,
-                    "project_description": project.description or "",
-                    "requirements": requirements,
-                    "repo_path": project.repo_path,
-                    "model": model
-                },
-                timeout=120.0
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Create PMDecomposition record
-            decomposition = PMDecomposition.objects.create(
-                project=project,
-                requirements=requirements,
-                generated_tasks=result.get('tasks', []),
-                model_used=model,
-                status='PENDING'
-            )
-
-            return Response(
-                PMDecompositionSerializer(decomposition).data,
-                status=status.HTTP_201_CREATED
-            )
+        # The LDA call can take minutes; run it in the background
+        from .operations import start_operation, accepted_response_data
+        from .tasks import run_pm_decomposition
 
-        except httpx.HTTPStatusError as e:
-            return Response(
-                {'error': f'LDA error: {e.response.text}'},
-                status=status.HTTP_502_BAD_GATEWAY
-            )
-        except httpx.RequestError as e:
-            return Response(
-                {'error': f'Cannot connect to LDA: {str(e)}'},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
+        operation = start_operation(
+            project,
+            request.user,
+            'PM_DECOMPOSE',
+            {'requirements': requirements, 'model': model},
+            run_pm_decomposition
+        )
+        return Response(accepted_response_data(operation), status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=['get'], url_path='decompositions')
     def decompositions(self, request, pk=None):
@@ -120,31 +134,68 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """
         Approve PM decomposition and create tasks from generated_tasks.
         """
+        from apps.tasks.utils import DependencyGraph
+
         project = self.get_object()
 
-        try:
-            decomposition = PMDecomposition.objects.get(
+        with transaction.atomic():
+            # Locked so two concurrent approvals can't both create the tasks
+            decomposition = PMDecomposition.objects.select_for_update().filter(
                 id=decomposition_id,
                 project=project
-            )
-        except PMDecomposition.DoesNotExist:
-            return Response(
-                {'error': 'Decomposition not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+            ).first()
+            if decomposition is None:
+                return Response(
+                    {'error': 'Decomposition not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-        if decomposition.status != 'PENDING':
-            return Response(
-                {'error': f'Decomposition already {decomposition.status.lower()}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            if decomposition.status != 'PENDING':
+                return Response(
+                    {'error': f'Decomposition already {decomposition.status.lower()}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            tasks = self._build_decomposition_tasks(project, decomposition.generated_tasks)
+
+            cycles = DependencyGraph().build_graph([
+                {'id': str(task.id), 'title': task.title, 'dependencies': task.dependencies}
+                for task in tasks
+            ]).check_cycles()
+            if cycles:
+                return Response(
+                    {'error': 'Decomposition has circular dependencies', 'cycles': cycles},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            Task.objects.bulk_create(tasks, batch_size=500)
+            board_publisher.tasks_changed(project.id, [task.id for task in tasks])
+
+            created_task_ids = [str(task.id) for task in tasks]
+            decomposition.status = 'APPROVED'
+            decomposition.tasks_created = created_task_ids
+            decomposition.save(update_fields=['status', 'tasks_created', 'updated_at'])
+
+        return Response({
+            'status': 'approved',
+            'tasks_created': len(created_task_ids),
+            'task_ids': created_task_ids
+        })
 
-        # Create tasks from generated_tasks
-        created_task_ids = []
+    @staticmethod
+    def _build_decomposition_tasks(project, generated_tasks):
+        """
+        Build (unsaved) tasks for a decomposition's generated tasks.
+
+        Ids are assigned up front, so dependencies given as temp ids (or
+        list indexes) are resolved in memory; unknown ones are dropped.
+        """
+        tasks = []
         task_id_mapping = {}  # Map temp IDs to real IDs for dependencies
 
-        for idx, task_data in enumerate(decomposition.generated_tasks):
-            task = Task.objects.create(
+        for idx, task_data in enumerate(generated_tasks):
+            task = Task(
+                id=uuid.uuid4(),
                 project=project,
                 title=task_data.get('title', f'Task {idx + 1}'),
                 description=task_data.get('description', ''),
@@ -153,35 +204,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 acceptance_criteria=task_data.get('acceptance_criteria', []),
                 status='TODO'
             )
-            created_task_ids.append(str(task.id))
+            tasks.append(task)
             # Map temp ID (index or temp_id) to real ID
             temp_id = task_data.get('temp_id', str(idx))
             task_id_mapping[temp_id] = str(task.id)
 
-        # Second pass: resolve dependencies
-        for idx, task_data in enumerate(decomposition.generated_tasks):
-            if 'dependencies' in task_data and task_data['dependencies']:
-                temp_id = task_data.get('temp_id', str(idx))
-                real_id = task_id_mapping.get(temp_id)
-                if real_id:
-                    task = Task.objects.get(id=real_id)
-                    resolved_deps = []
-                    for dep_temp_id in task_data['dependencies']:
-                        if dep_temp_id in task_id_mapping:
-                            resolved_deps.append(task_id_mapping[dep_temp_id])
-                    task.dependencies = resolved_deps
-                    task.save()
-
-        # Update decomposition status
-        decomposition.status = 'APPROVED'
-        decomposition.tasks_created = created_task_ids
-        decomposition.save()
-
-        return Response({
-            'status': 'approved',
-            'tasks_created': len(created_task_ids),
-            'task_ids': created_task_ids
-        })
+        for task, task_data in zip(tasks, generated_tasks):
+            task.dependencies = [
+                task_id_mapping[dep_temp_id]
+                for dep_temp_id in task_data.get('dependencies') or []
+                if dep_temp_id in task_id_mapping
+            ]
+        return tasks
 
     @action(detail=True, methods=['post'], url_path='decompositions/(?P<decomposition_id>[^/.]+)/reject')
     def reject_decomposition(self, request, pk=None, decomposition_id=None):
@@ -247,16 +281,43 @@ class ProjectViewSet(viewsets.ModelViewSet):
         - ready_tasks: Tasks ready to execute
         - blocked_tasks: Tasks waiting for dependencies
         - execution_levels: Parallel execution levels
+        - eta: Estimated remaining time (critical path + slot contention)
         """
         from apps.attempts.services import ExecutionCoordinator
+        from .read_cache import read_cache
         
         project = self.get_object()
-        coordinator = ExecutionCoordinator(str(project.id), request.user)
+        coordinator = ExecutionCoordinator(str(project.id), request.user, project=project)
         
-        execution_status = coordinator.get_execution_status()
+        # The ETA and free slots change without a version bump; keep it briefly
+        execution_status = read_cache.get_or_build(
+            'execution_status',
+            (project.id, project.version),
+            coordinator.get_execution_status,
+            timeout=settings.READ_CACHE_LIVE_TTL,
+        )
         
         return Response(execution_status)
 
+    @action(detail=True, methods=['get'])
+    def estimates(self, request, pk=None):
+        """
+        Get predicted task durations and the project ETA.
+        
+        Predictions are learned from completed attempts by project,
+        agent role and task size.
+        
+        Returns:
+        - tasks: Per-task p50/p90 seconds, prediction basis and upward rank
+        - eta: Estimated remaining time and completion timestamp
+        """
+        from apps.attempts.services import ExecutionCoordinator
+        
+        project = self.get_object()
+        coordinator = ExecutionCoordinator(str(project.id), request.user)
+        
+        return Response(coordinator.get_estimates())
+
     @action(detail=True, methods=['post'], url_path='cancel-all')
     def cancel_all(self, request, pk=None):
         """
@@ -293,3 +354,89 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         return Response(result)
 
+    @action(detail=False, methods=['get'], url_path='read-cache-metrics')
+    def read_cache_metrics(self, request):
+        """Get hit/miss counters of the read cache per read model."""
+        from .read_cache import read_cache
+
+        return Response({'read_models': read_cache.snapshot()})
+
+
+class OperationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ReadOnly viewset for background operations.
+    Poll an operation started by a 202 endpoint until it is finished.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = OperationSerializer
+
+    def get_queryset(self):
+        queryset = Operation.objects.filter(project__owner=self.request.user)
+
+        # Filter by project
+        project_id = self.request.query_params.get('project')
+        if project_id:
+            queryset = queryset.filter(project_id=project_id)
+
+        # Filter by status
+        status_param = self.request.query_params.get('status')
+        if status_param:
+            queryset = queryset.filter(status=status_param)
+
+        return queryset.order_by('-created_at')
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Ranked full-text search over tasks, attempts and attempt events.
+
+    Query params:
+    - q: Search text (words, "quoted phrases", or, -excluded)
+    - project: Filter by project ID
+    - role: Filter by agent role
+    - status: Filter by task status (tasks) or attempt status (attempts, events)
+    - type: Comma-separated kinds to search: task, attempt, event (default all)
+    - limit: Maximum number of results (default 20, at most 100)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        from .search import SEARCH_TYPES, search
+
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response(
+                {'error': 'q query parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        project_id = request.query_params.get('project')
+        if project_id:
+            try:
+                project_id = str(uuid.UUID(project_id))
+            except ValueError:
+                return Response({'error': 'Invalid project ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        unknown = set(types) - set(SEARCH_TYPES)
+        if unknown:
+            return Response(
+                {'error': f"Unknown type(s): {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search(
+            request.user,
+            text,
+            project_id=project_id,
+            role=request.query_params.get('role') or None,
+            status=request.query_params.get('status') or None,
+            types=types or SEARCH_TYPES,
+            limit=limit,
+        )
+        return Response({'query': text, 'count': len(results), 'results': results})
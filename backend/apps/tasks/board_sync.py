@@ -0,0 +1,356 @@
+"""
+Board Sync - Versioned board snapshots and field-level patches.
+
+Project boards are kept in sync over the project WebSocket instead of
+refetching the task list on every change. A client gets a snapshot of
+the board tagged with the project's revision when it connects, then
+patches carrying only the fields that changed.
+
+Writers report changes with task_changed()/task_removed(). Changes are
+collected per project once their transaction commits and published
+together after BOARD_PATCH_WINDOW seconds. Publishing bumps the
+project's revision (under its row lock, so revisions are gapless across
+processes), reads the changed fields with a fixed number of queries
+and sends one 'board_patch' to the project group:
+
+    {"revision": 8, "base_revision": 7,
+     "tasks": {"<id>": {"status": "DONE", ...}}, "removed": ["<id>"]}
+
+Patches set fields to their current values, so applying one twice is
+harmless. A client holding a revision older than a patch's
+base_revision has missed one and needs a new snapshot.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Fields of a task on the board (as in TaskSerializer)
+TASK_FIELDS = (
+    'id', 'project', 'title', 'description', 'acceptance_criteria',
+    'agent_role', 'status', 'priority', 'dependencies',
+    'is_blocked', 'attempt_count',
+    'created_at', 'updated_at',
+)
+# Fields computed from other rows rather than stored on the task
+DERIVED_FIELDS = ('is_blocked', 'attempt_count')
+
+
+def _value(value):
+    """JSON-ready form of a stored value, formatted as by TaskSerializer."""
+    if isinstance(value, datetime):
+        return serializers.DateTimeField().to_representation(value)
+    if value is not None and not isinstance(value, (str, int, float, bool, list, dict)):
+        return str(value)
+    return value
+
+
+def dependencies_blocked(dependencies, statuses: Dict[str, str]) -> bool:
+    """Same rule as Task.is_blocked: an existing dependency isn't DONE."""
+    return any(statuses.get(str(dep), 'DONE') != 'DONE' for dep in dependencies or [])
+
+
+def count_attempts(task_ids: Iterable) -> Dict[str, int]:
+    """Attempt count by task id (tasks without attempts are left out)."""
+    from apps.attempts.models import Attempt
+
+    return {
+        str(row['task_id']): row['count']
+        for row in Attempt.objects.filter(task_id__in=list(task_ids)).values('task_id').annotate(
+            count=Count('id')
+        ).order_by()
+    }
+
+
+def serialize_board_task(row: Dict[str, Any], statuses: Dict[str, str], attempt_counts: Dict[str, int],
+                         fields: Iterable[str] = TASK_FIELDS) -> Dict[str, Any]:
+    """
+    Board form of a task row (from Task.objects.values()).
+
+    Args:
+        row: Task values, with 'project_id' for the project
+        statuses: Status of every task of the project, by id, for is_blocked
+        attempt_counts: Attempt count by task id
+        fields: Fields to include
+    """
+    task_id = str(row['id'])
+    data = {}
+    for field in fields:
+        if field == 'is_blocked':
+            data[field] = dependencies_blocked(row.get('dependencies'), statuses)
+        elif field == 'attempt_count':
+            data[field] = attempt_counts.get(task_id, 0)
+        elif field == 'project':
+            data[field] = str(row['project_id'])
+        elif field == 'dependencies':
+            data[field] = [str(dep) for dep in row.get('dependencies') or []]
+        else:
+            data[field] = _value(row[field])
+    return data
+
+
+def board_snapshot(project_id) -> Dict[str, Any]:
+    """
+    The whole board of a project with the revision it reflects.
+
+    Three queries however many tasks there are. The revision is read
+    first, so the tasks are at least as new as it; patches after it
+    re-apply fields idempotently.
+    """
+    from apps.projects.models import Project
+    from .models import Task
+
+    revision = Project.objects.filter(id=project_id).values_list('revision', flat=True).first()
+    stored = [field for field in TASK_FIELDS if field not in DERIVED_FIELDS and field != 'project']
+    rows = list(Task.objects.filter(project_id=project_id).values(*stored, 'project_id').order_by(
+        'priority', '-created_at'
+    ))
+    statuses = {str(row['id']): row['status'] for row in rows}
+    attempt_counts = count_attempts(row['id'] for row in rows)
+    return {
+        'revision': revision or 0,
+        'tasks': [serialize_board_task(row, statuses, attempt_counts) for row in rows],
+    }
+
+
+class _PendingBoard:
+    """Changes to one project's board not yet published."""
+
+    __slots__ = ('fields', 'removed', 'first_at')
+
+    def __init__(self):
+        self.fields: Dict[str, Set[str]] = {}
+        self.removed: Set[str] = set()
+        self.first_at = time.monotonic()
+
+
+class BoardPublisher:
+    """
+    Collects committed task changes and publishes them as board patches.
+
+    Configured via settings:
+    - BOARD_PATCH_WINDOW: seconds changes are collected before publishing
+    """
+
+    def __init__(self, window: Optional[float] = None):
+        self.window = window if window is not None else getattr(settings, 'BOARD_PATCH_WINDOW', 0.1)
+        self._pending: Dict[str, _PendingBoard] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+
+    def task_changed(self, task, fields: Optional[Iterable[str]] = None, project_id=None) -> None:
+        """
+        Report that a task was created or changed.
+
+        Args:
+            task: Task instance or id
+            fields: Changed fields (default: all, e.g. for a new task).
+                is_blocked of dependents follows status changes, and a
+                task's own is_blocked follows its dependencies.
+            project_id: Required when task is an id
+        """
+        task_id = str(getattr(task, 'id', task))
+        project_id = str(project_id or task.project_id)
+        fields = set(fields or TASK_FIELDS)
+        if 'dependencies' in fields:
+            fields.add('is_blocked')
+        transaction.on_commit(lambda: self._add(project_id, task_id, fields))
+
+    def tasks_changed(self, project_id, task_ids: Iterable, fields: Optional[Iterable[str]] = None) -> None:
+        """Report the same changed fields for several tasks of a project."""
+        for task_id in task_ids:
+            self.task_changed(task_id, fields, project_id=project_id)
+
+    def task_removed(self, project_id, task_id) -> None:
+        """Report that a task was deleted."""
+        project_id, task_id = str(project_id), str(task_id)
+        transaction.on_commit(lambda: self._add(project_id, task_id, None))
+
+    def _add(self, project_id: str, task_id: str, fields: Optional[Set[str]]) -> None:
+        with self._lock:
+            pending = self._pending.get(project_id)
+            if pending is None:
+                pending = self._pending[project_id] = _PendingBoard()
+            if fields is None:
+                pending.removed.add(task_id)
+                pending.fields.pop(task_id, None)
+            else:
+                pending.fields.setdefault(task_id, set()).update(fields)
+            due = time.monotonic() - pending.first_at >= self.window
+        if due:
+            self.flush(project_id)
+        else:
+            self._ensure_flusher()
+
+    def flush(self, project_id: Optional[str] = None) -> int:
+        """
+        Publish pending changes.
+
+        Args:
+            project_id: Only publish this project's changes (default: all)
+
+        Returns:
+            Number of patches published
+        """
+        with self._lock:
+            if project_id is None:
+                batches = self._pending
+                self._pending = {}
+            else:
+                pending = self._pending.pop(str(project_id), None)
+                batches = {str(project_id): pending} if pending else {}
+
+        published = 0
+        for batch_project_id, pending in batches.items():
+            try:
+                patch = self._build_patch(batch_project_id, pending)
+            except Exception as e:
+                logger.exception(f"Could not build board patch for project {batch_project_id}: {e}")
+                continue
+            if patch is not None:
+                self._publish(batch_project_id, patch)
+                published += 1
+        return published
+
+    def _build_patch(self, project_id: str, pending: _PendingBoard) -> Optional[Dict[str, Any]]:
+        from apps.projects.models import Project
+        from .models import Task
+
+        with transaction.atomic():
+            # The row lock orders concurrent publishers, keeping revisions gapless
+            if not Project.objects.filter(id=project_id).update(revision=F('revision') + 1):
+                return None
+            revision = Project.objects.filter(id=project_id).values_list('revision', flat=True).get()
+
+            graph = {
+                str(row['id']): row
+                for row in Task.objects.filter(project_id=project_id).values('id', 'status', 'dependencies')
+            }
+            statuses = {task_id: row['status'] for task_id, row in graph.items()}
+
+            fields = {task_id: set(task_fields) for task_id, task_fields in pending.fields.items() if task_id in graph}
+            # Tasks whose fields were reported but that are gone by now
+            removed = pending.removed | (set(pending.fields) - set(graph))
+
+            # Dependents of these may have become (un)blocked
+            unblocking = removed | {task_id for task_id, task_fields in fields.items() if 'status' in task_fields}
+            if unblocking:
+                for task_id, row in graph.items():
+                    if unblocking.intersection(str(dep) for dep in row['dependencies'] or []):
+                        fields.setdefault(task_id, set()).add('is_blocked')
+
+            stored = {
+                field for task_fields in fields.values() for field in task_fields
+                if field not in DERIVED_FIELDS and field != 'project'
+            }
+            rows = {}
+            if fields:
+                rows = {
+                    str(row['id']): row
+                    for row in Task.objects.filter(id__in=list(fields)).values(
+                        'id', 'project_id', 'dependencies', *stored
+                    )
+                }
+            attempt_counts = {}
+            needs_count = [task_id for task_id, task_fields in fields.items() if 'attempt_count' in task_fields]
+            if needs_count:
+                attempt_counts = count_attempts(needs_count)
+
+        return {
+            'revision': revision,
+            'base_revision': revision - 1,
+            'tasks': {
+                task_id: serialize_board_task(
+                    rows[task_id], statuses, attempt_counts, sorted(task_fields | {'id'})
+                )
+                for task_id, task_fields in fields.items() if task_id in rows
+            },
+            'removed': sorted(removed),
+        }
+
+    @staticmethod
+    def _publish(project_id: str, patch: Dict[str, Any]) -> None:
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f'project_{project_id}',
+                {'type': 'board_patch', 'project_id': project_id, 'patch': patch}
+            )
+        except Exception as e:
+            # Clients notice the missing revision and ask for a snapshot
+            logger.warning(f"Could not publish board patch for project {project_id}: {e}")
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flusher (again, after a fork) if needed."""
+        pid = os.getpid()
+        if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._flusher_pid = pid
+            self._flusher = threading.Thread(
+                target=self._run_flusher,
+                name='board-patch-flusher',
+                daemon=True
+            )
+            self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            time.sleep(self.window)
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    project_id for project_id, pending in self._pending.items()
+                    if now - pending.first_at >= self.window
+                ]
+            if not due:
+                continue
+            try:
+                for project_id in due:
+                    self.flush(project_id)
+            finally:
+                # This thread's DB connection is not managed by a request cycle
+                connections.close_all()
+
+
+def merge_patches(patches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine consecutive patches into one.
+
+    Args:
+        patches: Patches in revision order, each based on the previous one
+    """
+    merged = {
+        'revision': patches[-1]['revision'],
+        'base_revision': patches[0]['base_revision'],
+        'tasks': {},
+        'removed': set(),
+    }
+    for patch in patches:
+        for task_id in patch['removed']:
+            merged['tasks'].pop(task_id, None)
+            merged['removed'].add(task_id)
+        for task_id, fields in patch['tasks'].items():
+            merged['removed'].discard(task_id)
+            merged['tasks'].setdefault(task_id, {}).update(fields)
+    merged['removed'] = sorted(merged['removed'])
+    return merged
+
+
+board_publisher = BoardPublisher()
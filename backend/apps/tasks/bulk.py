@@ -0,0 +1,134 @@
+"""
+Bulk Task Changes - Apply many board changes in one transaction.
+
+Status, priority and dependency changes for any number of tasks of one
+project are applied in memory, the project's resulting dependency graph
+is validated once, and the changed rows are written with one
+bulk_update. Board clients get the changed fields in one board patch
+instead of one message per task.
+"""
+from typing import Any, Dict, List
+from django.db import transaction
+from django.utils import timezone
+from apps.projects.versioning import bump_project_versions
+from .board_sync import board_publisher
+from .models import Task
+
+CHANGE_FIELDS = ('status', 'priority', 'dependencies')
+
+
+class TaskChangeError(Exception):
+    """Raised when a set of changes can't be applied; carries the response details."""
+
+    def __init__(self, message: str, **details):
+        self.message = message
+        self.details = details
+        super().__init__(message)
+
+
+def apply_task_changes(user, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Apply status/priority/dependency changes to tasks of one project.
+
+    Args:
+        user: Owner of the tasks
+        changes: Validated changes, each with 'id' and any of 'status',
+            'priority' and 'dependencies'
+
+    Returns:
+        The changed tasks, serialized
+
+    Raises:
+        TaskChangeError: If a task doesn't exist, the tasks span projects,
+            a dependency is outside the project or the result has cycles.
+            Nothing is written in that case.
+    """
+    from apps.tasks.utils import DependencyGraph
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    for change in changes:
+        # Later changes to the same task win
+        merged.setdefault(str(change['id']), {}).update(
+            {field: change[field] for field in CHANGE_FIELDS if field in change}
+        )
+
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(of=('self',)).filter(id__in=list(merged), project__owner=user)
+        )
+        missing = set(merged) - {str(task.id) for task in tasks}
+        if missing:
+            raise TaskChangeError('Tasks not found', missing=sorted(missing))
+        project_ids = {task.project_id for task in tasks}
+        if len(project_ids) > 1:
+            raise TaskChangeError('All tasks must belong to the same project')
+        project_id = project_ids.pop()
+
+        fields = set()
+        for task in tasks:
+            for field, value in merged[str(task.id)].items():
+                if field == 'dependencies':
+                    value = [str(dep) for dep in value]
+                setattr(task, field, value)
+                fields.add(field)
+
+        if 'dependencies' in fields:
+            changed = {str(task.id): task for task in tasks}
+            project_tasks = [
+                {
+                    'id': str(row['id']),
+                    'title': row['title'],
+                    'dependencies': [str(dep) for dep in (row['dependencies'] or [])],
+                }
+                for row in Task.objects.filter(project_id=project_id).values('id', 'title', 'dependencies')
+            ]
+            for row in project_tasks:
+                if row['id'] in changed:
+                    row['dependencies'] = changed[row['id']].dependencies
+
+            known = {row['id'] for row in project_tasks}
+            invalid = sorted({
+                dep for task in tasks for dep in task.dependencies if dep not in known
+            })
+            if invalid:
+                raise TaskChangeError('Invalid task dependencies', invalid=invalid)
+
+            cycles = DependencyGraph().build_graph(project_tasks).check_cycles()
+            if cycles:
+                raise TaskChangeError('Changes would create circular dependencies', cycles=cycles)
+
+        now = timezone.now()
+        for task in tasks:
+            task.updated_at = now
+        Task.objects.bulk_update(tasks, sorted(fields) + ['updated_at'], batch_size=500)
+        bump_project_versions([project_id])
+        board_publisher.tasks_changed(project_id, merged, fields | {'updated_at'})
+
+    return serialize_tasks(tasks)
+
+
+def serialize_tasks(tasks: List[Task]) -> List[Dict[str, Any]]:
+    """
+    JSON-ready board form of tasks of one project (as TaskSerializer).
+
+    Two queries however many tasks there are: the project's statuses
+    (for is_blocked) and the attempt counts.
+    """
+    from .board_sync import DERIVED_FIELDS, TASK_FIELDS, count_attempts, serialize_board_task
+
+    if not tasks:
+        return []
+    statuses = {
+        str(task_id): task_status
+        for task_id, task_status in Task.objects.filter(project_id=tasks[0].project_id).values_list('id', 'status')
+    }
+    attempt_counts = count_attempts(task.id for task in tasks)
+    stored = [field for field in TASK_FIELDS if field not in DERIVED_FIELDS and field != 'project']
+    return [
+        serialize_board_task(
+            {'project_id': task.project_id, **{field: getattr(task, field) for field in stored}},
+            statuses,
+            attempt_counts,
+        )
+        for task in tasks
+    ]
@@ -2,8 +2,6 @@ import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
 from apps.tasks.models import Task
 from apps.attempts.models import Attempt
@@ -17,7 +15,6 @@ class TaskExecutor:
     
     def __init__(self, task: Task):
         self.task = task
-        self.channel_layer = get_channel_layer()
     
     def create_attempt(self) -> Attempt:
         """Create a new attempt for this task"""
@@ -28,7 +25,7 @@ class TaskExecutor:
         )
         
         # Broadcast task update
-        self._broadcast_task_update('attempt_created')
+        self._broadcast_task_update()
         
         return attempt
     
@@ -41,7 +38,7 @@ class TaskExecutor:
         self.task.status = 'IN_PROGRESS'
         self.task.save()
         
-        self._broadcast_task_update('started')
+        self._broadcast_task_update()
     
     def complete_attempt(
         self, 
@@ -71,40 +68,13 @@ class TaskExecutor:
 
         self.task.save()
 
-        # Broadcast with error details for failed tasks
-        if success:
-            self._broadcast_task_update('completed')
-        else:
-            self._broadcast_task_update('failed', error_message=error_message)
+        self._broadcast_task_update()
     
-    def _broadcast_task_update(self, action: str, error_message: Optional[str] = None) -> None:
-        """Broadcast task update to WebSocket clients"""
-        if not self.channel_layer:
-            return
-
-        group_name = f'project_{self.task.project_id}'
-
-        message = {
-            'type': 'task_update',
-            'task': {
-                'id': str(self.task.id),
-                'title': self.task.title,
-                'status': self.task.status,
-                'agent_role': self.task.agent_role,
-                'attempt_count': self.task.attempt_count,
-            },
-            'action': action
-        }
+    def _broadcast_task_update(self) -> None:
+        """Report the task's new status and attempt count to board clients"""
+        from .board_sync import board_publisher
 
-        # Include error message for failed tasks to notify user
-        if error_message:
-            message['error_message'] = error_message
-
-        try:
-            async_to_sync(self.channel_layer.group_send)(group_name, message)
-        except Exception as e:
-            # Log but don't fail the task execution if broadcast fails
-            print(f"Failed to broadcast task update: {e}")
+        board_publisher.task_changed(self.task, ['status', 'attempt_count', 'updated_at'])
     
     def execute(self) -> Attempt:
         """
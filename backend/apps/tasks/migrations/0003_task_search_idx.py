@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0002_alter_task_acceptance_criteria_and_more"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "title", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                name="tasks_search_idx",
+            ),
+        ),
+    ]
@@ -1,12 +1,25 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 
+# Text search configuration of all search indexes (changing it needs new indexes)
+SEARCH_CONFIG = 'english'
+
 
 def empty_list():
     """Return empty list. Used as default for JSONField (lambdas can't be serialized)."""
     return []
 
 
+def task_search_vector():
+    """Search document of a task; queries must use this exact expression to hit its index."""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
 class Task(models.Model):
     """
     Represents a development task assigned to a specific agent role.
@@ -25,6 +38,9 @@ class Task(models.Model):
         ('QA', 'QA Engineer'),
         ('DEVOPS', 'DevOps Engineer'),
     ]
+
+    # Order of roles on the board and in task lists
+    ROLE_ORDER = ['BACKEND', 'FRONTEND', 'QA', 'DEVOPS', 'PM']
     
     PRIORITY_CHOICES = [
         (1, 'Critical'),
@@ -65,6 +81,7 @@ class Task(models.Model):
             models.Index(fields=['project', 'status']),
             models.Index(fields=['project', 'agent_role']),
             models.Index(fields=['status', '-created_at']),
+            GinIndex(task_search_vector(), name='tasks_search_idx'),
         ]
     
     def __str__(self):
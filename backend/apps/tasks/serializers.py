@@ -51,3 +51,14 @@ class TaskSerializer(serializers.ModelSerializer):
 class TaskMoveSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
     priority = serializers.IntegerField(required=False, min_value=1, max_value=5)
+
+
+class TaskChangeSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    priority = serializers.IntegerField(required=False, min_value=1, max_value=5)
+    dependencies = serializers.ListField(child=serializers.UUIDField(), required=False)
+
+
+class TaskBulkUpdateSerializer(serializers.Serializer):
+    changes = TaskChangeSerializer(many=True, allow_empty=False, max_length=2000)
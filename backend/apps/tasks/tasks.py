@@ -1,5 +1,6 @@
 from celery import shared_task
 from django.db import transaction
+from apps.tasks.board_sync import board_publisher
 from apps.tasks.models import Task
 from apps.tasks.executor import TaskExecutor
 
@@ -99,6 +100,7 @@ def check_task_dependencies(task_id: str):
         if all_done and task.status == 'BLOCKED':
             task.status = 'TODO'
             task.save()
+            board_publisher.task_changed(task, ['status', 'updated_at'])
             
             return {
                 'task_id': str(task_id),
@@ -325,6 +325,39 @@ class DependencyGraph:
         
         return ready
     
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Count tasks by status using the already-loaded task data.
+
+        Returns:
+            Dict mapping status to number of tasks in that status.
+        """
+        counts: Dict[str, int] = {}
+        for task in self._task_map.values():
+            task_status = task.get('status', 'UNKNOWN')
+            counts[task_status] = counts.get(task_status, 0) + 1
+        return counts
+
+    def get_tasks_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """
+        Get all tasks with a specific status.
+
+        Args:
+            status: Task status to filter by.
+
+        Returns:
+            List of task info for matching tasks.
+        """
+        return [
+            {
+                'id': task_id,
+                'title': task.get('title', 'Unknown'),
+                'agent_role': task.get('agent_role', 'UNKNOWN')
+            }
+            for task_id, task in self._task_map.items()
+            if task.get('status') == status
+        ]
+
     def get_task_dependents(self, task_id: str) -> List[Dict[str, Any]]:
         """
         Get all tasks that depend on a specific task.
@@ -379,6 +412,36 @@ class DependencyGraph:
         except nx.NetworkXError:
             return []
     
+    def get_upward_ranks(self, weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Compute the HEFT-style upward rank of every task.
+        
+        A task's upward rank is its own weight plus the largest upward rank
+        among its dependents, i.e. the length of the longest chain of
+        remaining work that starts at this task. Completed tasks weigh 0.
+        
+        Args:
+            weights: Dict mapping task ID to estimated duration.
+                     Tasks missing from the dict weigh 1.0.
+        
+        Returns:
+            Dict mapping task ID to upward rank. Empty if the graph has cycles.
+        """
+        if self.has_cycles():
+            return {}
+        
+        weights = weights or {}
+        ranks: Dict[str, float] = {}
+        
+        # Successors are always ranked before their predecessors
+        for task_id in reversed(list(nx.topological_sort(self.graph))):
+            task = self._task_map.get(task_id, {})
+            own = 0.0 if task.get('status') == 'DONE' else float(weights.get(task_id, 1.0))
+            downstream = [ranks[succ] for succ in self.graph.successors(task_id)]
+            ranks[task_id] = own + max(downstream, default=0.0)
+        
+        return ranks
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Export the graph structure for visualization.
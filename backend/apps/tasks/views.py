@@ -1,15 +1,30 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
 from django.db.models import Case, When, IntegerField
+from apps.projects.models import Project
+from apps.projects.versioning import ProjectVersionETagMixin
+from .board_sync import board_publisher
 from .models import Task
-from .serializers import TaskSerializer, TaskMoveSerializer
+from .serializers import TaskSerializer, TaskMoveSerializer, TaskBulkUpdateSerializer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ProjectVersionETagMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TaskSerializer
 
+    read_cache_actions = {'list': 'task_list'}
+
+    def get_etag_projects(self):
+        projects = Project.objects.filter(owner=self.request.user)
+        if self.action == 'retrieve':
+            return projects.filter(tasks__id=self.kwargs['pk'])
+        project_id = self.request.query_params.get('project')
+        if project_id:
+            projects = projects.filter(id=project_id)
+        return projects
+
     def get_queryset(self):
         queryset = Task.objects.filter(project__owner=self.request.user)
 
@@ -32,17 +47,26 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Then by priority, then by created_at descending
         queryset = queryset.annotate(
             role_order=Case(
-                When(agent_role='BACKEND', then=1),
-                When(agent_role='FRONTEND', then=2),
-                When(agent_role='QA', then=3),
-                When(agent_role='DEVOPS', then=4),
-                When(agent_role='PM', then=5),
-                default=6,
+                *[When(agent_role=role, then=index) for index, role in enumerate(Task.ROLE_ORDER, 1)],
+                default=len(Task.ROLE_ORDER) + 1,
                 output_field=IntegerField()
             )
         ).order_by('role_order', 'priority', '-created_at')
 
         return queryset.select_related('project')
+
+    def perform_create(self, serializer):
+        task = serializer.save()
+        board_publisher.task_changed(task)
+
+    def perform_update(self, serializer):
+        task = serializer.save()
+        board_publisher.task_changed(task, set(serializer.validated_data) | {'updated_at'})
+
+    def perform_destroy(self, instance):
+        project_id, task_id = instance.project_id, instance.id
+        instance.delete()
+        board_publisher.task_removed(project_id, task_id)
     
     @action(detail=True, methods=['post'])
     def move(self, request, pk=None):
@@ -55,8 +79,30 @@ class TaskViewSet(viewsets.ModelViewSet):
         if 'priority' in serializer.validated_data:
             task.priority = serializer.validated_data['priority']
         task.save()
+        board_publisher.task_changed(task, set(serializer.validated_data) | {'updated_at'})
         
         return Response(TaskSerializer(task).data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Apply status, priority and dependency changes to many tasks at once.
+
+        Body: {"changes": [{"id": ..., "status"?, "priority"?, "dependencies"?}, ...]}
+        All tasks must belong to one project. Changes are applied in one
+        transaction, all or nothing, and clients get one WebSocket update.
+        """
+        from .bulk import TaskChangeError, apply_task_changes
+
+        serializer = TaskBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            tasks = apply_task_changes(request.user, serializer.validated_data['changes'])
+        except TaskChangeError as e:
+            return Response({'error': e.message, **e.details}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'updated': len(tasks), 'tasks': tasks})
     
     @action(detail=True, methods=['get'])
     def check_dependencies(self, request, pk=None):
@@ -196,7 +242,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         - blocked_tasks: List of tasks blocked by dependencies
         - has_cycles: Boolean if cycles exist
         """
-        from .utils import DependencyGraph
+        from apps.projects.read_cache import read_cache
         
         project_id = request.query_params.get('project')
         if not project_id:
@@ -205,6 +251,26 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        try:
+            version = Project.objects.filter(
+                id=project_id, owner=request.user
+            ).values_list('version', flat=True).first()
+        except (ValueError, ValidationError):
+            version = None
+        if version is None:
+            # Unknown or foreign project: an empty graph, as before
+            return Response(self._dependency_graph(request, project_id))
+        
+        graph = read_cache.get_or_build(
+            'dependency_graph',
+            (project_id, version),
+            lambda: self._dependency_graph(request, project_id),
+        )
+        return Response(graph)
+
+    def _dependency_graph(self, request, project_id):
+        from .utils import DependencyGraph
+        
         # Get all tasks for the project
         project_tasks = Task.objects.filter(
             project_id=project_id,
@@ -259,7 +325,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Get blocked tasks
         blocked = graph.get_blocked_tasks()
         
-        return Response({
+        return {
             'nodes': graph_data['nodes'],
             'edges': graph_data['edges'],
             'has_cycles': graph_data['has_cycles'],
@@ -267,12 +333,14 @@ class TaskViewSet(viewsets.ModelViewSet):
             'execution_levels': execution_levels,
             'blocked_tasks': blocked,
             'critical_path': graph.get_critical_path() if not graph.has_cycles() else []
-        })
+        }
     
     @action(detail=True, methods=['post'])
     def execute(self, request, pk=None):
         """Trigger task execution via LDA agent."""
+        from django.db import transaction
         from apps.attempts.models import Attempt
+        from apps.attempts.services import SlotLeaseManager, SlotUnavailable
         from apps.attempts.tasks import start_attempt_task
 
         task = self.get_object()
@@ -284,16 +352,25 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create an attempt for this task
-        attempt = Attempt.objects.create(
-            task=task,
-            agent_role=task.agent_role,
-            status='PENDING'
-        )
+        # Create an attempt for this task and lease an execution slot
+        try:
+            with transaction.atomic():
+                attempt = Attempt.objects.create(
+                    task=task,
+                    agent_role=task.agent_role,
+                    status='PENDING'
+                )
+                SlotLeaseManager().acquire(attempt, task.project, task.agent_role)
 
-        # Update task status to IN_PROGRESS
-        task.status = 'IN_PROGRESS'
-        task.save()
+                # Update task status to IN_PROGRESS
+                task.status = 'IN_PROGRESS'
+                task.save()
+                board_publisher.task_changed(task, ['status', 'attempt_count', 'updated_at'])
+        except SlotUnavailable as e:
+            return Response(
+                {'error': f'No execution slot available: {e}'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
 
         # Trigger LDA-based execution via Celery
         celery_task = start_attempt_task.delay(str(attempt.id))
@@ -1,70 +1,188 @@
 import json
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from .topics import AttemptTopic, ProjectTopic, Topic, make_topic
+
+
+class StreamConsumer(AsyncWebsocketConsumer):
+    """
+    One socket for any number of project and attempt topics.
+
+    The client subscribes with control messages:
+
+        {"type": "subscribe", "topic": "project:<id>"}
+        {"type": "subscribe", "topic": "attempt:<id>", "after_seq": 41}
+        {"type": "unsubscribe", "topic": "attempt:<id>"}
+
+    and gets {"type": "subscribed", "topic": ...} or {"type": "error",
+    "topic": ..., "error": ...} back. Every topic message carries its
+    topic name; other client messages (e.g. "resync") name the topic
+    they are for. Permission checks are cached for the connection's
+    lifetime, so re-subscribing doesn't query again.
+
+    Configured via settings:
+    - WS_MAX_SUBSCRIPTIONS: topics one connection can follow at once
+    """
 
-class ProjectConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.project_id = self.scope['url_route']['kwargs']['project_id']
-        self.room_group_name = f'project_{self.project_id}'
         self.user = self.scope['user']
-
-        print(f"ProjectConsumer: Connecting to project {self.project_id}. User: {self.user}")
+        self.topics: Dict[str, Topic] = {}
+        self.permissions: Dict[str, bool] = {}
 
         if self.user.is_anonymous:
-            print(f"ProjectConsumer: Rejecting anonymous user for project {self.project_id}")
             await self.close()
             return
 
-        # Join project room
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
-
         await self.accept()
-        print(f"ProjectConsumer: Accepted connection for project {self.project_id}")
 
     async def disconnect(self, close_code):
-        # Leave project room
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        for name in list(getattr(self, 'topics', {})):
+            await self.unsubscribe(name)
 
-    # Receive message from WebSocket
     async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message_type = text_data_json.get('type')
-        
-        if message_type == 'chat_message':
-             message = text_data_json.get('message')
-             # Echo message to group
-             await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'message': message,
-                    'user': self.user.username
-                }
-            )
-
-    # Receive message from room group
+        try:
+            message = json.loads(text_data)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        message_type = message.get('type')
+        name = message.get('topic')
+
+        if message_type == 'subscribe':
+            await self.subscribe(name, message)
+        elif message_type == 'unsubscribe':
+            await self.unsubscribe(name)
+        else:
+            topic = self.find_topic(message)
+            if topic is not None:
+                await topic.receive(message, self.channel_layer)
+
+    def find_topic(self, message: Dict[str, Any]) -> Optional[Topic]:
+        """The subscribed topic a client message is for."""
+        return self.topics.get(message.get('topic'))
+
+    async def subscribe(self, name: str, params: Dict[str, Any]) -> bool:
+        """Check access to a topic, join its group and send its initial state."""
+        if name in self.topics:
+            await self.send_control('subscribed', name)
+            return True
+
+        topic = make_topic(name, self.user, self.send_topic, params)
+        if topic is None:
+            await self.send_control('error', name, error='Unknown topic')
+            return False
+        if len(self.topics) >= getattr(settings, 'WS_MAX_SUBSCRIPTIONS', 100):
+            await self.send_control('error', name, error='Too many subscriptions')
+            return False
+
+        allowed = self.permissions.get(topic.name)
+        if allowed is None:
+            allowed = self.permissions[topic.name] = await topic.authorize()
+        if not allowed:
+            await self.send_control('error', name, error='Not found')
+            return False
+
+        self.topics[topic.name] = topic
+        # Join before sending the initial state so nothing in between is missed
+        await self.channel_layer.group_add(topic.group_name, self.channel_name)
+        await self.send_control('subscribed', topic.name)
+        await topic.start()
+        return True
+
+    async def unsubscribe(self, name: str) -> None:
+        topic = self.topics.pop(name, None)
+        if topic is None:
+            return
+        await topic.stop()
+        await self.channel_layer.group_discard(topic.group_name, self.channel_name)
+
+    async def send_control(self, message_type: str, name: Optional[str], **data):
+        await self.send(text_data=json.dumps({'type': message_type, 'topic': name, **data}))
+
+    async def send_topic(self, topic: Topic, payload: Dict[str, Any]) -> None:
+        await self.send(text_data=json.dumps({**payload, 'topic': topic.name}))
+
+    async def route(self, name: str, handler: str, event: Dict[str, Any]) -> None:
+        """Pass a group message to the topic it was sent for."""
+        topic = self.topics.get(name)
+        if topic is not None:
+            await getattr(topic, handler)(event)
+
+    # Group message handlers
+
+    async def board_patch(self, event):
+        await self.route(f"project:{event.get('project_id')}", 'board_patch', event)
+
+    async def operation_update(self, event):
+        await self.route(f"project:{event.get('project_id')}", 'operation_update', event)
+
     async def chat_message(self, event):
-        message = event['message']
-        user = event.get('user', 'Unknown')
-
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'message': message,
-            'user': user,
-        }))
-
-    async def task_update(self, event):
-        """
-        Handler for task updates broadcasted from anywhere in the system
-        """
-        await self.send(text_data=json.dumps({
-            'type': 'task_update',
-            'task': event['task'],
-            'action': event['action']
-        }))
+        await self.route(f"project:{event.get('project_id')}", 'chat_message', event)
+
+    async def attempt_events(self, event):
+        await self.route(f"attempt:{event.get('attempt_id')}", 'attempt_events', event)
+
+
+class SingleTopicConsumer(StreamConsumer):
+    """
+    A socket for exactly one topic, named by the URL.
+
+    Subscribed on connect with the query string as options; messages
+    aren't tagged with the topic and client messages need no topic.
+    """
+    topic_class = Topic
+    url_kwarg = ''
+
+    async def connect(self):
+        self.user = self.scope['user']
+        self.topics = {}
+        self.permissions = {}
+
+        query_params = parse_qs(self.scope.get('query_string', b'').decode('utf-8'))
+        params = {key: values[0] for key, values in query_params.items() if key != 'token'}
+        self.topic = self.topic_class(
+            self.scope['url_route']['kwargs'][self.url_kwarg], self.user, self.send_topic, params
+        )
+
+        print(f"{type(self).__name__}: Connecting to {self.topic.name}. User: {self.user}")
+
+        if self.user.is_anonymous or not await self.topic.authorize():
+            print(f"{type(self).__name__}: Rejecting {self.user} for {self.topic.name}")
+            await self.close()
+            return
+
+        self.topics[self.topic.name] = self.topic
+        # Join before sending the initial state so nothing in between is missed
+        await self.channel_layer.group_add(self.topic.group_name, self.channel_name)
+        await self.accept()
+        await self.topic.start()
+
+    def find_topic(self, message: Dict[str, Any]) -> Optional[Topic]:
+        return self.topics.get(self.topic.name)
+
+    async def subscribe(self, name: str, params: Dict[str, Any]) -> bool:
+        # The topic is fixed by the URL
+        return False
+
+    async def route(self, name: str, handler: str, event: Dict[str, Any]) -> None:
+        # Only the topic's group is joined, so every group message is for it
+        if self.topics:
+            await getattr(self.topic, handler)(event)
+
+    async def send_topic(self, topic: Topic, payload: Dict[str, Any]) -> None:
+        await self.send(text_data=json.dumps(payload))
+
+
+class ProjectConsumer(SingleTopicConsumer):
+    """Board snapshot and patches of one project (see ProjectTopic)."""
+    topic_class = ProjectTopic
+    url_kwarg = 'project_id'
+
+
+class AttemptConsumer(SingleTopicConsumer):
+    """Events of one attempt, resumable with ?after_seq= (see AttemptTopic)."""
+    topic_class = AttemptTopic
+    url_kwarg = 'attempt_id'
@@ -2,5 +2,7 @@ from django.urls import re_path
 from . import consumers
 
 websocket_urlpatterns = [
+    re_path(r'ws/stream/$', consumers.StreamConsumer.as_asgi()),
     re_path(r'ws/projects/(?P<project_id>[^/]+)/$', consumers.ProjectConsumer.as_asgi()),
+    re_path(r'ws/attempts/(?P<attempt_id>[^/]+)/$', consumers.AttemptConsumer.as_asgi()),
 ]
@@ -0,0 +1,312 @@
+"""
+Topics - What a client follows over a WebSocket.
+
+A topic is one project board ('project:<id>') or one attempt's events
+('attempt:<id>'): its permission check, its channel-layer group, the
+state sent when it is subscribed and the handling of group messages.
+Topics don't own the socket; they send through their consumer, so one
+socket can carry one topic (ProjectConsumer, AttemptConsumer) or many
+(StreamConsumer).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+
+class Topic:
+    """Base class; subclasses set kind and implement authorize()."""
+    kind = ''
+
+    def __init__(self, key: str, user, send: Callable[['Topic', Dict[str, Any]], Awaitable[None]],
+                 params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            key: Id of the project or attempt
+            user: User the socket is authenticated as
+            send: Coroutine function sending a payload for this topic
+            params: Subscribe options (e.g. after_seq)
+        """
+        self.key = str(key)
+        self.user = user
+        self.params = params or {}
+        self._send = send
+
+    @property
+    def name(self) -> str:
+        return f'{self.kind}:{self.key}'
+
+    @property
+    def group_name(self) -> str:
+        return f'{self.kind}_{self.key}'
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        await self._send(self, payload)
+
+    async def authorize(self) -> bool:
+        """Check that the user may follow this topic."""
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Send the initial state; called once subscribed to the group."""
+
+    async def stop(self) -> None:
+        """Release resources; called on unsubscribe or disconnect."""
+
+    async def receive(self, message: Dict[str, Any], channel_layer) -> None:
+        """Handle a message from the client addressed to this topic."""
+
+
+class ProjectTopic(Topic):
+    """
+    Keeps a project board in sync.
+
+    On subscribe the client gets a 'board_snapshot' tagged with the
+    project's revision, then 'board_patch' messages (see
+    apps.tasks.board_sync). Patches go through a bounded queue;
+    consecutive queued patches are merged into one message. A client that
+    falls behind (full queue) or misses a revision gets a fresh snapshot
+    instead. Clients can also send {"type": "resync"}.
+    """
+    kind = 'project'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revision = -1
+        self.needs_snapshot = True
+        self.outbox = asyncio.Queue(maxsize=getattr(settings, 'BOARD_CLIENT_QUEUE_SIZE', 64))
+        self.sender: Optional[asyncio.Task] = None
+
+    async def authorize(self) -> bool:
+        return await self.is_project_owner()
+
+    async def start(self) -> None:
+        self.sender = asyncio.create_task(self.send_board())
+        self.wake_sender()
+
+    async def stop(self) -> None:
+        if self.sender:
+            self.sender.cancel()
+            self.sender = None
+
+    async def receive(self, message: Dict[str, Any], channel_layer) -> None:
+        message_type = message.get('type')
+
+        if message_type == 'resync':
+            self.resync()
+        elif message_type == 'chat_message':
+            # Echo message to group
+            await channel_layer.group_send(
+                self.group_name,
+                {
+                    'type': 'chat_message',
+                    'project_id': self.key,
+                    'message': message.get('message'),
+                    'user': self.user.username
+                }
+            )
+
+    async def chat_message(self, event):
+        await self.send({
+            'type': 'chat_message',
+            'message': event['message'],
+            'user': event.get('user', 'Unknown'),
+        })
+
+    async def board_patch(self, event):
+        """
+        Handler for board patches published by the board publisher
+        """
+        if self.needs_snapshot:
+            # The coming snapshot covers it
+            return
+        try:
+            self.outbox.put_nowait(event['patch'])
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and catch up with one snapshot
+            self.resync()
+
+    async def operation_update(self, event):
+        """
+        Handler for background operation progress (e.g. PM decomposition, merges)
+        """
+        await self.send({
+            'type': 'operation_update',
+            'operation': event['operation']
+        })
+
+    def resync(self):
+        self.needs_snapshot = True
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        self.wake_sender()
+
+    def wake_sender(self):
+        if self.outbox.empty():
+            self.outbox.put_nowait(None)
+
+    async def send_board(self):
+        """Send snapshots and (merged) patches, one message at a time."""
+        from apps.tasks.board_sync import merge_patches
+
+        while True:
+            patches = [await self.outbox.get()]
+            while not self.outbox.empty():
+                patches.append(self.outbox.get_nowait())
+
+            if not self.needs_snapshot:
+                patches = [p for p in patches if p is not None and p['revision'] > self.revision]
+                if patches and any(
+                    patch['base_revision'] > previous
+                    for patch, previous in zip(patches, [self.revision] + [p['revision'] for p in patches])
+                ):
+                    # A revision is missing (dropped by the channel layer or still in flight)
+                    self.needs_snapshot = True
+
+            if self.needs_snapshot:
+                self.needs_snapshot = False
+                snapshot = await self.get_board_snapshot()
+                self.revision = snapshot['revision']
+                await self.send({'type': 'board_snapshot', **snapshot})
+            elif patches:
+                patch = merge_patches(patches)
+                self.revision = patch['revision']
+                await self.send({'type': 'board_patch', **patch})
+
+    @database_sync_to_async
+    def is_project_owner(self):
+        from django.core.exceptions import ValidationError
+        from apps.projects.models import Project
+
+        try:
+            return Project.objects.filter(id=self.key, owner=self.user).exists()
+        except (ValueError, ValidationError):
+            # Not a UUID
+            return False
+
+    @database_sync_to_async
+    def get_board_snapshot(self):
+        from apps.tasks.board_sync import board_snapshot
+
+        return board_snapshot(self.key)
+
+
+class AttemptTopic(Topic):
+    """
+    Streams the events of one attempt.
+
+    On subscribe, events with seq > after_seq are replayed from the
+    database, then live batches from the attempt_{id} group follow. The
+    client resumes after a reconnect by passing the last seq it has seen;
+    events it already has are never sent twice and gaps are filled from
+    the database.
+    """
+    kind = 'attempt'
+    REPLAY_PAGE_SIZE = 500
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        try:
+            self.last_seq = int(self.params.get('after_seq', -1))
+        except (TypeError, ValueError):
+            self.last_seq = -1
+
+    async def authorize(self) -> bool:
+        return await self.get_attempt_status() is not None
+
+    async def start(self) -> None:
+        # Called after joining the group, so nothing committed in between
+        # is missed; overlap with the replay is dropped by seq
+        await self.replay()
+        await self.send_status()
+
+    async def attempt_events(self, event):
+        """
+        Handler for event batches published by the event sink
+        """
+        events = [e for e in event['events'] if e['seq'] > self.last_seq]
+        if not events:
+            return
+
+        if events[0]['seq'] > self.last_seq + 1:
+            # A batch from another writer hasn't arrived (yet); read the gap
+            await self.replay(up_to=events[0]['seq'] - 1)
+            events = [e for e in events if e['seq'] > self.last_seq]
+
+        await self.send_events(events)
+        if any(e['event_type'] != 'LOG' for e in events):
+            await self.send_status()
+
+    async def replay(self, up_to=None):
+        """Send stored events after last_seq (up to and including up_to)."""
+        while True:
+            events = await self.get_events(self.last_seq, up_to)
+            if not events:
+                return
+            await self.send_events(events, replay=True)
+            if len(events) < self.REPLAY_PAGE_SIZE:
+                return
+
+    async def send_events(self, events, replay=False):
+        self.last_seq = max(self.last_seq, events[-1]['seq'])
+        await self.send({
+            'type': 'attempt_events',
+            'attempt_id': self.key,
+            'events': events,
+            'replay': replay,
+        })
+
+    async def send_status(self):
+        await self.send({
+            'type': 'attempt_status',
+            'attempt_id': self.key,
+            'status': await self.get_attempt_status(),
+            'last_seq': self.last_seq,
+        })
+
+    @database_sync_to_async
+    def get_attempt_status(self):
+        from django.core.exceptions import ValidationError
+        from apps.attempts.models import Attempt
+
+        try:
+            return Attempt.objects.filter(
+                id=self.key,
+                task__project__owner=self.user
+            ).values_list('status', flat=True).first()
+        except (ValueError, ValidationError):
+            # Not a UUID
+            return None
+
+    @database_sync_to_async
+    def get_events(self, after_seq, up_to=None):
+        from apps.attempts.services import AttemptEventLog
+
+        # The log includes archived events, so old attempts replay in full
+        events = []
+        for event in AttemptEventLog(self.key, after_seq=after_seq):
+            if up_to is not None and event['seq'] > up_to:
+                break
+            # Events stored before sequencing all have seq 0 and can't be
+            # paged by seq; they always go out together
+            if len(events) >= self.REPLAY_PAGE_SIZE and event['seq'] > 0:
+                break
+            events.append(event)
+        return events
+
+
+TOPIC_KINDS = {topic.kind: topic for topic in (ProjectTopic, AttemptTopic)}
+
+
+def make_topic(name: str, user, send, params: Optional[Dict[str, Any]] = None) -> Optional[Topic]:
+    """
+    Build the topic for a name like 'project:<id>' or 'attempt:<id>'.
+
+    Returns:
+        The topic, or None if the name isn't valid
+    """
+    kind, _, key = (name or '').partition(':')
+    topic_class = TOPIC_KINDS.get(kind)
+    if topic_class is None or not key:
+        return None
+    return topic_class(key, user, send, params)
@@ -95,6 +95,18 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache (read models of hot endpoints); locmem unless CACHE_REDIS_URL is set,
+# e.g. redis://localhost:6379/1 (locmem is per process: counters and entries aren't shared)
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
@@ -102,6 +114,59 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'poll-lda-jobs': {
+        'task': 'apps.attempts.tasks.poll_lda_jobs',
+        'schedule': 60.0,  # Fallback for lost LDA job callbacks
+    },
+    'refresh-lda-nodes': {
+        'task': 'apps.attempts.tasks.refresh_lda_nodes',
+        'schedule': 30.0,
+    },
+    'archive-attempt-events': {
+        'task': 'apps.attempts.tasks.archive_attempt_events',
+        'schedule': 24 * 60 * 60.0,
+    },
+    'collect-blob-garbage': {
+        'task': 'apps.attempts.tasks.collect_blob_garbage',
+        'schedule': 24 * 60 * 60.0,
+    },
+}
+
+# Execution concurrency (slot leasing)
+MAX_CONCURRENT_AGENTS = int(os.getenv('MAX_CONCURRENT_AGENTS', 4))  # Per project, overridable in project.config
+MAX_CONCURRENT_AGENTS_GLOBAL = int(os.getenv('MAX_CONCURRENT_AGENTS_GLOBAL', 16))
+MAX_CONCURRENT_AGENTS_PER_ROLE = {}  # e.g. {'FRONTEND': 2, 'QA': 1}
+EXECUTION_LEASE_TTL = int(os.getenv('EXECUTION_LEASE_TTL', 900))  # Seconds without heartbeat before a slot is reclaimed
+DEFAULT_SCHEDULING_POLICY = os.getenv('DEFAULT_SCHEDULING_POLICY', 'priority')  # 'priority' or 'critical_path'
+
+# Attempt event batching
+ATTEMPT_EVENT_BATCH_SIZE = int(os.getenv('ATTEMPT_EVENT_BATCH_SIZE', 100))  # Buffered events per attempt before a flush
+ATTEMPT_EVENT_FLUSH_INTERVAL = float(os.getenv('ATTEMPT_EVENT_FLUSH_INTERVAL', 0.25))  # Max seconds an event is buffered
+ATTEMPT_EVENT_RETENTION_DAYS = int(os.getenv('ATTEMPT_EVENT_RETENTION_DAYS', 30))  # Older months are archived to the blob store
+ATTEMPT_EVENT_ARCHIVE_RETENTION_DAYS = int(os.getenv('ATTEMPT_EVENT_ARCHIVE_RETENTION_DAYS', 0))  # 0 keeps archives forever
+
+# Board sync over the project WebSocket
+BOARD_PATCH_WINDOW = float(os.getenv('BOARD_PATCH_WINDOW', 0.1))  # Seconds task changes are coalesced into one patch
+BOARD_CLIENT_QUEUE_SIZE = int(os.getenv('BOARD_CLIENT_QUEUE_SIZE', 64))  # Patches queued per client before it is resynced
+WS_MAX_SUBSCRIPTIONS = int(os.getenv('WS_MAX_SUBSCRIPTIONS', 100))  # Topics one /ws/stream/ connection can follow
+
+# Read cache (see apps/projects/read_cache.py)
+READ_CACHE_TTL = int(os.getenv('READ_CACHE_TTL', 300))  # Seconds a version-keyed entry is kept
+READ_CACHE_LIVE_TTL = int(os.getenv('READ_CACHE_LIVE_TTL', 5))  # For reads that also change with time (execution status)
+READ_CACHE_LOCK_TIMEOUT = int(os.getenv('READ_CACHE_LOCK_TIMEOUT', 10))  # Seconds callers wait for another's build
+READ_CACHE_METRICS_FLUSH_INTERVAL = float(os.getenv('READ_CACHE_METRICS_FLUSH_INTERVAL', 10))
+
+# Blob store (diffs, agent output, gate logs)
+BLOB_STORE_BACKEND = os.getenv('BLOB_STORE_BACKEND', 'filesystem')  # 'filesystem' or 'database'
+BLOB_STORE_ROOT = os.getenv('BLOB_STORE_ROOT', str(BASE_DIR / 'blobs'))
+BLOB_ZSTD_LEVEL = int(os.getenv('BLOB_ZSTD_LEVEL', 9))
+BLOB_GC_MIN_AGE = int(os.getenv('BLOB_GC_MIN_AGE', 3600))  # Seconds an unreferenced blob is kept
+
+# Duration estimation
+DURATION_SAMPLE_SIZE = 2000  # Recent completed attempts used to learn durations
+DURATION_MODEL_TTL = int(os.getenv('DURATION_MODEL_TTL', 600))  # Seconds a fitted model is shared before refitting
+DEFAULT_TASK_DURATION_SECONDS = 600  # Prediction when there is no history
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -163,6 +228,21 @@ CORS_ALLOW_CREDENTIALS = True
 # LDA Configuration
 LDA_URL = os.getenv('LDA_URL', 'http://localhost:8001')
 LDA_SECRET_KEY = os.getenv('LDA_SECRET_KEY', 'your-secret-key-here')  # Generate with: secrets.token_urlsafe(32)
+BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:8000')  # Base URL the LDA uses for job callbacks
+LDA_NODE_MAX_FAILURES = int(os.getenv('LDA_NODE_MAX_FAILURES', 3))  # Consecutive failures before a node is marked DOWN
+LDA_NODE_DEGRADED_LOAD = float(os.getenv('LDA_NODE_DEGRADED_LOAD', 0.9))  # Load score at which a node is DEGRADED
+
+# LDA HTTP client
+LDA_MAX_CONNECTIONS = int(os.getenv('LDA_MAX_CONNECTIONS', 20))  # Per LDA node, per process
+LDA_MAX_KEEPALIVE = int(os.getenv('LDA_MAX_KEEPALIVE', 10))
+LDA_HTTP2 = os.getenv('LDA_HTTP2', 'True') == 'True'  # Used when the node negotiates it (TLS)
+LDA_RETRIES = int(os.getenv('LDA_RETRIES', 2))  # Retries for idempotent calls only
+LDA_RETRY_BACKOFF = float(os.getenv('LDA_RETRY_BACKOFF', 0.5))  # Seconds, doubled per retry, full jitter
+LDA_BREAKER_THRESHOLD = int(os.getenv('LDA_BREAKER_THRESHOLD', 5))  # Consecutive failures before failing fast
+LDA_BREAKER_RESET = float(os.getenv('LDA_BREAKER_RESET', 30.0))  # Seconds before a trial call is let through
+LDA_METRICS_REDIS_URL = os.getenv('LDA_METRICS_REDIS_URL', CELERY_BROKER_URL)
+LDA_METRICS_FLUSH_INTERVAL = float(os.getenv('LDA_METRICS_FLUSH_INTERVAL', 10))
+AUDIT_INGEST_MAX_RECORDS = int(os.getenv('AUDIT_INGEST_MAX_RECORDS', 5000))  # Per NDJSON batch from an LDA
 
 # Security Settings (Production)
 if not DEBUG:
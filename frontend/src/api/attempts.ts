@@ -1,7 +1,9 @@
 import { apiClient } from './client';
+import { OperationAccepted } from './operations';
 
 export interface AttemptEvent {
     id: string;
+    seq: number;
     event_type: 'LOG' | 'STATUS' | 'PROGRESS' | 'ERROR';
     message: string;
     metadata: Record<string, any>;
@@ -27,32 +29,65 @@ export interface Attempt {
     status: 'PENDING' | 'QUEUED' | 'RUNNING' | 'SUCCESS' | 'FAILED' | 'CANCELLED' | 'APPROVED' | 'REJECTED';
     git_branch: string;
     worktree_path: string;
-    result: string | null;
-    diff: string;
+    // Heavy fields: left out of lists; diff and events come from their own
+    // paginated endpoints unless requested with `expand`
+    result?: string | null;
+    diff?: string;
     error_message: string | null;
     files_changed: string[];
     duration: number | null;
-    events: AttemptEvent[];
-    gate_results: AttemptGateResult[];
+    events?: AttemptEvent[];
+    gate_results?: AttemptGateResult[];
     started_at: string | null;
     completed_at: string | null;
     created_at: string;
     updated_at: string;
 }
 
+export interface AttemptDiffFile {
+    path: string;
+    old_path: string;
+    additions: number;
+    deletions: number;
+    diff?: string; // Left out with content=false
+}
+
+export interface AttemptDiffHunk {
+    header: string;
+    old_start: number;
+    old_lines: number;
+    new_start: number;
+    new_lines: number;
+    diff: string;
+}
+
+export interface Paginated<T> {
+    count: number;
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
 export interface AttemptListParams {
     task?: string;
     project?: string;
     status?: string;
     role?: string;
+    fields?: string;
+    expand?: string;
+}
+
+export interface AttemptPageParams {
+    page?: number;
+    page_size?: number;
 }
 
 export const attemptsApi = {
     list: (params?: AttemptListParams) =>
         apiClient.get<Attempt[]>('/attempts/', { params }),
 
-    get: (id: string) =>
-        apiClient.get<Attempt>(`/attempts/${id}/`),
+    get: (id: string, params?: { fields?: string; expand?: string }) =>
+        apiClient.get<Attempt>(`/attempts/${id}/`, { params }),
 
     start: (taskId: string) =>
         apiClient.post<{ attempt_id: string; celery_task_id: string; status: string }>(
@@ -60,8 +95,9 @@ export const attemptsApi = {
             { task_id: taskId }
         ),
 
+    // Merge runs in the background; poll the returned operation
     approve: (id: string) =>
-        apiClient.post<{ status: string; message?: string; error?: string }>(
+        apiClient.post<OperationAccepted>(
             `/attempts/${id}/approve/`
         ),
 
@@ -74,8 +110,17 @@ export const attemptsApi = {
     cancel: (id: string) =>
         apiClient.post<{ status: string }>(`/attempts/${id}/cancel/`),
 
-    events: (id: string) =>
-        apiClient.get<AttemptEvent[]>(`/attempts/${id}/events/`),
+    events: (id: string, params?: AttemptPageParams & { after_seq?: number }) =>
+        apiClient.get<Paginated<AttemptEvent>>(`/attempts/${id}/events/`, { params }),
+
+    diff: (id: string, params?: AttemptPageParams & { content?: boolean }) =>
+        apiClient.get<Paginated<AttemptDiffFile>>(`/attempts/${id}/diff/`, { params }),
+
+    diffHunks: (id: string, path: string, params?: AttemptPageParams) =>
+        apiClient.get<Paginated<AttemptDiffHunk> & { path: string; header: string }>(
+            `/attempts/${id}/diff/hunks/`,
+            { params: { ...params, path } }
+        ),
 
     gateResults: (id: string) =>
         apiClient.get<AttemptGateResult[]>(`/attempts/${id}/gate-results/`),
@@ -0,0 +1,55 @@
+import { apiClient } from './client';
+
+export type OperationStatus = 'PENDING' | 'RUNNING' | 'SUCCEEDED' | 'FAILED';
+
+export interface Operation<T = Record<string, any>> {
+    id: string;
+    project: string;
+    kind: 'PM_DECOMPOSE' | 'APPROVE_ATTEMPT';
+    status: OperationStatus;
+    params: Record<string, any>;
+    result: T | null;
+    error: string;
+    http_status: number | null;
+    created_at: string;
+    updated_at: string;
+    completed_at: string | null;
+}
+
+export interface OperationAccepted {
+    operation_id: string;
+    kind: Operation['kind'];
+    status: OperationStatus;
+    status_url: string;
+}
+
+export const operationsApi = {
+    get: <T = Record<string, any>>(id: string) =>
+        apiClient.get<Operation<T>>(`/operations/${id}/`),
+};
+
+/**
+ * Poll a background operation until it finishes.
+ * Resolves with the operation's result, rejects with its error.
+ */
+export async function waitForOperation<T = Record<string, any>>(
+    operationId: string,
+    { interval = 1000, maxInterval = 5000, timeout = 10 * 60 * 1000 } = {}
+): Promise<T> {
+    const deadline = Date.now() + timeout;
+    let delay = interval;
+
+    while (Date.now() < deadline) {
+        const { data } = await operationsApi.get<T>(operationId);
+        if (data.status === 'SUCCEEDED') {
+            return data.result as T;
+        }
+        if (data.status === 'FAILED') {
+            throw new Error(data.error || 'Operation failed');
+        }
+        await new Promise((resolve) => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, maxInterval);
+    }
+
+    throw new Error('Timed out waiting for operation to finish');
+}
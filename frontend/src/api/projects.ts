@@ -1,4 +1,6 @@
 import { apiClient } from './client';
+import { OperationAccepted } from './operations';
+import { Task, TaskStatus } from './tasks';
 
 export interface Project {
     id: string;
@@ -43,6 +45,29 @@ export interface PMDecomposition {
     updated_at: string;
 }
 
+export interface BoardColumn {
+    count: number;
+    // First page, in /tasks/ order; later pages via tasksApi with status and page
+    tasks: Task[];
+    has_more: boolean;
+}
+
+export interface ProjectBoard {
+    project_id: string;
+    version: number;
+    revision: number;
+    page_size: number;
+    columns: Record<TaskStatus | 'FAILED', BoardColumn>;
+    blocked: string[];
+    ready: Array<{ id: string; title: string; agent_role: string; priority: number }>;
+    scheduling_policy: string;
+    progress: {
+        total: number;
+        by_status: Record<TaskStatus | 'FAILED', number>;
+        percent: number;
+    };
+}
+
 export const projectsApi = {
     list: () => apiClient.get<Project[]>('/projects/'),
     get: (id: string) => apiClient.get<Project>(`/projects/${id}/`),
@@ -51,10 +76,11 @@ export const projectsApi = {
         apiClient.patch<Project>(`/projects/${id}/`, data),
     delete: (id: string) => apiClient.delete(`/projects/${id}/`),
     stats: (id: string) => apiClient.get(`/projects/${id}/stats/`),
+    board: (id: string) => apiClient.get<ProjectBoard>(`/projects/${id}/board/`),
 
-    // PM Decomposition
+    // PM Decomposition (runs in the background; poll the returned operation)
     initializeWithPM: (id: string, requirements: string, model?: string) =>
-        apiClient.post<PMDecomposition>(
+        apiClient.post<OperationAccepted>(
             `/projects/${id}/initialize-with-pm/`,
             { requirements, model: model || 'gemini-2.5-flash' }
         ),
@@ -0,0 +1,132 @@
+export interface StreamMessage {
+    type: string;
+    topic?: string;
+    [key: string]: any;
+}
+
+/**
+ * Build an authenticated backend WebSocket URL, or null without a token.
+ */
+export const getWebSocketUrl = (path: string, params: Record<string, string> = {}): string | null => {
+    // Get JWT token from localStorage
+    const token = localStorage.getItem('access_token');
+    if (!token) {
+        console.warn('No access token found, cannot connect to WebSocket');
+        return null;
+    }
+
+    // WebSocket URL with token in query string
+    const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const wsHost = window.location.hostname;
+    const wsPort = '8000'; // Backend port
+    const query = new URLSearchParams({ ...params, token });
+    return `${wsProtocol}//${wsHost}:${wsPort}${path}?${query.toString()}`;
+};
+
+type TopicHandler = (message: StreamMessage) => void;
+
+interface Subscription {
+    handlers: Set<TopicHandler>;
+    // Read on every (re)subscribe, e.g. to resume after the last event seen
+    params: () => Record<string, unknown>;
+}
+
+/**
+ * One multiplexed WebSocket (/ws/stream/) shared by every live view.
+ *
+ * Topics ('project:<id>', 'attempt:<id>') are subscribed with control
+ * messages instead of opening a socket each, so the page authenticates
+ * once however many boards and runs it follows. After a reconnect all
+ * topics are subscribed again. Handlers get the topic's messages plus a
+ * synthetic {type: 'stream_closed'} when the connection drops.
+ */
+class StreamConnection {
+    private ws: WebSocket | null = null;
+    private topics = new Map<string, Subscription>();
+    private reconnectTimeout: ReturnType<typeof setTimeout> | undefined;
+    private closeTimeout: ReturnType<typeof setTimeout> | undefined;
+    private reconnectAttempts = 0;
+
+    subscribe(topic: string, handler: TopicHandler, params: () => Record<string, unknown> = () => ({})) {
+        clearTimeout(this.closeTimeout);
+        let subscription = this.topics.get(topic);
+        if (!subscription) {
+            subscription = { handlers: new Set(), params };
+            this.topics.set(topic, subscription);
+            this.sendSubscribe(topic, subscription);
+        }
+        subscription.handlers.add(handler);
+        this.connect();
+
+        return () => {
+            const current = this.topics.get(topic);
+            if (!current) return;
+            current.handlers.delete(handler);
+            if (current.handlers.size === 0) {
+                this.topics.delete(topic);
+                this.send({ type: 'unsubscribe', topic });
+            }
+            if (this.topics.size === 0) {
+                // Keep the socket briefly in case a view re-subscribes (e.g. on navigation)
+                this.closeTimeout = setTimeout(() => this.close(), 5000);
+            }
+        };
+    }
+
+    send(message: StreamMessage) {
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.ws.send(JSON.stringify(message));
+        }
+    }
+
+    private sendSubscribe(topic: string, subscription: Subscription) {
+        this.send({ ...subscription.params(), type: 'subscribe', topic });
+    }
+
+    private connect() {
+        if (this.ws) return;
+
+        const url = getWebSocketUrl('/ws/stream/');
+        if (!url) return;
+
+        const ws = new WebSocket(url);
+        this.ws = ws;
+
+        ws.onopen = () => {
+            this.reconnectAttempts = 0;
+            this.topics.forEach((subscription, topic) => this.sendSubscribe(topic, subscription));
+        };
+
+        ws.onmessage = (event) => {
+            try {
+                const message: StreamMessage = JSON.parse(event.data);
+                this.topics.get(message.topic ?? '')?.handlers.forEach(handler => handler(message));
+            } catch (error) {
+                console.error('Failed to parse stream message:', error);
+            }
+        };
+
+        ws.onclose = () => {
+            if (this.ws !== ws) return;
+            this.ws = null;
+            this.topics.forEach(subscription =>
+                subscription.handlers.forEach(handler => handler({ type: 'stream_closed' }))
+            );
+            if (this.topics.size === 0) return;
+
+            // Reconnect with exponential backoff
+            const delay = Math.min(Math.pow(2, this.reconnectAttempts) * 1000, 30000);
+            this.reconnectAttempts++;
+            this.reconnectTimeout = setTimeout(() => this.connect(), delay);
+        };
+    }
+
+    private close() {
+        clearTimeout(this.reconnectTimeout);
+        const ws = this.ws;
+        this.ws = null;
+        ws?.close();
+    }
+}
+
+export const stream = new StreamConnection();
@@ -29,12 +29,20 @@ export interface TaskCreate {
     dependencies?: string[];
 }
 
+export interface TaskChange {
+    id: string;
+    status?: TaskStatus;
+    priority?: number;
+    dependencies?: string[];
+}
+
 export const tasksApi = {
-    list: (projectId?: string, role?: AgentRole, status?: TaskStatus) => {
+    list: (projectId?: string, role?: AgentRole, status?: TaskStatus, page?: number) => {
         const params = new URLSearchParams();
         if (projectId) params.append('project', projectId);
         if (role) params.append('role', role);
         if (status) params.append('status', status);
+        if (page) params.append('page', String(page));
         return apiClient.get<Task[]>(`/tasks/?${params}`);
     },
 
@@ -50,6 +58,10 @@ export const tasksApi = {
     move: (id: string, status: TaskStatus, priority?: number) =>
         apiClient.post<Task>(`/tasks/${id}/move/`, { status, priority }),
 
+    // Apply many changes to tasks of one project in one transaction
+    bulkUpdate: (changes: TaskChange[]) =>
+        apiClient.post<{ updated: number; tasks: Task[] }>('/tasks/bulk/', { changes }),
+
     checkDependencies: (id: string) =>
         apiClient.get(`/tasks/${id}/check_dependencies/`),
 
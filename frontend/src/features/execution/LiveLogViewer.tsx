@@ -170,6 +170,15 @@ export const LiveLogViewer = ({
             ws.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
+                    if (data.type === 'attempt_status') return;
+                    if (data.type === 'attempt_events') {
+                        // Batched events from the attempt stream
+                        (data.events as LogEvent[]).forEach((log) => {
+                            xtermRef.current?.write(formatLog(log));
+                            onLogReceived?.(log);
+                        });
+                        return;
+                    }
                     const log: LogEvent = {
                         event_type: data.event_type || 'LOG',
                         message: data.message || event.data,
@@ -1,6 +1,5 @@
 import { useState, useEffect } from 'react';
-import { useQueryClient } from '@tanstack/react-query';
-import { useWebSocket } from '@/hooks/useWebSocket';
+import { useBoardSync } from '@/hooks/useBoardSync';
 import {
     DndContext,
     DragOverlay,
@@ -16,7 +15,8 @@ import {
 import { sortableKeyboardCoordinates } from '@dnd-kit/sortable';
 import { SortableContext, verticalListSortingStrategy } from '@dnd-kit/sortable';
 import { Task, TaskStatus } from '@/api/tasks';
-import { useTasks, useMoveTask } from '@/hooks/useTasks';
+import { useMoveTask } from '@/hooks/useTasks';
+import { useProjectBoard, useLoadMoreBoardColumn } from '@/hooks/useProjects';
 import { TaskCard } from './TaskCard';
 import { CheckCircle2, Circle, Clock, Sparkles } from 'lucide-react';
 
@@ -33,9 +33,10 @@ const COLUMNS: { id: TaskStatus; title: string; icon: any; color: string }[] = [
 ];
 
 export const KanbanBoard = ({ projectId, onTaskClick }: KanbanBoardProps) => {
-    const { data: tasks, isLoading } = useTasks(projectId);
+    // Each column's first page and count; later pages come from the task list
+    const { data: board, isLoading } = useProjectBoard(projectId);
+    const loadMore = useLoadMoreBoardColumn(projectId);
     const moveTask = useMoveTask();
-    const queryClient = useQueryClient();
     const [activeId, setActiveId] = useState<string | null>(null);
 
     // Local state for optimistic updates
@@ -47,37 +48,19 @@ export const KanbanBoard = ({ projectId, onTaskClick }: KanbanBoardProps) => {
     });
 
     useEffect(() => {
-        if (tasks) {
-            const newItems: Record<TaskStatus, Task[]> = {
-                TODO: [],
-                IN_PROGRESS: [],
-                IN_REVIEW: [],
-                DONE: [],
-            };
-
-            tasks.forEach(task => {
-                if (newItems[task.status]) {
-                    newItems[task.status].push(task);
-                }
-            });
-
-            // Sort by priority within columns
-            Object.keys(newItems).forEach(key => {
-                newItems[key as TaskStatus].sort((a, b) => b.priority - a.priority);
+        if (board) {
+            // Columns are already in /tasks/ order, which paging relies on
+            setItems({
+                TODO: board.columns.TODO.tasks,
+                IN_PROGRESS: board.columns.IN_PROGRESS.tasks,
+                IN_REVIEW: board.columns.IN_REVIEW.tasks,
+                DONE: board.columns.DONE.tasks,
             });
-
-            setItems(newItems);
         }
-    }, [tasks]);
+    }, [board]);
 
-    // WebSocket integration for real-time updates
-    useWebSocket(projectId, {
-        onMessage: (message) => {
-            if (message.type === 'task_update') {
-                queryClient.invalidateQueries({ queryKey: ['tasks', projectId] });
-            }
-        },
-    });
+    // Real-time board updates: a snapshot on connect, then patches
+    useBoardSync(projectId);
 
     const sensors = useSensors(
         useSensor(PointerSensor, {
@@ -200,7 +183,7 @@ export const KanbanBoard = ({ projectId, onTaskClick }: KanbanBoardProps) => {
                                     </h3>
                                 </div>
                                 <span className="badge-secondary font-bold">
-                                    {items[column.id].length}
+                                    {board?.columns[column.id].count ?? items[column.id].length}
                                 </span>
                             </div>
 
@@ -224,6 +207,16 @@ export const KanbanBoard = ({ projectId, onTaskClick }: KanbanBoardProps) => {
                                             />
                                         ))
                                     )}
+                                    {board?.columns[column.id].has_more && (
+                                        <button
+                                            type="button"
+                                            className="btn-ghost w-full text-sm"
+                                            disabled={loadMore.isPending}
+                                            onClick={() => loadMore.mutate(column.id)}
+                                        >
+                                            Load more
+                                        </button>
+                                    )}
                                 </div>
                             </SortableContext>
                         </div>
@@ -234,7 +227,7 @@ export const KanbanBoard = ({ projectId, onTaskClick }: KanbanBoardProps) => {
             <DragOverlay>
                 {activeId ? (
                     <div className="opacity-80 rotate-3 scale-105">
-                        <TaskCard task={tasks?.find((t) => t.id === activeId) as Task} />
+                        <TaskCard task={Object.values(items).flat().find((t) => t.id === activeId) as Task} />
                     </div>
                 ) : null}
             </DragOverlay>
@@ -1,14 +1,17 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import { Dialog, DialogPanel, DialogTitle, Transition, TransitionChild } from '@headlessui/react';
 import { Fragment } from 'react';
 import { X, Play, Clock, AlertCircle, CheckCircle2, Terminal } from 'lucide-react';
 import { useTask } from '@/hooks/useTasks';
-import { useTaskAttempts, useStartAttempt, useApproveAttempt, useRejectAttempt } from '@/hooks/useAttempts';
+import {
+    useTaskAttempts, useAttempt, useAttemptEvents, useAttemptDiff,
+    useStartAttempt, useApproveAttempt, useRejectAttempt
+} from '@/hooks/useAttempts';
 import { LiveLogViewer } from '@/features/execution/LiveLogViewer';
 import { DiffViewer } from '@/features/execution/DiffViewer';
 import { QualityGatesPanel } from '@/features/execution/QualityGatesPanel';
 import { ApprovalPanel } from '@/features/execution/ApprovalPanel';
-import { useWebSocket } from '@/hooks/useWebSocket';
+import { useAttemptStream } from '@/hooks/useAttemptStream';
 
 interface TaskDetailModalProps {
     isOpen: boolean;
@@ -17,7 +20,7 @@ interface TaskDetailModalProps {
     projectId: string;
 }
 
-export const TaskDetailModal = ({ isOpen, onClose, taskId, projectId }: TaskDetailModalProps) => {
+export const TaskDetailModal = ({ isOpen, onClose, taskId }: TaskDetailModalProps) => {
     const { data: task, isLoading: taskLoading } = useTask(taskId ? taskId : undefined);
     const { data: attempts, isLoading: attemptsLoading } = useTaskAttempts(taskId ? taskId : undefined);
 
@@ -30,30 +33,22 @@ export const TaskDetailModal = ({ isOpen, onClose, taskId, projectId }: TaskDeta
     // Get latest attempt
     const latestAttempt = attempts?.length ? attempts[0] : null;
 
-    // WebSocket for live logs
-    const [liveLogs, setLiveLogs] = useState<any[]>([]);
+    // Live logs stream over the attempt's WebSocket while it runs
+    // (stored events are replayed on connect)
+    const isLive = latestAttempt?.status === 'RUNNING' || latestAttempt?.status === 'QUEUED';
+    const { events: streamedEvents } = useAttemptStream(latestAttempt?.id, { enabled: isLive });
 
-    useWebSocket(projectId, {
-        onMessage: (message) => {
-            if (message.type === 'attempt_event' && latestAttempt?.id && message.payload?.attempt_id === latestAttempt.id) {
-                // Check if internal payload structure matches expectation
-                // Sometimes message structure can vary. 
-                // Assuming message is { type: 'attempt_event', event_type: '...', message: '...', ... } directly based on tasks.py
-                // Actually tasks.py sends: 
-                // { 'type': 'attempt_event', 'event_type': ..., 'message': ..., 'metadata': ..., 'timestamp': ... }
-                // So message itself is the log event
-                setLiveLogs(prev => [...prev, message]);
-            }
-        }
+    // Heavy attempt data is only loaded when the execution tab is open
+    const showExecution = activeTab === 'execution' && !!latestAttempt;
+    const { data: attemptDetail } = useAttempt(showExecution ? latestAttempt?.id : undefined);
+    const { data: storedEvents } = useAttemptEvents(latestAttempt?.id, {
+        enabled: showExecution && !isLive && !streamedEvents.length,
     });
-
-    useEffect(() => {
-        if (latestAttempt?.events) {
-            setLiveLogs(latestAttempt.events);
-        } else {
-            setLiveLogs([]);
-        }
-    }, [latestAttempt?.id, latestAttempt?.events]);
+    const { data: diff } = useAttemptDiff(latestAttempt?.id, {
+        enabled: showExecution && !isLive && !!latestAttempt?.files_changed?.length,
+    });
+    const gateResults = attemptDetail?.gate_results ?? [];
+    const liveLogs = streamedEvents.length ? streamedEvents : (storedEvents ?? []);
 
     const handleStartExecution = () => {
         if (taskId) {
@@ -234,13 +229,13 @@ export const TaskDetailModal = ({ isOpen, onClose, taskId, projectId }: TaskDeta
                                                                 key={latestAttempt.id}
                                                                 attemptId={latestAttempt.id}
                                                                 logs={liveLogs}
-                                                                isRunning={latestAttempt.status === 'RUNNING' || latestAttempt.status === 'QUEUED'}
+                                                                isRunning={isLive}
                                                             />
 
                                                             {/* Quality Gates */}
-                                                            {(latestAttempt.gate_results?.length > 0 || latestAttempt.status === 'RUNNING') && (
+                                                            {(gateResults.length > 0 || latestAttempt.status === 'RUNNING') && (
                                                                 <QualityGatesPanel
-                                                                    gateResults={(latestAttempt.gate_results || []).map(g => ({
+                                                                    gateResults={gateResults.map(g => ({
                                                                         ...g,
                                                                         duration_seconds: g.duration_seconds || undefined
                                                                     }))}
@@ -249,9 +244,9 @@ export const TaskDetailModal = ({ isOpen, onClose, taskId, projectId }: TaskDeta
                                                             )}
 
                                                             {/* Diff Viewer (only if files changed) */}
-                                                            {latestAttempt.diff && (
+                                                            {diff && (
                                                                 <DiffViewer
-                                                                    diff={latestAttempt.diff}
+                                                                    diff={diff}
                                                                 />
                                                             )}
 
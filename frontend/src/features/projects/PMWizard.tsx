@@ -46,9 +46,9 @@ export const PMWizard = ({ isOpen, onClose, projectId, projectName }: PMWizardPr
         initializePM.mutate(
             { projectId, requirements, model },
             {
-                onSuccess: (response) => {
-                    setDecomposition(response.data);
-                    setEditedTasks(response.data.generated_tasks);
+                onSuccess: (result) => {
+                    setDecomposition(result);
+                    setEditedTasks(result.generated_tasks);
                     setStep('review');
                 },
                 onError: () => {
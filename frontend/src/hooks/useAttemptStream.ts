@@ -0,0 +1,69 @@
+import { useEffect, useRef, useState } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { Attempt, AttemptEvent } from '@/api/attempts';
+import { stream, StreamMessage } from '@/api/stream';
+
+interface UseAttemptStreamOptions {
+    enabled?: boolean;
+}
+
+/**
+ * Stream an attempt's events over the shared stream socket.
+ *
+ * The server replays stored events first, then sends live batches. On
+ * reconnect the stream resumes after the last received sequence number,
+ * so no event is lost or duplicated. Status changes refresh the cached
+ * attempt queries instead of polling them.
+ */
+export function useAttemptStream(attemptId: string | undefined, { enabled = true }: UseAttemptStreamOptions = {}) {
+    const queryClient = useQueryClient();
+    const [events, setEvents] = useState<AttemptEvent[]>([]);
+    const [status, setStatus] = useState<Attempt['status'] | null>(null);
+    const [isConnected, setIsConnected] = useState(false);
+    const lastSeq = useRef(-1);
+    const lastStatus = useRef<Attempt['status'] | null>(null);
+
+    // Start over when switching attempts
+    useEffect(() => {
+        setEvents([]);
+        setStatus(null);
+        lastSeq.current = -1;
+        lastStatus.current = null;
+    }, [attemptId]);
+
+    useEffect(() => {
+        if (!attemptId || !enabled) return;
+
+        return stream.subscribe(
+            `attempt:${attemptId}`,
+            (message: StreamMessage) => {
+                if (message.type === 'subscribed') {
+                    setIsConnected(true);
+                } else if (message.type === 'stream_closed') {
+                    setIsConnected(false);
+                } else if (message.type === 'attempt_events') {
+                    const fresh = (message.events as AttemptEvent[]).filter(
+                        (e) => e.seq > lastSeq.current
+                    );
+                    if (fresh.length) {
+                        lastSeq.current = fresh[fresh.length - 1].seq;
+                        setEvents((prev) => [...prev, ...fresh]);
+                    }
+                } else if (message.type === 'attempt_status') {
+                    setStatus(message.status);
+                    if (lastStatus.current !== message.status) {
+                        // Refetch once per status change (e.g. to load the diff),
+                        // including a change missed while disconnected
+                        queryClient.invalidateQueries({ queryKey: ['attempts'] });
+                        queryClient.invalidateQueries({ queryKey: ['tasks'] });
+                    }
+                    lastStatus.current = message.status;
+                }
+            },
+            // Resume after the last event seen when (re)subscribing
+            () => ({ after_seq: lastSeq.current })
+        );
+    }, [attemptId, enabled, queryClient]);
+
+    return { events, status, isConnected };
+}
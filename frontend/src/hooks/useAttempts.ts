@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { attemptsApi, Attempt, AttemptListParams } from '@/api/attempts';
+import { attemptsApi, Attempt, AttemptEvent, AttemptDiffFile, AttemptListParams } from '@/api/attempts';
+import { waitForOperation } from '@/api/operations';
 import { toast } from 'sonner';
 
 export function useAttempts(params?: AttemptListParams) {
@@ -26,14 +27,45 @@ export function useAttempt(id: string | undefined) {
             return response.data;
         },
         enabled: !!id,
-        refetchInterval: (query) => {
-            // Refetch every 2 seconds while running
-            const data = query.state.data as Attempt | undefined;
-            if (data?.status === 'RUNNING' || data?.status === 'QUEUED') {
-                return 2000;
+        // No polling: live events and status changes come from useAttemptStream
+    });
+}
+
+export function useAttemptEvents(id: string | undefined, { enabled = true } = {}) {
+    return useQuery({
+        queryKey: ['attempts', id, 'events'],
+        queryFn: async () => {
+            if (!id) throw new Error('Attempt ID required');
+            // Follow pages until the whole log is loaded
+            const events: AttemptEvent[] = [];
+            let page = 1;
+            for (;;) {
+                const response = await attemptsApi.events(id, { page, page_size: 1000 });
+                events.push(...response.data.results);
+                if (!response.data.next) return events;
+                page++;
             }
-            return false;
         },
+        enabled: !!id && enabled,
+    });
+}
+
+export function useAttemptDiff(id: string | undefined, { enabled = true } = {}) {
+    return useQuery({
+        queryKey: ['attempts', id, 'diff'],
+        queryFn: async () => {
+            if (!id) throw new Error('Attempt ID required');
+            const files: AttemptDiffFile[] = [];
+            let page = 1;
+            for (;;) {
+                const response = await attemptsApi.diff(id, { page, page_size: 100 });
+                files.push(...response.data.results);
+                if (!response.data.next) break;
+                page++;
+            }
+            return files.map((file) => file.diff ?? '').join('');
+        },
+        enabled: !!id && enabled,
     });
 }
 
@@ -78,20 +110,26 @@ export function useApproveAttempt() {
     const queryClient = useQueryClient();
 
     return useMutation({
-        mutationFn: (attemptId: string) => attemptsApi.approve(attemptId),
-        onSuccess: (response, attemptId) => {
+        mutationFn: async (attemptId: string) => {
+            const response = await attemptsApi.approve(attemptId);
+            return waitForOperation<{ status: string; message?: string; error?: string }>(
+                response.data.operation_id
+            );
+        },
+        onSuccess: (result, attemptId) => {
             queryClient.invalidateQueries({ queryKey: ['attempts'] });
             queryClient.invalidateQueries({ queryKey: ['attempts', attemptId] });
             queryClient.invalidateQueries({ queryKey: ['tasks'] });
-            if (response.data.status === 'approved') {
+            if (result.status === 'approved') {
                 toast.success('Changes approved and merged');
             } else {
-                toast.error(response.data.error || 'Merge failed');
+                toast.error(result.error || 'Merge failed');
             }
         },
         onError: (error: any) => {
             const message = error.response?.data?.error ||
                 error.response?.data?.detail ||
+                error.message ||
                 'Failed to approve attempt';
             toast.error(message);
         },
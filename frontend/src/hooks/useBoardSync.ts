@@ -0,0 +1,135 @@
+import { useEffect, useRef, useState } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { stream, StreamMessage } from '@/api/stream';
+import { Task, TaskStatus } from '@/api/tasks';
+import { ProjectBoard } from '@/api/projects';
+
+interface BoardPatch {
+    revision: number;
+    base_revision: number;
+    tasks: Record<string, Partial<Task> & { id: string }>;
+    removed: string[];
+}
+
+type ColumnId = TaskStatus | 'FAILED';
+
+/** Order of tasks within a board column, as served by /tasks/. */
+export const compareBoardTasks = (a: Task, b: Task) =>
+    a.priority - b.priority || b.created_at.localeCompare(a.created_at);
+
+/**
+ * Apply a patch to the board's loaded columns.
+ *
+ * Returns null when the patch moves, adds or removes a task that isn't
+ * loaded (beyond a column's first pages): its column and the counts
+ * can't be known locally, so the board has to be refetched.
+ */
+const patchBoard = (board: ProjectBoard, patch: BoardPatch): ProjectBoard | null => {
+    const columns = { ...board.columns };
+    const columnOf = new Map<string, ColumnId>();
+    (Object.keys(columns) as ColumnId[]).forEach(status => {
+        columns[status].tasks.forEach(task => columnOf.set(task.id, status));
+    });
+
+    const take = (id: string, status: ColumnId) => {
+        const column = columns[status];
+        columns[status] = { ...column, count: column.count - 1, tasks: column.tasks.filter(task => task.id !== id) };
+    };
+    const put = (task: Task) => {
+        const column = columns[task.status];
+        if (!column) return;
+        const tasks = [...column.tasks, task].sort(compareBoardTasks);
+        // Past the loaded pages it shows up when the column is paged
+        const loaded = column.has_more && tasks[tasks.length - 1].id === task.id ? column.tasks : tasks;
+        columns[task.status] = { ...column, count: column.count + 1, tasks: loaded };
+    };
+
+    for (const id of patch.removed) {
+        const status = columnOf.get(id);
+        if (status === undefined) return null;
+        take(id, status);
+    }
+
+    for (const fields of Object.values(patch.tasks)) {
+        const status = columnOf.get(fields.id);
+        if (status === undefined) return null;
+        const task = { ...columns[status].tasks.find(item => item.id === fields.id)!, ...fields };
+        take(task.id, status);
+        put(task);
+    }
+
+    return { ...board, revision: patch.revision, columns };
+};
+
+/**
+ * Keep a project's board in sync over the shared stream socket.
+ *
+ * The server sends a board snapshot with its revision on connect, then
+ * patches with only the changed fields. Patches are applied to the
+ * cached board (useProjectBoard) in place; if one is missing, a fresh
+ * snapshot is requested instead of refetching.
+ */
+export const useBoardSync = (projectId: string | undefined) => {
+    const queryClient = useQueryClient();
+    const revision = useRef<number | null>(null);
+    const boardKey = ['projects', projectId, 'board'];
+
+    const applyPatch = (patch: BoardPatch) => {
+        let stale = false;
+        queryClient.setQueryData<ProjectBoard>(boardKey, (board) => {
+            if (!board) return board;
+            const patched = patchBoard(board, patch);
+            stale = patched === null;
+            return patched ?? board;
+        });
+        if (stale) {
+            queryClient.invalidateQueries({ queryKey: boardKey, exact: true });
+        }
+
+        Object.values(patch.tasks).forEach(fields => {
+            queryClient.setQueryData<Task>(['tasks', fields.id], (task) => (task ? { ...task, ...fields } : task));
+        });
+        // Task lists aren't patched; refetch them
+        queryClient.invalidateQueries({ queryKey: ['tasks', projectId] });
+    };
+
+    // Latest closure for the stream subscription below
+    const applyPatchRef = useRef(applyPatch);
+    applyPatchRef.current = applyPatch;
+    const [isConnected, setIsConnected] = useState(false);
+
+    useEffect(() => {
+        if (!projectId) return;
+        const topic = `project:${projectId}`;
+        const key = ['projects', projectId, 'board'];
+
+        return stream.subscribe(topic, (message: StreamMessage) => {
+            if (message.type === 'board_snapshot') {
+                setIsConnected(true);
+                revision.current = message.revision;
+                // The snapshot holds every task; columns come paged from the board endpoint
+                const board = queryClient.getQueryData<ProjectBoard>(key);
+                if (board && board.revision < message.revision) {
+                    queryClient.invalidateQueries({ queryKey: key, exact: true });
+                }
+            } else if (message.type === 'board_patch') {
+                const patch = message as unknown as BoardPatch;
+                if (revision.current === null || patch.revision <= revision.current) return;
+                if (patch.base_revision > revision.current) {
+                    // Missed a revision: start over from a snapshot
+                    revision.current = null;
+                    stream.send({ type: 'resync', topic });
+                    return;
+                }
+                applyPatchRef.current(patch);
+                revision.current = patch.revision;
+            } else if (message.type === 'stream_closed') {
+                // The next subscription starts with a snapshot
+                setIsConnected(false);
+                revision.current = null;
+            }
+        });
+    }, [projectId, queryClient]);
+
+    return { isConnected };
+};
@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { projectsApi } from '@/api/projects';
+import { projectsApi, PMDecomposition } from '@/api/projects';
+import { waitForOperation } from '@/api/operations';
 import { toast } from 'sonner';
 
 export function useDecompositions(projectId: string | undefined) {
@@ -18,7 +19,7 @@ export function useInitializeWithPM() {
     const queryClient = useQueryClient();
 
     return useMutation({
-        mutationFn: ({
+        mutationFn: async ({
             projectId,
             requirements,
             model
@@ -26,15 +27,19 @@ export function useInitializeWithPM() {
             projectId: string;
             requirements: string;
             model?: string;
-        }) => projectsApi.initializeWithPM(projectId, requirements, model),
-        onSuccess: (response, { projectId }) => {
+        }) => {
+            const response = await projectsApi.initializeWithPM(projectId, requirements, model);
+            return waitForOperation<PMDecomposition>(response.data.operation_id);
+        },
+        onSuccess: (decomposition, { projectId }) => {
             queryClient.invalidateQueries({ queryKey: ['decompositions', projectId] });
             toast.success('PM Agent completed task decomposition');
-            return response.data;
+            return decomposition;
         },
         onError: (error: any) => {
             const message = error.response?.data?.error ||
                 error.response?.data?.detail ||
+                error.message ||
                 'Failed to decompose requirements';
             toast.error(message);
         },
@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { projectsApi, ProjectCreate } from '@/api/projects';
+import { projectsApi, ProjectCreate, ProjectBoard } from '@/api/projects';
+import { tasksApi, Task, TaskStatus } from '@/api/tasks';
 import { toast } from 'sonner';
 
 export function useProjects() {
@@ -53,6 +54,61 @@ export function useProjectStats(id: string | undefined) {
     });
 }
 
+/**
+ * Whole board of a project in one request (columns, ready set, progress).
+ * Revalidated with the project's ETag, so unchanged boards come back as 304s.
+ */
+export function useProjectBoard(id: string | undefined) {
+    return useQuery({
+        queryKey: ['projects', id, 'board'],
+        queryFn: async () => {
+            if (!id) throw new Error('Project ID required');
+            const response = await projectsApi.board(id);
+            return response.data;
+        },
+        enabled: !!id,
+    });
+}
+
+/**
+ * Load the next page of one board column from the task list
+ * (?status=&page=) and append it to the cached board.
+ */
+export function useLoadMoreBoardColumn(projectId: string | undefined) {
+    const queryClient = useQueryClient();
+    const boardKey = ['projects', projectId, 'board'];
+
+    return useMutation({
+        mutationFn: async (status: TaskStatus) => {
+            const board = queryClient.getQueryData<ProjectBoard>(boardKey);
+            if (!projectId || !board) throw new Error('Board not loaded');
+            const page = Math.floor(board.columns[status].tasks.length / board.page_size) + 1;
+            const response = await tasksApi.list(projectId, undefined, status, page);
+            const data = response.data as any;
+            return { status, tasks: (data.results || data) as Task[], hasMore: !!data.next };
+        },
+        onSuccess: ({ status, tasks, hasMore }) => {
+            queryClient.setQueryData<ProjectBoard>(boardKey, (board) => {
+                if (!board) return board;
+                const column = board.columns[status];
+                // Rows shift between pages while tasks move; skip ones already shown
+                const known = new Set(column.tasks.map(task => task.id));
+                const added = tasks.filter(task => !known.has(task.id) && task.status === status);
+                return {
+                    ...board,
+                    columns: {
+                        ...board.columns,
+                        [status]: { ...column, tasks: [...column.tasks, ...added], has_more: hasMore },
+                    },
+                };
+            });
+        },
+        onError: (error: any) => {
+            toast.error(error.response?.data?.detail || 'Failed to load more tasks');
+        },
+    });
+}
+
 export function useDeleteProject() {
     const queryClient = useQueryClient();
 
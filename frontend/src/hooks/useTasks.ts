@@ -1,5 +1,5 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { tasksApi, TaskCreate, TaskStatus, AgentRole } from '@/api/tasks';
+import { tasksApi, TaskCreate, TaskChange, TaskStatus, AgentRole } from '@/api/tasks';
 import { toast } from 'sonner';
 
 export function useTasks(projectId?: string, role?: AgentRole) {
@@ -51,8 +51,10 @@ export function useMoveTask() {
             status: TaskStatus;
             priority?: number;
         }) => tasksApi.move(id, status, priority),
-        onSuccess: () => {
+        onSuccess: (response) => {
             queryClient.invalidateQueries({ queryKey: ['tasks'] });
+            // Board patches follow over the stream; this covers a closed one (ETag: usually a 304)
+            queryClient.invalidateQueries({ queryKey: ['projects', response.data.project, 'board'] });
         },
         onError: (error: any) => {
             toast.error(error.response?.data?.detail || 'Failed to move task');
@@ -60,6 +62,20 @@ export function useMoveTask() {
     });
 }
 
+export function useBulkUpdateTasks() {
+    const queryClient = useQueryClient();
+
+    return useMutation({
+        mutationFn: (changes: TaskChange[]) => tasksApi.bulkUpdate(changes),
+        onSuccess: () => {
+            queryClient.invalidateQueries({ queryKey: ['tasks'] });
+        },
+        onError: (error: any) => {
+            toast.error(error.response?.data?.error || 'Failed to update tasks');
+        },
+    });
+}
+
 export function useExecuteTask() {
     const queryClient = useQueryClient();
 
@@ -1,118 +0,0 @@
-import { useEffect, useRef, useState, useCallback } from 'react';
-
-interface WebSocketMessage {
-    type: string;
-    [key: string]: any;
-}
-
-interface UseWebSocketOptions {
-    onMessage?: (message: WebSocketMessage) => void;
-    onConnect?: () => void;
-    onDisconnect?: () => void;
-    onError?: (error: Event) => void;
-}
-
-export const useWebSocket = (projectId: string | undefined, options: UseWebSocketOptions = {}) => {
-    const [isConnected, setIsConnected] = useState(false);
-    const [lastMessage, setLastMessage] = useState<WebSocketMessage | null>(null);
-    const ws = useRef<WebSocket | null>(null);
-    const reconnectTimeout = useRef<ReturnType<typeof setTimeout> | undefined>(undefined);
-
-    // Store options in ref to avoid dependency cycle
-    const optionsRef = useRef(options);
-    useEffect(() => {
-        optionsRef.current = options;
-    }, [options]);
-
-    const connect = useCallback(() => {
-        if (!projectId) return;
-
-        // Get JWT token from localStorage
-        const token = localStorage.getItem('access_token');
-        if (!token) {
-            console.warn('No access token found, cannot connect to WebSocket');
-            return;
-        }
-
-        // WebSocket URL with token in query string
-        const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const wsHost = window.location.hostname;
-        const wsPort = '8000'; // Backend port
-        const wsUrl = `${wsProtocol}//${wsHost}:${wsPort}/ws/projects/${projectId}/?token=${token}`;
-
-        try {
-            ws.current = new WebSocket(wsUrl);
-
-            ws.current.onopen = () => {
-                console.log('WebSocket connected to project:', projectId);
-                setIsConnected(true);
-                optionsRef.current.onConnect?.();
-            };
-
-            ws.current.onmessage = (event) => {
-                try {
-                    const message = JSON.parse(event.data);
-                    setLastMessage(message);
-                    optionsRef.current.onMessage?.(message);
-                } catch (error) {
-                    console.error('Failed to parse WebSocket message:', error);
-                }
-            };
-
-            ws.current.onerror = (error) => {
-                console.error('WebSocket error:', error);
-                optionsRef.current.onError?.(error);
-            };
-
-            ws.current.onclose = () => {
-                console.log('WebSocket disconnected');
-                setIsConnected(false);
-                optionsRef.current.onDisconnect?.();
-
-                // Attempt to reconnect after 3 seconds
-                reconnectTimeout.current = setTimeout(() => {
-                    console.log('Attempting to reconnect...');
-                    connect();
-                }, 3000);
-            };
-        } catch (error) {
-            console.error('Failed to create WebSocket connection:', error);
-        }
-    }, [projectId]);
-
-    const disconnect = useCallback(() => {
-        if (reconnectTimeout.current) {
-            clearTimeout(reconnectTimeout.current);
-        }
-
-        if (ws.current) {
-            ws.current.close();
-            ws.current = null;
-        }
-
-        setIsConnected(false);
-    }, []);
-
-    const sendMessage = useCallback((message: WebSocketMessage) => {
-        if (ws.current && ws.current.readyState === WebSocket.OPEN) {
-            ws.current.send(JSON.stringify(message));
-        } else {
-            console.warn('WebSocket is not connected');
-        }
-    }, []);
-
-    useEffect(() => {
-        connect();
-
-        return () => {
-            disconnect();
-        };
-    }, [connect, disconnect]);
-
-    return {
-        isConnected,
-        lastMessage,
-        sendMessage,
-        reconnect: connect,
-    };
-};
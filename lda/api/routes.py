@@ -1,23 +1,54 @@
+import asyncio
+import os
+import time
 from fastapi import APIRouter, Depends, HTTPException
 from schema.request import (
     CommandRequest, FileReadRequest, FileWriteRequest,
     ListDirRequest, GitStatusRequest, GitDiffRequest, GitCommitRequest,
     GitWorktreeAddRequest, GitWorktreeRemoveRequest,
     PMDecomposeRequest, AgentRunRequest, GitMergeRequest, GitCleanupRequest,
-    QualityGatesRequest
+    QualityGatesRequest, AgentJobRequest, JobStatusRequest
 )
 from services.shell import ShellService
 from services.filesystem import FilesystemService
 from services.git_service import GitService
+from services.scheduler import scheduler, LLM, SUBPROCESS, GIT, HIGH
+from services import audit as audit_log
+from services.audit import audit
 from core.security import signature_required
 from core.config import settings
 
 router = APIRouter(dependencies=[Depends(signature_required)])
 
+@router.get("/node")
+async def node_info():
+    """Roots this node can reach, for the backend's repo affinity."""
+    return {"node": settings.NODE_NAME, "roots": settings.WRITABLE_ROOTS}
+
 @router.post("/shell/execute")
 async def execute_command(req: CommandRequest):
-    code, stdout, stderr = ShellService.execute(req.command, req.cwd, req.timeout)
-    return {"code": code, "stdout": stdout, "stderr": stderr}
+    # The directory the command actually runs in, so the audit record has a path
+    cwd = os.path.abspath(req.cwd or os.getcwd())
+    async with scheduler.admit(SUBPROCESS):
+        async with scheduler.slot(SUBPROCESS):
+            start = time.monotonic()
+            try:
+                code, stdout, stderr = await asyncio.to_thread(
+                    ShellService.execute, req.command, cwd, req.timeout
+                )
+            except Exception as e:
+                audit.emit(audit_log.EXECUTE, cwd, details={
+                    "command": req.command,
+                    "error": str(e),
+                    "duration": round(time.monotonic() - start, 3),
+                })
+                return {"code": 1, "stdout": "", "stderr": str(e)}
+        audit.emit(audit_log.EXECUTE, cwd, details={
+            "command": req.command,
+            "exit_code": code,
+            "duration": round(time.monotonic() - start, 3),
+        })
+        return {"code": code, "stdout": stdout, "stderr": stderr}
 
 @router.post("/files/read")
 async def read_file(req: FileReadRequest):
@@ -31,9 +62,11 @@ async def read_file(req: FileReadRequest):
 async def write_file(req: FileWriteRequest):
     try:
         FilesystemService.write_file(req.path, req.content)
-        return {"status": "success"}
     except Exception as e:
+        audit.emit(audit_log.WRITE, req.path, audit_log.DENIED, {"error": str(e)})
         raise HTTPException(status_code=403, detail=str(e))
+    audit.emit(audit_log.WRITE, req.path, details={"size": len(req.content)})
+    return {"status": "success"}
 
 @router.post("/files/list")
 async def list_dir(req: ListDirRequest):
@@ -47,49 +80,64 @@ async def list_dir(req: ListDirRequest):
 async def delete_file(req: FileReadRequest): # Reuse FileReadRequest as it just needs Path
     try:
         trash_path = FilesystemService.delete_safe(req.path)
-        return {"status": "success", "trash_path": trash_path}
     except Exception as e:
+        audit.emit(audit_log.DELETE, req.path, audit_log.DENIED, {"error": str(e)})
         raise HTTPException(status_code=403, detail=str(e))
+    audit.emit(audit_log.DELETE, req.path, details={"trash_path": trash_path})
+    return {"status": "success", "trash_path": trash_path}
 
 @router.post("/git/status")
 async def git_status(req: GitStatusRequest):
-    try:
-        status = GitService.get_status(req.path)
-        return status
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with scheduler.admit(GIT):
+        try:
+            async with scheduler.slot(GIT):
+                status = await asyncio.to_thread(GitService.get_status, req.path)
+            return status
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/git/diff")
 async def git_diff(req: GitDiffRequest):
-    try:
-        diff = GitService.get_diff(req.path, req.staged)
-        return {"diff": diff}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with scheduler.admit(GIT):
+        try:
+            async with scheduler.slot(GIT):
+                diff = await asyncio.to_thread(GitService.get_diff, req.path, req.staged)
+            return {"diff": diff}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/git/commit")
 async def git_commit(req: GitCommitRequest):
-    try:
-        GitService.commit(req.path, req.message, req.files)
-        return {"status": "success"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with scheduler.admit(GIT):
+        try:
+            await scheduler.run_git(req.path, GitService.commit, req.path, req.message, req.files)
+            audit.emit(audit_log.GIT_COMMIT, req.path, details={"message": req.message, "files": req.files})
+            return {"status": "success"}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/git/worktree/add")
 async def git_worktree_add(req: GitWorktreeAddRequest):
-    try:
-        path = GitService.add_worktree(req.repo_path, req.worktree_path, req.branch_name, req.base)
-        return {"status": "success", "path": path}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with scheduler.admit(GIT):
+        try:
+            path = await scheduler.run_git(
+                req.repo_path, GitService.add_worktree,
+                req.repo_path, req.worktree_path, req.branch_name, req.base
+            )
+            return {"status": "success", "path": path}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/git/worktree/remove")
 async def git_worktree_remove(req: GitWorktreeRemoveRequest):
-    try:
-        GitService.remove_worktree(req.repo_path, req.worktree_path)
-        return {"status": "success"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with scheduler.admit(GIT):
+        try:
+            await scheduler.run_git(
+                req.repo_path, GitService.remove_worktree, req.repo_path, req.worktree_path
+            )
+            return {"status": "success"}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ============================================================
@@ -101,41 +149,42 @@ async def pm_decompose(req: PMDecomposeRequest):
     """
     PM Agent decomposes requirements into tasks.
     """
-    try:
-        from services.agents import PMAgent, BaseAgent
-
-        # Get API key based on model
-        if "gemini" in req.model.lower():
-            api_key = settings.GOOGLE_API_KEY
-        else:
-            api_key = settings.OPENAI_API_KEY
-
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail=f"API key not configured for model: {req.model}"
-            )
+    async with scheduler.admit(LLM):
+        try:
+            from services.agents import PMAgent, BaseAgent
+
+            # Get API key based on model
+            if "gemini" in req.model.lower():
+                api_key = settings.GOOGLE_API_KEY
+            else:
+                api_key = settings.OPENAI_API_KEY
+
+            if not api_key:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"API key not configured for model: {req.model}"
+                )
 
-        # Initialize PM Agent
-        agent = PMAgent(model_name=req.model, api_key=api_key)
+            # Initialize PM Agent
+            agent = PMAgent(model_name=req.model, api_key=api_key)
 
-        # Get file tree
-        file_tree = agent.get_file_tree(req.repo_path)
+            # Get file tree
+            file_tree = agent.get_file_tree(req.repo_path)
 
-        # Decompose requirements
-        tasks = await agent.decompose_requirements(
-            project_name=req.project_name,
-            project_description=req.project_description or "",
-            user_requirements=req.requirements,
-            file_tree=file_tree
-        )
+            # Decompose requirements
+            tasks = await agent.decompose_requirements(
+                project_name=req.project_name,
+                project_description=req.project_description or "",
+                user_requirements=req.requirements,
+                file_tree=file_tree
+            )
 
-        return {"tasks": tasks}
+            return {"tasks": tasks}
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ============================================================
@@ -148,178 +197,64 @@ async def agent_run(req: AgentRunRequest):
     Execute a specialized agent task.
     Creates worktree, runs agent, generates diff.
     """
-    try:
-        from services.agents import (
-            FrontendAgent, BackendAgent, QAAgent, DevOpsAgent,
-            ExecutionContext
-        )
-        from services.quality_gates import QualityGateRunner
-
-        # Select agent based on role
-        role = req.task.get('agent_role', 'BACKEND')
-        agent_map = {
-            'FRONTEND': FrontendAgent,
-            'BACKEND': BackendAgent,
-            'QA': QAAgent,
-            'DEVOPS': DevOpsAgent,
-        }
-
-        if role not in agent_map:
-            raise HTTPException(status_code=400, detail=f"Unknown agent role: {role}")
-
-        # Get API key
-        model = req.model or "gemini-2.5-flash"
-        if "gemini" in model.lower():
-            api_key = settings.GOOGLE_API_KEY
-        else:
-            api_key = settings.OPENAI_API_KEY
-
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail=f"API key not configured for model: {model}"
-            )
+    from services.agent_runner import run_agent
 
-        # Work directly in the repo on a feature branch (no external worktrees)
-        repo_path = req.project.get('repo_path')
-        task_id = req.task.get('id', req.attempt_id)
-        branch_name = f"agent-{role.lower()}-{task_id[:8]}"
+    return await run_agent(req)
 
-        import os
-        from git import Repo
 
-        # Create and checkout feature branch
-        try:
-            repo = Repo(repo_path)
+@router.post("/agent/jobs")
+async def agent_job_submit(req: AgentJobRequest):
+    """
+    Submit an agent run as a background job.
+    Returns immediately with a job id; the result is delivered to
+    callback_url (signed) and can also be polled.
+    """
+    from services.jobs import agent_jobs
 
-            # Prune any orphaned worktrees first
-            try:
-                repo.git.worktree('prune')
-            except:
-                pass
+    request = req.model_dump(exclude={'callback_url'})
+    callback_url = req.callback_url or (
+        f"{settings.BACKEND_URL}/api/attempts/{req.attempt_id}/lda-callback/"
+    )
+    job = agent_jobs.submit(request, callback_url)
+    return {"job_id": job['job_id'], "status": job['status']}
 
-            # Stash any uncommitted changes
-            try:
-                repo.git.stash('push', '-m', 'auto-stash before agent work')
-                has_stash = True
-            except:
-                has_stash = False
 
-            # Ensure we're on main first
-            repo.git.checkout('main')
+@router.post("/agent/jobs/status")
+async def agent_job_status_batch(req: JobStatusRequest):
+    """Get the status of several jobs at once (without results)."""
+    from services.jobs import job_store
 
-            # Delete existing branch if it exists (from previous failed attempt)
-            if branch_name in [b.name for b in repo.branches]:
-                try:
-                    repo.git.branch('-D', branch_name)
-                except:
-                    pass
+    return {"jobs": job_store.get_many(req.job_ids)}
 
-            # Create new branch
-            repo.git.checkout('-b', branch_name)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to setup branch: {e}")
-
-        # Work directly in repo_path
-        worktree_path = repo_path
-
-        # Initialize agent
-        AgentClass = agent_map[role]
-        agent = AgentClass(model_name=model, api_key=api_key)
-
-        # Build execution context
-        context = ExecutionContext(
-            task_id=task_id,
-            task_title=req.task.get('title', ''),
-            task_description=req.task.get('description', ''),
-            acceptance_criteria=req.task.get('acceptance_criteria', []),
-            project_name=req.project.get('name', ''),
-            project_description=req.project.get('description', ''),
-            repo_path=repo_path,
-            worktree_path=worktree_path,
-            file_tree=agent.get_file_tree(worktree_path),
-            writable_roots=req.writable_roots,
-            model=model
-        )
-
-        # Execute agent
-        result = await agent.execute(context)
-
-        if result.success and result.files_changed:
-            # Commit changes
-            try:
-                GitService.commit(
-                    worktree_path,
-                    result.commit_message or f"Agent work: {context.task_title}",
-                    result.files_changed
-                )
-            except Exception as e:
-                # Might fail if no changes, that's okay
-                pass
 
-        # Generate diff
-        diff = ""
-        try:
-            diff = GitService.get_diff(worktree_path, staged=False)
-            if not diff:
-                # Try diff against main
-                from git import Repo
-                repo = Repo(worktree_path)
-                diff = repo.git.diff("main")
-        except:
-            pass
+@router.get("/agent/jobs/{job_id}")
+async def agent_job_status(job_id: str):
+    """Get the status of a job."""
+    from services.jobs import job_store
 
-        # Run quality gates
-        gate_results = None
-        if result.success:
-            try:
-                gate_results = await QualityGateRunner.run_all_gates(worktree_path)
-            except:
-                pass
+    job = job_store.get(job_id, include_payloads=False)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
 
-        # Switch back to main branch so user isn't left on feature branch
-        try:
-            repo.git.checkout('main')
-            # Restore any stashed changes
-            if has_stash:
-                try:
-                    repo.git.stash('pop')
-                except:
-                    pass
-        except:
-            pass
 
-        return {
-            "success": result.success,
-            "git_branch": branch_name,
-            "worktree_path": worktree_path,
-            "diff": diff,
-            "error": result.error,
-            "files_changed": result.files_changed,
-            "gate_results": gate_results,
-            "output": result.output[:5000] if result.output else ""
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        # Try to switch back to main on error
-        try:
-            from git import Repo
-            repo = Repo(req.project.get('repo_path'))
-            repo.git.checkout('main')
-        except:
-            pass
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/agent/jobs/{job_id}/result")
+async def agent_job_result(job_id: str):
+    """Get a job's status together with its result."""
+    from services.jobs import job_store
+
+    job = job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    job.pop('request', None)
+    return job
 
 
 # ============================================================
 # Git Merge/Cleanup Endpoints
 # ============================================================
 
-@router.post("/git/merge")
-async def git_merge(req: GitMergeRequest):
-    """Merge a branch into target branch."""
+def _merge_branch(req: GitMergeRequest) -> dict:
     try:
         from git import Repo
 
@@ -356,9 +291,7 @@ async def git_merge(req: GitMergeRequest):
         return {"success": False, "error": str(e)}
 
 
-@router.post("/git/cleanup")
-async def git_cleanup(req: GitCleanupRequest):
-    """Cleanup rejected branch and switch back to main."""
+def _cleanup_branch(req: GitCleanupRequest) -> dict:
     try:
         from git import Repo
         import os
@@ -385,6 +318,28 @@ async def git_cleanup(req: GitCleanupRequest):
         return {"success": False, "error": str(e)}
 
 
+@router.post("/git/merge")
+async def git_merge(req: GitMergeRequest):
+    """Merge a branch into target branch."""
+    # A user is waiting on the approval, so merges jump the git queue
+    async with scheduler.admit(GIT):
+        result = await scheduler.run_git(req.repo_path, _merge_branch, req, priority=HIGH)
+    audit.emit(audit_log.GIT_MERGE, req.repo_path, task_id=req.task_id, details={
+        "branch": req.branch_name,
+        "target_branch": req.target_branch,
+        "success": result.get("success"),
+        "error": result.get("error"),
+    })
+    return result
+
+
+@router.post("/git/cleanup")
+async def git_cleanup(req: GitCleanupRequest):
+    """Cleanup rejected branch and switch back to main."""
+    async with scheduler.admit(GIT):
+        return await scheduler.run_git(req.repo_path, _cleanup_branch, req, priority=HIGH)
+
+
 # ============================================================
 # Quality Gates Endpoints
 # ============================================================
@@ -392,11 +347,22 @@ async def git_cleanup(req: GitCleanupRequest):
 @router.post("/quality/run")
 async def run_quality_gates(req: QualityGatesRequest):
     """Run quality gates (tests and linting) on a repository."""
-    try:
-        from services.quality_gates import QualityGateRunner
+    async with scheduler.admit(SUBPROCESS):
+        try:
+            from services.quality_gates import QualityGateRunner
 
-        results = await QualityGateRunner.run_all_gates(req.repo_path)
-        return results
+            results = await QualityGateRunner.run_all_gates(req.repo_path)
+            return results
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================================
+# Scheduler Endpoints
+# ============================================================
+
+@router.get("/scheduler/stats")
+async def scheduler_stats():
+    """Get per-resource concurrency, queue depth and rejection counts."""
+    return scheduler.stats()
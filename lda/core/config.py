@@ -1,10 +1,12 @@
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 import os
+import socket
 
 
 class Settings(BaseSettings):
     APP_NAME: str = "Agent Company LDA"
+    NODE_NAME: str = socket.gethostname()  # Identifies this LDA in the backend's node pool
     DEBUG: bool = True
     PORT: int = 8001
     HOST: str = "127.0.0.1"
@@ -24,6 +26,24 @@ class Settings(BaseSettings):
     # Backend URL for callbacks
     BACKEND_URL: str = "http://localhost:8000"
 
+    # Agent jobs
+    JOB_STORE_PATH: str = ".lda_jobs.sqlite3"
+    JOB_CALLBACK_RETRIES: int = 5
+
+    # Scheduler: concurrency per resource class and queued requests allowed
+    # beyond it before new work is rejected with 429
+    SCHEDULER_LLM_CONCURRENCY: int = 4
+    SCHEDULER_SUBPROCESS_CONCURRENCY: int = 2
+    SCHEDULER_GIT_CONCURRENCY: int = 4
+    SCHEDULER_MAX_QUEUE: int = 16
+    SCHEDULER_DEFAULT_RETRY_AFTER: int = 5
+
+    # Audit records: batched, spooled to disk and shipped to the backend
+    AUDIT_ENABLED: bool = True
+    AUDIT_SPOOL_DIR: str = ".lda_audit_spool"
+    AUDIT_BATCH_SIZE: int = 500  # Records per batch (at most the backend's AUDIT_INGEST_MAX_RECORDS); a full batch is sent right away
+    AUDIT_FLUSH_INTERVAL: float = 2.0  # Max seconds a record waits before it is sent
+
     class Config:
         env_file = ".env"
 
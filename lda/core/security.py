@@ -8,6 +8,17 @@ from .config import settings
 X_SIGNATURE = APIKeyHeader(name="X-Signature", auto_error=False)
 X_TIMESTAMP = APIKeyHeader(name="X-Timestamp", auto_error=False)
 
+def sign_payload(body: bytes, timestamp: str) -> str:
+    """
+    Sign an outgoing payload (e.g. a callback to the backend).
+    Same scheme as incoming requests: hex(hmac_sha256(key, timestamp + body))
+    """
+    return hmac.new(
+        settings.LDA_SECRET_KEY.encode(),
+        timestamp.encode() + body,
+        hashlib.sha256
+    ).hexdigest()
+
 def verify_signature(request_data: bytes, signature: str, timestamp: str):
     """
     Verify the HMAC signature of the request.
@@ -25,12 +36,7 @@ def verify_signature(request_data: bytes, signature: str, timestamp: str):
         return False
     
     # Create expected signature
-    message = timestamp.encode() + request_data
-    expected_signature = hmac.new(
-        settings.LDA_SECRET_KEY.encode(),
-        message,
-        hashlib.sha256
-    ).hexdigest()
+    expected_signature = sign_payload(request_data, timestamp)
     
     return hmac.compare_digest(expected_signature, signature)
 
@@ -6,9 +6,19 @@ import traceback
 from core.config import settings
 from core.security import signature_required
 from api.routes import router as api_router
+from services.scheduler import Overloaded
 
 app = FastAPI(title=settings.APP_NAME)
 
+@app.exception_handler(Overloaded)
+async def overloaded_exception_handler(request: Request, exc: Overloaded):
+    """Backpressure: tell clients when to retry instead of queueing unbounded work."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "resource": exc.resource, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Log full traceback for debugging."""
@@ -30,9 +40,49 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def resume_agent_jobs():
+    """Resume agent jobs interrupted by a restart."""
+    from services.jobs import agent_jobs
+    agent_jobs.resume()
+
+@app.on_event("startup")
+async def start_audit_emitter():
+    """Start shipping audit records, including any spooled before a restart."""
+    from services.audit import audit
+    await audit.start()
+
+@app.on_event("shutdown")
+async def stop_audit_emitter():
+    """Send what is still buffered; anything undelivered stays spooled."""
+    from services.audit import audit
+    await audit.stop()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "app": settings.APP_NAME}
+    """
+    Health, capacity and load of this node.
+    Polled by the backend's LDA node pool for load-aware routing.
+    Unauthenticated, so it leaves out paths (see /api/v1/node).
+    """
+    from services.scheduler import scheduler
+    from services.jobs import job_store
+
+    resources = scheduler.stats()['resources']
+    return {
+        "status": "healthy",
+        "app": settings.APP_NAME,
+        "node": settings.NODE_NAME,
+        "capacity": {
+            name: {"limit": pool['limit'], "queue": pool['capacity'] - pool['limit']}
+            for name, pool in resources.items()
+        },
+        "load": {
+            name: {key: pool[key] for key in ('active', 'queued', 'inflight', 'rejected')}
+            for name, pool in resources.items()
+        },
+        "jobs": {"unfinished": len(job_store.unfinished())},
+    }
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG)
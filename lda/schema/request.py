@@ -38,11 +38,20 @@ class AgentRunRequest(BaseModel):
     model: Optional[str] = "gemini-2.5-flash"
 
 
+class AgentJobRequest(AgentRunRequest):
+    callback_url: Optional[str] = None
+
+
+class JobStatusRequest(BaseModel):
+    job_ids: List[str]
+
+
 # Git Merge Requests
 class GitMergeRequest(BaseModel):
     repo_path: str
     branch_name: str
     target_branch: Optional[str] = "main"
+    task_id: Optional[str] = None  # For the audit record
 
 
 class GitCleanupRequest(BaseModel):
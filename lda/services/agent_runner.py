@@ -0,0 +1,246 @@
+"""
+Agent Runner - Executes a specialized agent task end to end.
+
+Sets up the feature branch, runs the agent, commits its changes, builds
+the diff and runs quality gates. Shared by the synchronous /agent/run
+endpoint and background agent jobs.
+
+Runs are admitted through the scheduler and hold the repository's lock
+for their whole duration, since the agent works directly in the repo on
+a feature branch. Blocking git work runs off the event loop.
+"""
+import asyncio
+import os
+from fastapi import HTTPException
+from schema.request import AgentRunRequest
+from services.git_service import GitService
+from services.scheduler import scheduler, LLM, GIT, NORMAL
+from services.audit import audit, WRITE, GIT_COMMIT
+from core.config import settings
+
+
+def _prepare_branch(repo_path: str, branch_name: str):
+    """
+    Create and checkout a fresh feature branch from main.
+
+    Returns:
+        (repo, has_stash): The repo and whether local changes were stashed
+    """
+    from git import Repo
+
+    repo = Repo(repo_path)
+
+    # Prune any orphaned worktrees first
+    try:
+        repo.git.worktree('prune')
+    except:
+        pass
+
+    # Stash any uncommitted changes
+    try:
+        repo.git.stash('push', '-m', 'auto-stash before agent work')
+        has_stash = True
+    except:
+        has_stash = False
+
+    # Ensure we're on main first
+    repo.git.checkout('main')
+
+    # Delete existing branch if it exists (from previous failed attempt)
+    if branch_name in [b.name for b in repo.branches]:
+        try:
+            repo.git.branch('-D', branch_name)
+        except:
+            pass
+
+    # Create new branch
+    repo.git.checkout('-b', branch_name)
+    return repo, has_stash
+
+
+def _commit_and_diff(worktree_path: str, result, task_title: str, audit_context: dict) -> str:
+    """Commit the agent's changes and return the branch diff."""
+    if result.success and result.files_changed:
+        # Commit changes
+        try:
+            message = result.commit_message or f"Agent work: {task_title}"
+            GitService.commit(worktree_path, message, result.files_changed)
+            audit.emit(GIT_COMMIT, worktree_path, task_id=audit_context['task_id'], details={
+                **audit_context['details'],
+                "message": message,
+                "files": result.files_changed,
+            })
+        except Exception as e:
+            # Might fail if no changes, that's okay
+            pass
+
+    # Generate diff
+    diff = ""
+    try:
+        diff = GitService.get_diff(worktree_path, staged=False)
+        if not diff:
+            # Try diff against main
+            from git import Repo
+            repo = Repo(worktree_path)
+            diff = repo.git.diff("main")
+    except:
+        pass
+    return diff
+
+
+def _restore_main(repo, has_stash: bool) -> None:
+    """Switch back to main so the user isn't left on the feature branch."""
+    try:
+        repo.git.checkout('main')
+        # Restore any stashed changes
+        if has_stash:
+            try:
+                repo.git.stash('pop')
+            except:
+                pass
+    except:
+        pass
+
+
+def _checkout_main(repo_path: str) -> None:
+    try:
+        from git import Repo
+        repo = Repo(repo_path)
+        repo.git.checkout('main')
+    except:
+        pass
+
+
+async def run_agent(req: AgentRunRequest, wait: bool = False, priority: int = NORMAL) -> dict:
+    """
+    Execute a specialized agent task.
+    Creates worktree, runs agent, generates diff.
+
+    Args:
+        req: Agent run request
+        wait: Admit the run even when the LDA is at capacity (used for
+            already-accepted background jobs, which queue instead)
+        priority: Scheduling priority for the run's git work
+
+    Raises:
+        Overloaded: If wait is False and the LDA can't admit more runs
+        HTTPException: On invalid role, missing API key or execution failure
+    """
+    async with scheduler.admit(LLM, reject=not wait):
+        async with scheduler.repo_lock(req.project.get('repo_path')):
+            return await _run_agent(req, priority)
+
+
+async def _run_agent(req: AgentRunRequest, priority: int) -> dict:
+    try:
+        from services.agents import (
+            FrontendAgent, BackendAgent, QAAgent, DevOpsAgent,
+            ExecutionContext
+        )
+        from services.quality_gates import QualityGateRunner
+
+        # Select agent based on role
+        role = req.task.get('agent_role', 'BACKEND')
+        agent_map = {
+            'FRONTEND': FrontendAgent,
+            'BACKEND': BackendAgent,
+            'QA': QAAgent,
+            'DEVOPS': DevOpsAgent,
+        }
+
+        if role not in agent_map:
+            raise HTTPException(status_code=400, detail=f"Unknown agent role: {role}")
+
+        # Get API key
+        model = req.model or "gemini-2.5-flash"
+        if "gemini" in model.lower():
+            api_key = settings.GOOGLE_API_KEY
+        else:
+            api_key = settings.OPENAI_API_KEY
+
+        if not api_key:
+            raise HTTPException(
+                status_code=500,
+                detail=f"API key not configured for model: {model}"
+            )
+
+        # Work directly in the repo on a feature branch (no external worktrees)
+        repo_path = req.project.get('repo_path')
+        task_id = req.task.get('id', req.attempt_id)
+        branch_name = f"agent-{role.lower()}-{task_id[:8]}"
+
+        # Create and checkout feature branch
+        try:
+            async with scheduler.slot(GIT, priority):
+                repo, has_stash = await asyncio.to_thread(_prepare_branch, repo_path, branch_name)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to setup branch: {e}")
+
+        # Work directly in repo_path
+        worktree_path = repo_path
+
+        # Initialize agent
+        AgentClass = agent_map[role]
+        agent = AgentClass(model_name=model, api_key=api_key)
+
+        # Build execution context
+        context = ExecutionContext(
+            task_id=task_id,
+            task_title=req.task.get('title', ''),
+            task_description=req.task.get('description', ''),
+            acceptance_criteria=req.task.get('acceptance_criteria', []),
+            project_name=req.project.get('name', ''),
+            project_description=req.project.get('description', ''),
+            repo_path=repo_path,
+            worktree_path=worktree_path,
+            file_tree=agent.get_file_tree(worktree_path),
+            writable_roots=req.writable_roots,
+            model=model
+        )
+
+        # Execute agent
+        result = await agent.execute(context)
+
+        audit_context = {
+            "task_id": req.task.get('id'),
+            "details": {"attempt_id": req.attempt_id, "agent_role": role, "branch": branch_name},
+        }
+        for path in result.files_changed or []:
+            audit.emit(
+                WRITE, os.path.join(worktree_path, path),
+                task_id=audit_context['task_id'], details=audit_context['details']
+            )
+
+        async with scheduler.slot(GIT, priority):
+            diff = await asyncio.to_thread(
+                _commit_and_diff, worktree_path, result, context.task_title, audit_context
+            )
+
+        # Run quality gates
+        gate_results = None
+        if result.success:
+            try:
+                gate_results = await QualityGateRunner.run_all_gates(worktree_path, audit_context)
+            except:
+                pass
+
+        async with scheduler.slot(GIT, priority):
+            await asyncio.to_thread(_restore_main, repo, has_stash)
+
+        return {
+            "success": result.success,
+            "git_branch": branch_name,
+            "worktree_path": worktree_path,
+            "diff": diff,
+            "error": result.error,
+            "files_changed": result.files_changed,
+            "gate_results": gate_results,
+            "output": result.output[:5000] if result.output else ""
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Try to switch back to main on error
+        await asyncio.to_thread(_checkout_main, req.project.get('repo_path'))
+        raise HTTPException(status_code=500, detail=str(e))
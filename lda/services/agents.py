@@ -6,6 +6,7 @@ This module provides:
 - Specialized Agents: Frontend, Backend, QA, DevOps for task execution
 """
 
+import asyncio
 import os
 import re
 import json
@@ -99,7 +100,16 @@ IMPORTANT:
             raise ValueError(f"Unsupported model: {self.model_name}")
 
     async def _call_llm(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Call LLM with prompt and return response."""
+        """
+        Call LLM with prompt and return response.
+        Waits for an LLM slot and runs the blocking client call off the event loop.
+        """
+        from services.scheduler import scheduler, LLM
+
+        async with scheduler.slot(LLM):
+            return await asyncio.to_thread(self._call_llm_sync, prompt, system_prompt)
+
+    def _call_llm_sync(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         if self.provider == "gemini":
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
@@ -0,0 +1,301 @@
+"""
+Audit Emitter - Batched, durable shipping of audit records to the backend.
+
+Every file write, shell execution, commit and merge the LDA performs is
+recorded with emit(). Emitting never blocks on the network: the record is
+appended to an in-memory batch and to a spool file on disk, and a
+background task ships batches to the backend's bulk ingest endpoint as
+signed NDJSON, every AUDIT_FLUSH_INTERVAL seconds or as soon as
+AUDIT_BATCH_SIZE records are waiting.
+
+The spool makes batches survive a backend outage or an LDA restart. On
+flush the current spool file is sealed into batches of at most
+AUDIT_BATCH_SIZE records, each only deleted once the backend has accepted
+it; batches left over from earlier runs are sent first, oldest first.
+Each record has an id, so a batch re-sent after a lost response is not
+stored twice. A batch the backend refuses for good (a 4xx other than 408
+or 429) is moved aside to a rejected-*.ndjson file so it can't hold up
+the batches after it.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import httpx
+from core.config import settings
+from core.security import sign_payload
+
+# Actions, as in the backend's AuditLog.OPERATION_CHOICES
+READ = 'READ'
+WRITE = 'WRITE'
+DELETE = 'DELETE'
+EXECUTE = 'EXECUTE'
+GIT_COMMIT = 'GIT_COMMIT'
+GIT_MERGE = 'GIT_MERGE'
+
+ALLOWED = 'ALLOWED'
+DENIED = 'DENIED'
+
+INGEST_PATH = '/api/audit-logs/ingest-bulk/'
+CURRENT_SPOOL = 'current.ndjson'
+
+# Longest wait between retries while the backend is unreachable
+MAX_RETRY_DELAY = 60.0
+
+# Records per batch the backend accepts (its AUDIT_INGEST_MAX_RECORDS default)
+MAX_BATCH_RECORDS = 5000
+
+# Outcomes of a delivery
+DELIVERED = 'delivered'
+RETRY = 'retry'
+REJECTED = 'rejected'
+
+# 4xx responses that may pass on a later try
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+
+class AuditEmitter:
+    """
+    Buffers audit records and ships them to the backend in batches.
+
+    emit() is thread-safe, so it can be called from the event loop and
+    from worker threads (e.g. git work run with asyncio.to_thread).
+    """
+
+    def __init__(self, spool_dir: str, batch_size: int, flush_interval: float, enabled: bool = True):
+        self.spool_dir = spool_dir
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_RECORDS))
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._spool = None
+        # Bodies of batches sealed by this process, so they aren't read back from disk
+        self._sealed: Dict[str, bytes] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._failures = 0
+
+    def emit(
+        self,
+        action: str,
+        path: str,
+        result: str = ALLOWED,
+        details: Optional[Dict[str, Any]] = None,
+        task_id: Optional[str] = None,
+    ) -> None:
+        """
+        Record an operation.
+
+        Args:
+            action: One of READ, WRITE, DELETE, EXECUTE, GIT_COMMIT, GIT_MERGE
+            path: File, directory or repository the operation touched
+            result: ALLOWED, or DENIED if the LDA refused it
+            details: Extra structured data (command, exit code, branch...)
+            task_id: Backend task the operation was done for, if known
+        """
+        if not self.enabled:
+            return
+        record = {
+            'id': uuid.uuid4().hex,
+            'action': action,
+            'path': path or '',
+            'result': result,
+            'task_id': task_id,
+            'details': {'node': settings.NODE_NAME, **(details or {})},
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        line = json.dumps(record, default=str) + '\n'
+
+        with self._lock:
+            try:
+                spool = self._open_spool()
+                spool.write(line)
+                # Hand the line to the OS so it survives the process dying
+                spool.flush()
+            except OSError as e:
+                print(f"[Audit] Could not spool record: {e}")
+            self._pending.append(line)
+            due = len(self._pending) >= self.batch_size
+
+        if due and self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def pending(self) -> int:
+        """Records not yet sealed into a batch."""
+        with self._lock:
+            return len(self._pending)
+
+    def spooled_batches(self) -> List[str]:
+        """Sealed batches waiting for delivery, oldest first."""
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            os.path.join(self.spool_dir, name) for name in names
+            if name.startswith('batch-') and name.endswith('.ndjson')
+        )
+
+    async def start(self) -> None:
+        """Start the background flusher; batches spooled by an earlier run are sent first."""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(base_url=settings.BACKEND_URL, timeout=30.0)
+        with self._lock:
+            # Records spooled before a crash were never sealed; seal them now
+            self._seal()
+            # Earlier versions sealed the whole spool as one batch
+            for path in self.spooled_batches():
+                self._split_batch(path)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher after a last flush. Undelivered batches stay spooled."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        await self._client.aclose()
+        self._client = None
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    async def flush(self) -> int:
+        """
+        Seal pending records into a batch and deliver all spooled batches.
+
+        Returns:
+            Number of batches delivered
+        """
+        if self._client is None:
+            return 0
+        async with self._flush_lock:
+            with self._lock:
+                self._seal()
+
+            delivered = 0
+            for path in self.spooled_batches():
+                body = self._sealed.get(path)
+                if body is None:
+                    try:
+                        with open(path, 'rb') as f:
+                            body = f.read()
+                    except FileNotFoundError:
+                        continue
+                outcome = await self._deliver(body) if body.strip() else DELIVERED
+                if outcome == RETRY:
+                    # Keep order: nothing newer goes out before this batch
+                    self._failures += 1
+                    return delivered
+                if outcome == REJECTED:
+                    rejected = os.path.join(os.path.dirname(path), 'rejected-' + os.path.basename(path)[len('batch-'):])
+                    os.replace(path, rejected)
+                    self._sealed.pop(path, None)
+                    print(f"[Audit] Batch refused for good, moved to {rejected}")
+                    continue
+                os.remove(path)
+                self._sealed.pop(path, None)
+                delivered += 1
+            self._failures = 0
+            return delivered
+
+    def _open_spool(self):
+        if self._spool is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._spool = open(os.path.join(self.spool_dir, CURRENT_SPOOL), 'a', encoding='utf-8')
+        return self._spool
+
+    def _seal(self) -> None:
+        """Turn the current spool file into batch files. Caller holds self._lock."""
+        current = os.path.join(self.spool_dir, CURRENT_SPOOL)
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        self._pending = []
+        if not os.path.exists(current) or os.path.getsize(current) == 0:
+            return
+        with open(current, 'rb') as f:
+            lines = f.readlines()
+        self._write_batches(f'batch-{time.time_ns():020d}', lines)
+        os.remove(current)
+
+    def _split_batch(self, path: str) -> None:
+        """Split a spooled batch with more than batch_size records. Caller holds self._lock."""
+        with open(path, 'rb') as f:
+            lines = f.readlines()
+        if len(lines) <= self.batch_size:
+            return
+        # Same prefix, so the parts sort where the batch was
+        self._write_batches(os.path.basename(path)[:-len('.ndjson')], lines)
+        os.remove(path)
+
+    def _write_batches(self, prefix: str, lines: List[bytes]) -> None:
+        """Write lines as batch files of at most batch_size records, in order."""
+        for number, start in enumerate(range(0, len(lines), self.batch_size)):
+            body = b''.join(lines[start:start + self.batch_size])
+            sealed = os.path.join(self.spool_dir, f'{prefix}-{number:06d}.ndjson')
+            tmp = sealed + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, sealed)
+            self._sealed[sealed] = body
+
+    async def _deliver(self, body: bytes) -> str:
+        """POST one batch; DELIVERED once stored, RETRY or REJECTED (for good) otherwise."""
+        timestamp = str(int(time.time()))
+        headers = {
+            'Content-Type': 'application/x-ndjson',
+            'X-Timestamp': timestamp,
+            'X-Signature': sign_payload(body, timestamp),
+        }
+        try:
+            response = await self._client.post(INGEST_PATH, content=body, headers=headers)
+        except httpx.RequestError as e:
+            print(f"[Audit] Backend unreachable, batch stays spooled: {e}")
+            return RETRY
+        if response.is_success:
+            return DELIVERED
+        if 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_CLIENT_ERRORS:
+            print(f"[Audit] Batch rejected with {response.status_code}: {response.text[:200]}")
+            return REJECTED
+        print(f"[Audit] Batch failed with {response.status_code}, stays spooled: {response.text[:200]}")
+        return RETRY
+
+    async def _run(self) -> None:
+        while True:
+            delay = min(self.flush_interval * (2 ** self._failures), MAX_RETRY_DELAY)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[Audit] Flush failed: {e}")
+
+
+audit = AuditEmitter(
+    spool_dir=settings.AUDIT_SPOOL_DIR,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    enabled=settings.AUDIT_ENABLED,
+)
@@ -0,0 +1,244 @@
+"""
+Agent Jobs - Asynchronous agent runs backed by a local SQLite job store.
+
+The backend submits an agent run and gets a job id back immediately. The
+job runs in the background, its result is persisted locally, and the
+backend is notified through a signed completion callback. Jobs survive
+LDA restarts: unfinished jobs are re-run and undelivered callbacks are
+retried on startup.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+import httpx
+from fastapi import HTTPException
+from core.config import settings
+from core.security import sign_payload
+
+# Job statuses
+QUEUED = 'QUEUED'
+RUNNING = 'RUNNING'
+SUCCEEDED = 'SUCCEEDED'
+FAILED = 'FAILED'
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+
+class JobStore:
+    """
+    Persistent job table in a local SQLite database.
+
+    Each call opens its own connection so the store can be used from the
+    event loop and from worker threads alike.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    callback_url TEXT,
+                    callback_delivered INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, include_payloads: bool = True) -> Dict[str, Any]:
+        job = {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'error': row['error'],
+            'callback_delivered': bool(row['callback_delivered']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if include_payloads:
+            job['request'] = json.loads(row['request'])
+            job['result'] = json.loads(row['result']) if row['result'] else None
+            job['callback_url'] = row['callback_url']
+        return job
+
+    def create(self, kind: str, request: Dict[str, Any], callback_url: Optional[str] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, status, request, callback_url, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, json.dumps(request), callback_url, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str, include_payloads: bool = True) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row, include_payloads) if row else None
+
+    def get_many(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get status (without request/result payloads) for several jobs."""
+        if not job_ids:
+            return []
+        placeholders = ','.join('?' for _ in job_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT * FROM jobs WHERE id IN ({placeholders})', list(job_ids)
+            ).fetchall()
+        return [self._to_dict(row, include_payloads=False) for row in rows]
+
+    def set_status(self, job_id: str, status: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?',
+                (status, time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        status = FAILED if error else SUCCEEDED
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def mark_callback_delivered(self, job_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute('UPDATE jobs SET callback_delivered = 1 WHERE id = ?', (job_id,))
+
+    def unfinished(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at', (QUEUED, RUNNING)
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def undelivered(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) AND callback_delivered = 0 '
+                'AND callback_url IS NOT NULL ORDER BY updated_at',
+                FINISHED_STATUSES
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+
+class AgentJobRunner:
+    """
+    Runs agent jobs in the background and reports their completion.
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._tasks: set = set()
+
+    def _spawn(self, coro) -> None:
+        # Keep a reference so the task isn't garbage collected mid-run
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def submit(self, request: Dict[str, Any], callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Persist a new agent job and start it.
+
+        Raises:
+            Overloaded: If the LDA is at capacity for agent runs
+        """
+        from services.scheduler import scheduler, LLM
+
+        scheduler.check_capacity(LLM)
+        job = self.store.create('agent_run', request, callback_url)
+        self._spawn(self._run(job['job_id']))
+        return job
+
+    def resume(self) -> None:
+        """Re-run unfinished jobs and re-send undelivered callbacks (startup)."""
+        for job_id in self.store.unfinished():
+            self._spawn(self._run(job_id))
+        for job_id in self.store.undelivered():
+            self._spawn(self._deliver_callback(job_id))
+
+    async def _run(self, job_id: str) -> None:
+        from schema.request import AgentRunRequest
+        from services.agent_runner import run_agent
+
+        job = self.store.get(job_id)
+        if not job or job['status'] in FINISHED_STATUSES:
+            return
+
+        self.store.set_status(job_id, RUNNING)
+        try:
+            # Accepted jobs queue for capacity instead of being rejected
+            result = await run_agent(AgentRunRequest(**job['request']), wait=True)
+            self.store.finish(job_id, result=result)
+        except HTTPException as e:
+            self.store.finish(job_id, error=str(e.detail))
+        except Exception as e:
+            self.store.finish(job_id, error=f"{type(e).__name__}: {e}")
+
+        await self._deliver_callback(job_id)
+
+    async def _deliver_callback(self, job_id: str) -> None:
+        """
+        POST the finished job to its callback URL, retrying with backoff.
+        Only a 2xx response counts as delivered.
+        """
+        job = self.store.get(job_id)
+        if not job or not job['callback_url']:
+            return
+
+        body = json.dumps({
+            'job_id': job['job_id'],
+            'attempt_id': job['request'].get('attempt_id'),
+            'status': job['status'],
+            'result': job['result'],
+            'error': job['error'],
+        }).encode()
+
+        for attempt in range(settings.JOB_CALLBACK_RETRIES):
+            timestamp = str(int(time.time()))
+            headers = {
+                'Content-Type': 'application/json',
+                'X-Timestamp': timestamp,
+                'X-Signature': sign_payload(body, timestamp),
+            }
+            delay = 2 ** attempt
+            try:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.post(job['callback_url'], content=body, headers=headers)
+                if response.is_success:
+                    self.store.mark_callback_delivered(job_id)
+                    return
+                # 4xx too: a 403 from clock skew, a 408 or a 429 pass on retry
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            except httpx.RequestError:
+                pass
+            await asyncio.sleep(delay)
+
+        # Backend polling picks up results whose callback never arrived
+        print(f"Job {job_id}: callback delivery failed after {settings.JOB_CALLBACK_RETRIES} attempts")
+
+
+job_store = JobStore(settings.JOB_STORE_PATH)
+agent_jobs = AgentJobRunner(job_store)
@@ -1,6 +1,7 @@
 """
 Quality Gates - Run tests and linting on code changes.
 """
+import asyncio
 import os
 import subprocess
 import time
@@ -219,34 +220,62 @@ class QualityGateRunner:
             return False, f"Linting failed: {str(e)}", 0.0
 
     @staticmethod
-    async def run_all_gates(repo_path: str) -> Dict[str, Any]:
+    async def run_all_gates(repo_path: str, audit_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Run all quality gates.
 
         Args:
             repo_path: Path to project
+            audit_context: task_id and details of the agent run, for audit records
 
         Returns:
             Dict with test and lint results
         """
+        from services.scheduler import scheduler, SUBPROCESS
+        from services.audit import audit, EXECUTE
+
+        audit_context = audit_context or {}
+
+        def record(gate: str, tool: Optional[str], passed: bool, duration: float) -> None:
+            # Skipped gates (nothing detected) ran no command
+            if tool and duration:
+                audit.emit(EXECUTE, repo_path, task_id=audit_context.get('task_id'), details={
+                    **audit_context.get('details', {}),
+                    "gate": gate,
+                    "tool": tool,
+                    "passed": passed,
+                    "duration": round(duration, 3),
+                })
+
+        # Gates are blocking subprocesses: run them in a thread under a SUBPROCESS slot
         # Run tests
-        test_passed, test_output, test_duration = QualityGateRunner.run_tests(repo_path)
+        async with scheduler.slot(SUBPROCESS):
+            test_passed, test_output, test_duration = await asyncio.to_thread(
+                QualityGateRunner.run_tests, repo_path
+            )
+        framework = QualityGateRunner.detect_test_framework(repo_path)
+        record('tests', framework, test_passed, test_duration)
 
         # Run linting
-        lint_passed, lint_output, lint_duration = QualityGateRunner.run_linting(repo_path)
+        async with scheduler.slot(SUBPROCESS):
+            lint_passed, lint_output, lint_duration = await asyncio.to_thread(
+                QualityGateRunner.run_linting, repo_path
+            )
+        linter = QualityGateRunner.detect_linter(repo_path)
+        record('linting', linter, lint_passed, lint_duration)
 
         return {
             'tests': {
                 'passed': test_passed,
                 'output': test_output[:10000],  # Limit output size
                 'duration': test_duration,
-                'framework': QualityGateRunner.detect_test_framework(repo_path),
+                'framework': framework,
             },
             'linting': {
                 'passed': lint_passed,
                 'output': lint_output[:10000],
                 'duration': lint_duration,
-                'linter': QualityGateRunner.detect_linter(repo_path),
+                'linter': linter,
             },
             'overall_passed': test_passed and lint_passed,
         }
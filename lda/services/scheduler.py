@@ -0,0 +1,236 @@
+"""
+Resource Scheduler - Admission control and concurrency limits for the LDA.
+
+Work is split into resource classes (LLM calls, subprocesses such as
+quality gates, git operations), each with its own concurrency limit and a
+priority queue of waiters. Requests are admitted only while the number of
+in-flight requests for their class stays under limit + queue depth;
+beyond that they are rejected with Overloaded (served as 429 with a
+Retry-After estimate) so the LDA keeps a steady throughput instead of
+piling up work it can't finish. Mutating git operations on the same
+repository are additionally serialized with a per-repo lock.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from core.config import settings
+
+# Resource classes
+LLM = 'llm'
+SUBPROCESS = 'subprocess'
+GIT = 'git'
+
+# Priorities (lower runs first)
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+# Weight of the newest sample in the service time moving average
+EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a resource class can't admit more work."""
+
+    def __init__(self, resource: str, retry_after: int):
+        self.resource = resource
+        self.retry_after = retry_after
+        super().__init__(f"LDA is overloaded ({resource}), retry after {retry_after}s")
+
+
+class ResourcePool:
+    """
+    Concurrency limit for one resource class with a priority wait queue.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.inflight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.avg_service_time: Optional[float] = None
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of admitted requests (running + queued)."""
+        return self.limit + self.max_queue
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a new request would be admitted."""
+        service_time = self.avg_service_time or settings.SCHEDULER_DEFAULT_RETRY_AFTER
+        backlog = max(self.inflight - self.capacity + 1, 1)
+        return max(1, math.ceil(service_time * backlog / self.limit))
+
+    def check_capacity(self) -> None:
+        """
+        Raises:
+            Overloaded: If the pool is at capacity
+        """
+        if self.inflight >= self.capacity:
+            self.rejected += 1
+            raise Overloaded(self.name, self.retry_after())
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot directly to the next waiter
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def record(self, duration: float) -> None:
+        self.completed += 1
+        if self.avg_service_time is None:
+            self.avg_service_time = duration
+        else:
+            self.avg_service_time += EWMA_ALPHA * (duration - self.avg_service_time)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'queued': self.queued,
+            'inflight': self.inflight,
+            'capacity': self.capacity,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'avg_service_time': round(self.avg_service_time, 2) if self.avg_service_time else None,
+        }
+
+
+class Scheduler:
+    """
+    Admission control, per-class concurrency limits and per-repo locks.
+
+    Usage:
+        async with scheduler.admit(LLM):          # reject early when overloaded
+            async with scheduler.repo_lock(path):  # serialize git mutations
+                async with scheduler.slot(GIT):    # bounded concurrency
+                    ...
+    """
+
+    def __init__(self, limits: Dict[str, int], max_queue: int):
+        self.pools = {
+            name: ResourcePool(name, limit, max_queue)
+            for name, limit in limits.items()
+        }
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+        self._repo_waiters: Dict[str, int] = {}
+
+    def check_capacity(self, resource: str) -> None:
+        """
+        Check that a resource class can admit more work, without admitting.
+
+        Raises:
+            Overloaded: If the class is at capacity
+        """
+        self.pools[resource].check_capacity()
+
+    @asynccontextmanager
+    async def admit(self, resource: str, reject: bool = True):
+        """
+        Count a request as in flight for a resource class.
+
+        Args:
+            resource: Resource class the request mostly uses
+            reject: If False, admit even when over capacity (for work that
+                was already accepted, such as persisted background jobs)
+
+        Raises:
+            Overloaded: If reject is True and the class is at capacity
+        """
+        pool = self.pools[resource]
+        if reject:
+            pool.check_capacity()
+        pool.inflight += 1
+        try:
+            yield
+        finally:
+            pool.inflight -= 1
+
+    @asynccontextmanager
+    async def slot(self, resource: str, priority: int = NORMAL):
+        """Hold one of a resource class's concurrency slots."""
+        pool = self.pools[resource]
+        await pool.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            pool.record(time.monotonic() - started)
+            pool.release()
+
+    @asynccontextmanager
+    async def repo_lock(self, repo_path: str):
+        """Serialize mutating git operations on one repository."""
+        key = os.path.realpath(repo_path or '')
+        lock = self._repo_locks.setdefault(key, asyncio.Lock())
+        self._repo_waiters[key] = self._repo_waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._repo_waiters[key] -= 1
+            if not self._repo_waiters[key]:
+                # Drop locks nobody holds or waits for
+                del self._repo_waiters[key]
+                self._repo_locks.pop(key, None)
+
+    async def run_git(self, repo_path: str, func, *args, priority: int = NORMAL):
+        """
+        Run a blocking, repo-mutating git function off the event loop.
+
+        Holds the repo lock and a GIT slot for the duration.
+        """
+        async with self.repo_lock(repo_path):
+            async with self.slot(GIT, priority):
+                return await asyncio.to_thread(func, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-class load and the repos with git work pending."""
+        return {
+            'resources': {name: pool.stats() for name, pool in self.pools.items()},
+            'locked_repos': {
+                repo: waiters for repo, waiters in self._repo_waiters.items()
+            },
+        }
+
+
+scheduler = Scheduler(
+    limits={
+        LLM: settings.SCHEDULER_LLM_CONCURRENCY,
+        SUBPROCESS: settings.SCHEDULER_SUBPROCESS_CONCURRENCY,
+        GIT: settings.SCHEDULER_GIT_CONCURRENCY,
+    },
+    max_queue=settings.SCHEDULER_MAX_QUEUE,
+)